@@ -4,17 +4,171 @@ HTTP API wrapper for Akademik YÖK MCP Server
 """
 
 import asyncio
+import fcntl
 import json
 import time
 import os
+import shutil
+import signal
 import subprocess
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-from fastapi import FastAPI, HTTPException
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 import httpx
 
-app = FastAPI(title="Akademik YÖK API", version="1.0.0")
+from cache_warmer import CacheWarmer, RequestLog
+from session_store import SessionStore, SessionWatcher, aexists
+from graph_engine import GraphEngine
+from name_index import NameIndex, iter_session_profiles, profile_key
+from prefetch import (SelectionStats, adopt_prefetch, discard_prefetch, link_prefetch, prefetch_session_id,
+                      rank_candidates)
+from profile_search import ProfileSearchIndex
+from recommend import Recommender
+from taxonomy import Taxonomy, label_filter, normalize_label
+from yok_scraper.cdp import CDPEngine, run_collaborators_job, run_search_job
+from yok_scraper.graph import collaborator_links
+from yok_scraper.config import MAX_PROFILES_LIMIT
+from yok_scraper.filters import FilterError, compile_filter
+from yok_scraper.crawl import CRAWL_DONE_FILE, CRAWL_FILE, CRAWL_STATE_FILE, DEFAULT_MAX_PAGES
+from yok_scraper import provision
+from yok_scraper.pool import WorkerPool
+from yok_scraper.ratelimit import UpstreamUnavailable, get_limiter, probe_upstream
+from yok_scraper.supervisor import Supervisor
+from yok_scraper import trace
+from yok_scraper import job_queue
+from yok_scraper.sessions import resolve_session_dir, write_json, write_marker
+
+# Büyük profil/işbirlikçi listeleri orjson kuruluysa onunla serileştirilir
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
+
+app = FastAPI(title="Akademik YÖK API", version="1.0.0", default_response_class=DefaultResponse)
+
+# Kurulum kökü (public/, data/, logs/, scripts/, venv/); başka dizin/makinede AKADEMIK_ROOT ile
+ROOT = Path(os.environ.get("AKADEMIK_ROOT", "/var/www/akademik-tinder"))
+
+# Büyüyen işbirlikçi listeleri sıkıştırılmış döner; brotli-asgi kuruluysa brotli (gzip'e düşer)
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=1000)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+# İstemci bu başlıkla session'ın scraper işlerinin CPU profilini (flamegraph) ister
+PROFILE_HEADER = "X-Profile"
+
+@app.middleware("http")
+async def trace_session_requests(request: Request, call_next):
+    """Record each session-bound API request as a span on the session timeline"""
+    started = time.time()
+    response = await call_next(request)
+    session_id = getattr(request.state, "session_id", None) or request.path_params.get("session_id")
+    if session_id:
+        await asyncio.to_thread(
+            _record_request_span, SESSIONS_ROOT / session_id,
+            f"api {request.method} {request.url.path.split('/')[2]}", started, response.status_code
+        )
+    return response
+
+def _record_request_span(session_dir: Path, name: str, started: float, status: int) -> None:
+    if session_dir.is_dir():
+        trace.record_span(session_dir, name, started, time.time(), status=status)
+
+def request_profiling(http_request: Request, session_dir: Path) -> None:
+    if http_request.headers.get(PROFILE_HEADER) == "1":
+        try:
+            (session_dir / trace.PROFILE_FLAG_FILE).touch()
+        except OSError:
+            pass
+
+# Alan/uzmanlık verisi açılışta bir kez yüklenir, dosya değişirse yeniden okunur
+TAXONOMY = Taxonomy(ROOT / "public" / "fields.json")
+
+SESSIONS_ROOT = ROOT / "public" / "collaborator-sessions"
+SCRIPTS_DIR = ROOT / "scripts"
+
+# "pool" (önceden başlatılmış Selenium işçileri), "subprocess" (her iş için
+# script süreci), "cdp" (tek süreçte asyncio CDP motoru) veya "queue" (işler kalıcı
+# kuyruğa yazılır, `python -m yok_scraper.worker` düğümleri çeker)
+SCRAPER_ENGINE = os.environ.get("SCRAPER_ENGINE", "pool")
+POOL: Optional[WorkerPool] = None
+QUEUE: Optional[job_queue.JobQueue] = None
+# Uzak işçilerin /api/queue uçlarına erişim anahtarı (boşsa uçlar hiç eklenmez)
+QUEUE_TOKEN = os.environ.get("SCRAPER_QUEUE_TOKEN")
+_cdp_engine: Optional[CDPEngine] = None
+_cdp_engine_lock = asyncio.Lock()
+_background_tasks: set = set()
+
+# İstemcinin bekleyebileceği süre (saniye); scraper'a mutlak deadline olarak iletilir
+DEADLINE_HEADER = "X-Request-Timeout"
+MAX_REQUEST_TIMEOUT = 600
+COLLABORATOR_TIMEOUT = 240
+# Çok adımlı taramanın varsayılan/azami süre ve sayfa bütçesi
+CRAWL_TIMEOUT = int(os.environ.get("CRAWL_TIMEOUT", "1800"))
+MAX_CRAWL_PAGES = int(os.environ.get("MAX_CRAWL_PAGES", "500"))
+# Scraper sonuçları yazıp API okuyabilsin diye deadline'dan düşülen pay
+JOB_DEADLINE_MARGIN = 2.0
+# Çok profilli aramada seçilmesi muhtemel ilk k profilin işbirlikçileri arka planda
+# önceden çekilir (0 = kapalı; istek prefetch_top_k ile ezebilir)
+PREFETCH_TOP_K = int(os.environ.get("PREFETCH_TOP_K", "0"))
+SELECTION_STATS = SelectionStats(ROOT / "data" / "profile_selections.json")
+# Arama/seçim geçmişi; önbellek ısıtıcı sık ve yakın zamanda istenen araştırmacıları
+# sessiz saatlerde (WARM_WINDOW) pencere başına WARM_BUDGET iş ile tazeler (0 = kapalı)
+REQUEST_LOG = RequestLog(ROOT / "logs" / "requests.jsonl")
+WARMER = CacheWarmer(
+    REQUEST_LOG,
+    ROOT / "data" / "cache_warmer.json",
+    window=os.environ.get("WARM_WINDOW", "02:00-06:00"),
+    budget=int(os.environ.get("WARM_BUDGET", "0")),
+    max_age_hours=float(os.environ.get("WARM_MAX_AGE_HOURS", "24")),
+)
+WARM_CONCURRENCY = int(os.environ.get("WARM_CONCURRENCY", "1"))
+WARM_CHECK_INTERVAL = 300
+WARM_JOB_SECONDS = 300
+# Havuz kuyruğunda adil paylaşım anahtarı: API anahtarı, yoksa istemci IP'si
+API_KEY_HEADER = "X-API-Key"
+# Uzun sorgu (since + wait) varsayılan süresi ve dosya değişikliği kontrol aralığı
+LONG_POLL_SECONDS = 30
+WAKE_INTERVAL = 0.1
+# Session dosyalarının mtime ile doğrulanan önbelleği ve değişiklik bekleyicileri
+STORE = SessionStore()
+WATCHER = SessionWatcher(WAKE_INTERVAL)
+# Kimse beklemiyor/sorgulamıyorsa işbirlikçi işi bu süreden sonra iptal edilir
+ABANDON_GRACE_SECONDS = 30
+# session_id -> {"search"/"collaborators": {"engine", "ref", "started_at"}}
+_session_jobs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+# session_id -> açık bekleyen (wait=true) istek sayısı
+_session_waiters: Dict[str, int] = {}
+# Erken dönen progressive aramanın bitince yapılacak işleri (search_followups argümanları); session
+# klasöründe durur ki hangi API işçisi ya da yeniden başlatılmış süreç aramanın bittiğini görürse çalıştırsın
+FOLLOWUPS_FILE = "search_followups.json"
+
+# İş süre/bellek/ilerleme limitleri ve sahipsiz Chrome temizliği
+SUPERVISOR = Supervisor(SESSIONS_ROOT)
+SUPERVISOR_INTERVAL = 5
+# Sahipsiz süreç ve pid dosyası taraması her N turda bir yapılır
+SUPERVISOR_HOUSEKEEPING_EVERY = 12
+# Devre kesici açıkken sağlık kontrolünün zamanı geldi mi diye bakma aralığı (sn)
+UPSTREAM_PROBE_INTERVAL = 2
+
+# Daha önce görülen tüm profiller için yerel isim indeksi
+NAME_INDEX = NameIndex()
+
+# Anahtar kelime/etiket araması için SQLite FTS5 indeksi
+PROFILE_SEARCH = ProfileSearchIndex(ROOT / "data" / "profiles.db", TAXONOMY)
+
+# İşbirlikçi önerileri için TF-IDF matrisi ve bilinen ortak yazar grafı
+RECOMMENDER = Recommender()
+
+# Ortak yazar grafı (CSR) ve diske anlık görüntüsü
+GRAPH = GraphEngine()
+GRAPH_SNAPSHOT = ROOT / "data" / "graph_snapshot.npz"
 
 class SearchRequest(BaseModel):
     name: str
@@ -22,6 +176,22 @@ class SearchRequest(BaseModel):
     field_id: Optional[int] = None
     specialty_ids: Optional[List[str]] = None
     profile_id: Optional[int] = None
+    local_first: bool = False
+    prefetch_top_k: Optional[int] = None
+    # Sonuç limiti (varsayılan 20, email ile 100; en fazla MAX_PROFILES_LIMIT)
+    limit: Optional[int] = None
+    # İlk sayfa gelince dön; kalanlar /api/search/{session_id}?since=<cursor> ile alınır
+    progressive: bool = False
+    # Satır filtresi, ör. 'kurum:"ankara üniversitesi" AND (kw:yapay OR unvan:profesör)' (yok_scraper.filters)
+    filter: Optional[str] = None
+
+class CrawlRequest(BaseModel):
+    profile_url: str
+    name: str = ""
+    hops: int = 2
+    max_pages: int = DEFAULT_MAX_PAGES
+    order: str = "weight"
+    time_budget: Optional[float] = None
 
 class CollaboratorsRequest(BaseModel):
     session_id: str
@@ -34,8 +204,670 @@ def generate_session_id():
     import string
     return f"session_{int(time.time())}_{(''.join(random.choices(string.ascii_lowercase + string.digits, k=9)))}"
 
+def remember_profiles(profiles: List[Dict[str, Any]]) -> None:
+    """Feed scraped profiles/collaborators into the local indexes"""
+    NAME_INDEX.add_many(profiles)
+    RECOMMENDER.add_many(profiles)
+    GRAPH.add_profiles(profiles)
+    try:
+        PROFILE_SEARCH.upsert_many(profiles)
+    except Exception as e:
+        print(f"⚠️ Profile search index update failed: {e}")
+
+def remember_graph(session_dir: Path) -> None:
+    """Feed a finished session's co-author graph into the graph engine and the recommender's exclusions"""
+    RECOMMENDER.add_graph_file(session_dir / "graph.json")
+    GRAPH.add_graph_file(session_dir / "graph.json")
+
+# Bu süreçte indekslenmiş bitmiş işbirlikçi session'ları: klasör -> done işaretinin mtime'ı
+_indexed_sessions: Dict[str, float] = {}
+
+def remember_collaborator_session(session_dir: Path, collaborators: List[Dict[str, Any]]) -> None:
+    """Index a collaborator session; once finished, only the first poll per done marker does the work"""
+    try:
+        done_at = (session_dir / "collaborators_done.txt").stat().st_mtime
+    except OSError:
+        done_at = None
+    if done_at is not None and _indexed_sessions.get(str(session_dir)) == done_at:
+        return
+    remember_profiles(collaborators)
+    if done_at is not None:
+        remember_graph(session_dir)
+        _indexed_sessions[str(session_dir)] = done_at
+
+def index_stored_sessions() -> int:
+    count = 0
+    for profiles in iter_session_profiles(SESSIONS_ROOT):
+        remember_profiles(profiles)
+        count += len(profiles)
+    for graph_path in SESSIONS_ROOT.glob("*/graph.json"):
+        remember_graph(graph_path.parent)
+    for crawl_path in SESSIONS_ROOT.glob(f"*/{CRAWL_FILE}"):
+        GRAPH.add_crawl_file(crawl_path)
+    return count
+
+def save_graph_snapshot() -> None:
+    try:
+        GRAPH.snapshot(GRAPH_SNAPSHOT)
+    except OSError as e:
+        print(f"⚠️ Graph snapshot could not be saved: {e}")
+
+def _script_command(script: str, *args: str) -> List[str]:
+    return [str(ROOT / "venv" / "bin" / "python"), str(SCRIPTS_DIR / script), *args]
+
+def _popen_script(command: List[str]) -> subprocess.Popen:
+    # Yeni süreç grubu: iptalde chromedriver ve Chrome da birlikte öldürülür
+    return subprocess.Popen(
+        command,
+        cwd=str(ROOT),
+        env={**os.environ, "PATH": str(ROOT / "venv" / "bin") + ":" + os.environ.get("PATH", "")},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+async def get_cdp_engine() -> CDPEngine:
+    """Shared in-process CDP engine, started on first use"""
+    global _cdp_engine
+    async with _cdp_engine_lock:
+        if _cdp_engine is None:
+            engine = CDPEngine()
+            await engine.start()
+            _cdp_engine = engine
+    return _cdp_engine
+
+def _run_in_background(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def _cdp_job(job, *args, deadline: Optional[float] = None, **kwargs) -> None:
+    try:
+        await job(await get_cdp_engine(), *args, SESSIONS_ROOT, deadline, **kwargs)
+    except Exception as e:
+        print(f"❌ CDP job {job.__name__} failed: {e}")
+
+def request_deadline(http_request: Optional[Request], default_seconds: float) -> float:
+    """Absolute deadline from the X-Request-Timeout header (seconds), else the default wait"""
+    seconds = default_seconds
+    if http_request is not None:
+        try:
+            seconds = float(http_request.headers.get(DEADLINE_HEADER, default_seconds))
+        except ValueError:
+            pass
+    return time.time() + max(1.0, min(seconds, MAX_REQUEST_TIMEOUT))
+
+def client_key(http_request: Optional[Request]) -> str:
+    """Fair-share key for the worker pool: API key if given, else the client IP"""
+    if http_request is None:
+        return "anonymous"
+    api_key = http_request.headers.get(API_KEY_HEADER)
+    if api_key:
+        return f"key:{api_key}"
+    return f"ip:{http_request.client.host}" if http_request.client else "anonymous"
+
+def _track_job(session_id: str, kind: str, engine: str, ref: Any, progress_session: Optional[str] = None) -> None:
+    """Remember a job of a session; progress_session is the directory it writes into when that differs"""
+    _session_jobs.setdefault(session_id, {})[kind] = {"engine": engine, "ref": ref, "started_at": time.time(),
+                                                      "progress_session": progress_session}
+
+def _job_running(job: Dict[str, Any]) -> bool:
+    if job["engine"] == "cdp":
+        return not job["ref"].done()
+    if job["engine"] == "queue":
+        return QUEUE is not None and job_queue.active(QUEUE.get(job["ref"]))
+    if job["engine"] == "pool":
+        handle = POOL.get(job["ref"]) if POOL else None
+        return handle is not None and not handle.future.done()
+    return job["ref"].poll() is None
+
+def _kill_job(job: Dict[str, Any]) -> None:
+    if job["engine"] == "cdp":
+        # Süpervizör iş parçacığından da çağrılır: asyncio görevi kendi döngüsünde iptal edilir
+        job["ref"].get_loop().call_soon_threadsafe(job["ref"].cancel)
+    elif job["engine"] == "pool":
+        POOL.cancel(job["ref"])
+    elif job["engine"] == "queue":
+        # Çalıştıran işçi bir sonraki heartbeat'te lease'i kaybeder ve tarayıcısını kapatır
+        QUEUE.cancel(job["ref"])
+    else:
+        try:
+            os.killpg(job["ref"].pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+def cancel_session_jobs(session_id: str, reason: str) -> int:
+    """Cancel every running job of a session and kill its browsers"""
+    cancelled = 0
+    for kind, job in _session_jobs.pop(session_id, {}).items():
+        if not _job_running(job):
+            continue
+        _kill_job(job)
+        cancelled += 1
+        print(f"🛑 Cancelled {kind} job of session {session_id} ({reason})")
+    return cancelled
+
+def _read_marker(path: Path) -> str:
+    return STORE.marker(path)
+
+def _claim_pid_file(pid_path: Path) -> bool:
+    """Atomically create the collaborator pid file; False if another request (or API worker) owns it"""
+    try:
+        os.close(os.open(pid_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+        return True
+    except FileExistsError:
+        return False
+
+# Birden çok uvicorn işçisinde tekil döngüler (ısıtma, süpervizör temizliği) yalnızca lider işçide çalışır
+_leader_lock = None
+
+def is_leader() -> bool:
+    global _leader_lock
+    if _leader_lock is None:
+        path = ROOT / "data" / "api_leader.lock"
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(path, "w")
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            handle.write(str(os.getpid()))
+            handle.flush()
+            _leader_lock = handle
+        except OSError:
+            _leader_lock = False
+    return bool(_leader_lock)
+
+def touch_session(session_dir: Path, hold: float = 0) -> None:
+    """Record that a client is still interested in this session (also touched by the Next.js routes)
+
+    hold > 0 marks the client as seen that many seconds into the future, so
+    a client that will come back later (an MCP resume token) keeps the job
+    from being reaped in between.
+    """
+    try:
+        seen_path = session_dir / "client_seen"
+        seen_path.touch()
+        if hold > 0:
+            until = time.time() + min(hold, MAX_REQUEST_TIMEOUT)
+            os.utime(seen_path, (until, until))
+    except OSError:
+        pass
+
+def start_search_job(session_id: str, name: str, email: Optional[str], field_name: Optional[str], specialty_names: List[str],
+                     deadline: Optional[float] = None, client: Optional[str] = None,
+                     max_profiles: Optional[int] = None, filter_expr: Optional[str] = None) -> None:
+    """Start main profile scraping with the configured engine"""
+    if SCRAPER_ENGINE == "cdp":
+        task = _run_in_background(_cdp_job(run_search_job, name, session_id, field_name, specialty_names, email,
+                                            deadline=deadline, max_profiles=max_profiles, filter_expr=filter_expr))
+        _track_job(session_id, "search", "cdp", task)
+        print(f"✅ Started CDP search job for session {session_id}")
+        return
+    if QUEUE is not None:
+        job_id = QUEUE.enqueue("search", {"name": name, "session_id": session_id, "field": field_name,
+                                          "specialties": specialty_names, "email": email, "deadline": deadline,
+                                          "max_profiles": max_profiles, "filter_expr": filter_expr})
+        _track_job(session_id, "search", "queue", job_id)
+        print(f"✅ Enqueued search job {job_id} for session {session_id}")
+        return
+    if POOL is not None:
+        job = POOL.submit("search", client=client, name=name, session_id=session_id, field=field_name,
+                          specialties=specialty_names, email=email, sessions_root=str(SESSIONS_ROOT),
+                          deadline=deadline, max_profiles=max_profiles, filter_expr=filter_expr)
+        _track_job(session_id, "search", "pool", job.id)
+        print(f"✅ Queued search job {job.id} for session {session_id}")
+        return
+    python_args = _script_command("scrape_main_profile.py", name, session_id)
+    if email:
+        python_args.extend(['--email', email])
+    if field_name:
+        python_args.extend(['--field', field_name])
+        if specialty_names:
+            python_args.extend(['--specialties', ','.join(specialty_names)])
+    if deadline:
+        python_args.extend(['--deadline', str(deadline)])
+    if max_profiles:
+        python_args.extend(['--limit', str(max_profiles)])
+    if filter_expr:
+        python_args.extend(['--filter', filter_expr])
+    print(f"🔄 Starting scraping with args: {python_args}")
+    process = _popen_script(python_args)
+    _track_job(session_id, "search", "subprocess", process)
+    print(f"✅ Started scraping process with PID: {process.pid}")
+
+def start_collaborator_job(session_id: str, profile: Dict[str, Any], deadline: Optional[float] = None,
+                           client: Optional[str] = None, priority: Optional[str] = None, resume: bool = False) -> str:
+    """Start collaborator scraping; returns the PID (or engine marker) for the pid file"""
+    if SCRAPER_ENGINE == "cdp":
+        task = _run_in_background(_cdp_job(run_collaborators_job, profile['name'], session_id, profile['url'], deadline=deadline))
+        _track_job(session_id, "collaborators", "cdp", task)
+        print(f"✅ Started CDP collaborator job for session {session_id}")
+        return "cdp"
+    if QUEUE is not None:
+        job_id = QUEUE.enqueue("collaborators", {"name": profile['name'], "session_id": session_id,
+                                                 "profile_url": profile['url'], "deadline": deadline,
+                                                 "resume": resume},
+                               priority=priority or "collaborators")
+        _track_job(session_id, "collaborators", "queue", job_id)
+        print(f"✅ Enqueued collaborator job {job_id} for session {session_id}")
+        return job_id
+    if POOL is not None:
+        job = POOL.submit("collaborators", priority=priority, client=client, name=profile['name'], session_id=session_id,
+                          profile_url=profile['url'], sessions_root=str(SESSIONS_ROOT), deadline=deadline, resume=resume)
+        _track_job(session_id, "collaborators", "pool", job.id)
+        print(f"✅ Queued collaborator job {job.id} for session {session_id}")
+        return job.id
+    args = [profile['name'], session_id, profile['url']]
+    if deadline:
+        args.append(str(deadline))
+    process = _popen_script(_script_command("scrape_collaborators.py", *args))
+    _track_job(session_id, "collaborators", "subprocess", process)
+    print(f"✅ Started collaborator scraping with PID: {process.pid}")
+    return str(process.pid)
+
+def start_crawl_job(session_id: str, request: CrawlRequest, client: Optional[str] = None) -> str:
+    """Start a budgeted multi-hop crawl (pool/queue, otherwise a script process)"""
+    budget = max(1.0, min(request.time_budget or CRAWL_TIMEOUT, CRAWL_TIMEOUT))
+    deadline = time.time() + budget
+    max_pages = max(1, min(request.max_pages, MAX_CRAWL_PAGES))
+    payload = {"name": request.name, "session_id": session_id, "profile_url": request.profile_url,
+               "hops": request.hops, "max_pages": max_pages, "order": request.order, "deadline": deadline}
+    if QUEUE is not None:
+        job_id = QUEUE.enqueue("crawl", {**payload, "resume": True}, priority="background")
+        _track_job(session_id, "crawl", "queue", job_id)
+        ref = job_id
+    elif POOL is not None and SCRAPER_ENGINE == "pool":
+        job = POOL.submit("crawl", client=client, sessions_root=str(SESSIONS_ROOT), **payload)
+        _track_job(session_id, "crawl", "pool", job.id)
+        ref = job.id
+    else:
+        process = _popen_script(_script_command("crawl_collaborators.py", request.name or "-", session_id, request.profile_url,
+                                                str(request.hops), str(max_pages), str(deadline), request.order))
+        _track_job(session_id, "crawl", "subprocess", process)
+        ref = str(process.pid)
+    # Süpervizör taramayı genel iş süresi sınırıyla değil kendi bütçesiyle sınırlar
+    _session_jobs[session_id]["crawl"]["max_seconds"] = budget + JOB_DEADLINE_MARGIN + 30
+    print(f"✅ Started crawl job {ref} for session {session_id} ({request.hops} hops, {max_pages} pages)")
+    return ref
+
+def start_prefetch_jobs(session_id: str, profiles: List[Dict[str, Any]], k: int, field_name: Optional[str],
+                        specialty_names: List[str], email: Optional[str], client: Optional[str]) -> int:
+    """Start background collaborator crawls for the k likeliest selections (pool engine only)"""
+    if POOL is None or SCRAPER_ENGINE != "pool" or k <= 0 or len(profiles) < 2:
+        return 0
+    field_filter, specialty_filter = label_filter(field_name, specialty_names)
+    candidates = rank_candidates(profiles, k, field_filter, specialty_filter, email, SELECTION_STATS)
+    deadline = time.time() + COLLABORATOR_TIMEOUT
+    for profile in candidates:
+        prefetch_id = prefetch_session_id(session_id, profile['id'])
+        job = POOL.submit("collaborators", priority="background", client=client, name=profile['name'],
+                          session_id=prefetch_id, profile_url=profile['url'],
+                          sessions_root=str(SESSIONS_ROOT), deadline=deadline)
+        # Süpervizör ilerlemeyi tahminin kendi klasöründen okur
+        _track_job(session_id, f"prefetch:{profile['id']}", "pool", job.id, progress_session=prefetch_id)
+    print(f"🔮 Prefetching collaborators of {[p['id'] for p in candidates]} for session {session_id}")
+    return len(candidates)
+
+def _claim_followups(session_dir: Path) -> Optional[Dict[str, Any]]:
+    """Take the parked follow-ups of a finished progressive search; only the request whose unlink wins gets them"""
+    path = session_dir / FOLLOWUPS_FILE
+    try:
+        pending = json.loads(path.read_text(encoding="utf-8"))
+        path.unlink()
+    except (OSError, ValueError):
+        return None
+    return pending if isinstance(pending, dict) else None
+
+def search_followups(session_id: str, profiles: List[Dict[str, Any]], email: Optional[str], field_name: Optional[str],
+                     specialty_names: List[str], prefetch_top_k: int, client: str) -> Dict[str, Any]:
+    """Work started when a live search finishes: the collaborators of a single hit, else prefetch"""
+    if len(profiles) == 1 and not email:
+        print("🤝 Single profile found, starting collaborator scraping...")
+        try:
+            touch_session(SESSIONS_ROOT / session_id)
+            start_collaborator_job(session_id, profiles[0], deadline=time.time() + COLLABORATOR_TIMEOUT, client=client)
+        except Exception as e:
+            print(f"⚠️ Failed to start collaborator scraping: {e}")
+        return {"collaborators_started": True, "prefetching": 0}
+    prefetching = 0
+    try:
+        prefetching = start_prefetch_jobs(session_id, profiles, prefetch_top_k, field_name, specialty_names, email, client)
+    except Exception as e:
+        print(f"⚠️ Failed to start prefetch: {e}")
+    return {"collaborators_started": False, "prefetching": prefetching}
+
+def promote_prefetch(session_id: str, session_dir: Path, profile: Dict[str, Any], http_request: Request) -> Optional[str]:
+    """Cancel unchosen prefetch crawls and adopt the chosen one
+
+    Returns the pid-file value when the selection was served from a
+    prefetch (still running, finished, or resumed from its checkpoint);
+    None when there was no usable prefetch and a normal crawl has to start.
+    """
+    session_jobs = _session_jobs.setdefault(session_id, {})
+    chosen = session_jobs.pop(f"prefetch:{profile['id']}", None)
+    for kind in [k for k in session_jobs if k.startswith("prefetch:")]:
+        job = session_jobs.pop(kind)
+        if _job_running(job):
+            _kill_job(job)
+    if chosen is not None and _job_running(chosen):
+        # Seçilen tahmin hâlâ çalışıyor: iptal etmek yerine dosyalarını session'a bağla, işbirlikçi işi o olsun
+        link_prefetch(session_dir, profile['id'])
+        discard_prefetch(session_dir, keep=profile['id'])
+        session_jobs["collaborators"] = chosen
+        print(f"🔮 Prefetch hit for session {session_id}: crawl still running, adopted")
+        return str(chosen["ref"])
+    adopted = adopt_prefetch(session_dir, profile['id'])
+    discard_prefetch(session_dir)
+    if adopted["done"]:
+        print(f"🔮 Prefetch hit for session {session_id}: collaborators ready")
+        return "prefetch"
+    if adopted["graph"]:
+        print(f"🔮 Prefetch hit for session {session_id}: resuming from checkpoint")
+        return start_collaborator_job(
+            session_id, profile,
+            deadline=request_deadline(http_request, COLLABORATOR_TIMEOUT) - JOB_DEADLINE_MARGIN,
+            client=client_key(http_request), resume=True
+        )
+    return None
+
+def _job_snapshot() -> List[Tuple[str, Dict[str, Dict[str, Any]]]]:
+    """Copy of the job table, taken on the event loop for the supervisor thread"""
+    return [(session_id, dict(session_jobs)) for session_id, session_jobs in _session_jobs.items()]
+
+def _supervised_jobs(snapshot: List[Tuple[str, Dict[str, Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """Running jobs with the root of their process tree, for the supervisor"""
+    jobs = []
+    for session_id, session_jobs in snapshot:
+        for kind, job in session_jobs.items():
+            if not _job_running(job):
+                continue
+            pid, started_at = None, job["started_at"]
+            if job["engine"] == "pool":
+                handle = POOL.get(job["ref"])
+                pid, started_at = handle.pid, handle.started_at
+            elif job["engine"] == "subprocess":
+                pid = job["ref"].pid
+            elif job["engine"] == "queue":
+                # Uzak işçinin süreçleri bizde değil; yalnızca durma süresi izlenir (kuyrukta beklerken değil)
+                queued = (QUEUE.get(job["ref"]) or {}).get("status") == "queued"
+                started_at = None if queued else started_at
+            jobs.append({
+                "session_id": session_id,
+                "progress_session": job.get("progress_session"),
+                "kind": kind,
+                "pid": pid,
+                "started_at": started_at,
+                "max_seconds": job.get("max_seconds"),
+                "kill": (lambda job=job: _kill_job(job))
+            })
+    return jobs
+
+def _refresh_pid_files(session_ids: List[str]) -> None:
+    """Touch the pid files of collaborator jobs this API worker runs
+
+    Jobs live in the memory of the worker that started them; the leader's
+    pid-file cleanup only sees the files, so a fresh mtime is how another
+    worker's running job stays claimed.
+    """
+    for session_id in session_ids:
+        try:
+            os.utime(SESSIONS_ROOT / session_id / "collaborators_scraping.pid")
+        except OSError:
+            pass
+
+def _supervise_pass(snapshot: List[Tuple[str, Dict[str, Dict[str, Any]]]], housekeeping: bool) -> None:
+    """One supervisor pass over a job table snapshot; runs in a worker thread (queue/pool lookups block)"""
+    active = {session_id for session_id, session_jobs in snapshot
+              if "collaborators" in session_jobs and _job_running(session_jobs["collaborators"])}
+    _refresh_pid_files(sorted(active))
+    SUPERVISOR.sweep(_supervised_jobs(snapshot), lambda session_id: session_id in active, housekeeping)
+
+async def supervise_jobs() -> None:
+    """Periodic supervisor pass; orphan Chrome/pid-file cleanup runs at startup and every minute"""
+    tick = 0
+    while True:
+        housekeeping = tick % SUPERVISOR_HOUSEKEEPING_EVERY == 0 and is_leader()
+        try:
+            await asyncio.to_thread(_supervise_pass, _job_snapshot(), housekeeping)
+        except Exception as e:
+            print(f"⚠️ Supervisor pass failed: {e}")
+        tick += 1
+        await asyncio.sleep(SUPERVISOR_INTERVAL)
+
+async def upstream_breaker() -> Dict[str, Any]:
+    return await asyncio.to_thread(get_limiter().breaker)
+
+def upstream_unavailable(breaker: Dict[str, Any]) -> HTTPException:
+    retry_in = int(breaker.get("retry_in") or 0) + 1
+    return HTTPException(status_code=503, headers={"Retry-After": str(retry_in)},
+                         detail=f"YÖK Akademik şu an yanıt vermiyor, yaklaşık {retry_in} sn sonra tekrar deneyin")
+
+async def probe_upstream_loop() -> None:
+    """While the breaker is open, probe the site root once its cool-down passes (leader only)"""
+    while True:
+        await asyncio.sleep(UPSTREAM_PROBE_INTERVAL)
+        try:
+            if is_leader() and await asyncio.to_thread(get_limiter().probe_due):
+                result = await asyncio.to_thread(probe_upstream)
+                breaker = await upstream_breaker()
+                print(f"🩺 Upstream probe {'ok' if result['ok'] else 'failed'} ({result['latency']}s), breaker {breaker['state']}")
+        except Exception as e:
+            print(f"⚠️ Upstream probe failed: {e}")
+
+async def reap_abandoned_jobs() -> None:
+    """Cancel collaborator jobs nobody waits for or polls any more
+
+    Search jobs are bounded by their request's deadline and cancelled when
+    that request disconnects, so only collaborator jobs (which outlive the
+    request that started them) are reaped here.
+    """
+    while True:
+        await asyncio.sleep(10)
+        now = time.time()
+        for session_id, jobs in list(_session_jobs.items()):
+            running = {kind: job for kind, job in jobs.items() if _job_running(job)}
+            if not running:
+                _session_jobs.pop(session_id, None)
+                continue
+            if "collaborators" not in running or _session_waiters.get(session_id, 0) > 0:
+                continue
+            seen_path = SESSIONS_ROOT / session_id / "client_seen"
+            try:
+                last_seen = seen_path.stat().st_mtime
+            except OSError:
+                last_seen = min(job["started_at"] for job in running.values())
+            if now - last_seen > ABANDON_GRACE_SECONDS:
+                cancel_session_jobs(session_id, f"no client for {int(now - last_seen)}s")
+
+@app.on_event("startup")
+async def start_worker_pool():
+    """Provision the browser/driver pair, then fork the scraper workers once"""
+    global POOL, QUEUE
+    # İşçiler ve script süreçleri çözülen yolları ortam değişkenlerinden devralır
+    status = await asyncio.to_thread(provision.provision)
+    if status["status"] == "ok":
+        print(f"🧭 Chrome {status['chrome_version']} + chromedriver {status['chromedriver_version']} "
+              f"(preflight {status.get('preflight_ms')} ms, cached={status['cached']})")
+    else:
+        print(f"⚠️ Driver provisioning: {status['status']} - {status.get('error')}")
+    if SCRAPER_ENGINE == "pool":
+        POOL = WorkerPool()
+        await asyncio.to_thread(POOL.start)
+    elif SCRAPER_ENGINE == "queue":
+        QUEUE = job_queue.open_queue(os.environ.get("SCRAPER_QUEUE_URL", f"sqlite:///{ROOT / 'data' / 'job_queue.db'}"))
+        print(f"📬 Job queue ready: {QUEUE.stats()}")
+
+@app.on_event("shutdown")
+async def stop_cdp_engine():
+    if _cdp_engine is not None:
+        await _cdp_engine.stop()
+    if POOL is not None:
+        await asyncio.to_thread(POOL.shutdown)
+    await asyncio.to_thread(save_graph_snapshot)
+
+def _read_profiles(path: Path) -> List[Dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    if isinstance(data, dict):
+        data = data.get("profiles", [])
+    return data if isinstance(data, list) else []
+
+async def _warm(task: Dict[str, Any]) -> None:
+    researcher = task["researcher"]
+    session_id = f"warm_{int(time.time())}_{researcher['key'].replace(' ', '_')[:40]}_{task['kind']}"
+    deadline = time.time() + WARM_JOB_SECONDS
+    if task["kind"] == "search":
+        job = POOL.submit("search", priority="background", client="cache-warmer", name=researcher["name"],
+                          session_id=session_id, field=researcher["field"], specialties=researcher["specialties"],
+                          email=researcher["email"], sessions_root=str(SESSIONS_ROOT), deadline=deadline)
+        result_file = "main_profile.json"
+    else:
+        job = POOL.submit("collaborators", priority="background", client="cache-warmer", name=researcher["name"],
+                          session_id=session_id, profile_url=researcher["profile_url"],
+                          sessions_root=str(SESSIONS_ROOT), deadline=deadline)
+        result_file = "collaborators.json"
+    WARMER.spend()
+    try:
+        await asyncio.wrap_future(job.future)
+    except Exception as e:
+        print(f"⚠️ Cache warm {task['kind']} for '{researcher['name']}' failed: {e}")
+        return
+    profiles = await asyncio.to_thread(_read_profiles, SESSIONS_ROOT / session_id / result_file)
+    await asyncio.to_thread(remember_profiles, profiles)
+    await asyncio.to_thread(remember_graph, SESSIONS_ROOT / session_id)
+    previous = WARMER.mark_warmed(task, session_id)
+    if previous:
+        shutil.rmtree(SESSIONS_ROOT / previous, ignore_errors=True)
+    print(f"🔥 Warmed {task['kind']} for '{researcher['name']}' ({len(profiles)} records)")
+
+async def warm_cache() -> None:
+    """Refresh popular researchers during the off-peak window, within its job budget"""
+    semaphore = asyncio.Semaphore(max(1, WARM_CONCURRENCY))
+
+    async def run(task: Dict[str, Any]) -> None:
+        async with semaphore:
+            # Pencere kapandıysa veya bütçe bittiyse kalan işleri başlatma
+            if await asyncio.to_thread(WARMER.remaining_budget) > 0:
+                await _warm(task)
+
+    while True:
+        await asyncio.sleep(WARM_CHECK_INTERVAL)
+        if POOL is None:
+            continue
+        try:
+            # Upstream çökmüşken ısıtma işleri yalnızca devre kesiciyi meşgul eder
+            if (await upstream_breaker())["state"] != "closed":
+                continue
+            tasks = await asyncio.to_thread(WARMER.plan)
+            if tasks:
+                print(f"🔥 Cache warming {len(tasks)} tasks (budget left {WARMER.remaining_budget()})")
+                await asyncio.gather(*(run(task) for task in tasks))
+        except Exception as e:
+            print(f"⚠️ Cache warming pass failed: {e}")
+
+@app.on_event("startup")
+async def start_job_reaper():
+    _run_in_background(reap_abandoned_jobs())
+    _run_in_background(supervise_jobs())
+    _run_in_background(probe_upstream_loop())
+    if is_leader():
+        _run_in_background(warm_cache())
+
+@app.on_event("startup")
+async def load_local_indexes():
+    """Index profiles of previous sessions without blocking startup"""
+    # Anlık görüntü silinmiş session'ların grafını da taşır; üzerine mevcut session'lar eklenir
+    restored = await asyncio.to_thread(GRAPH.restore, GRAPH_SNAPSHOT)
+    seen = await asyncio.to_thread(index_stored_sessions)
+    await asyncio.to_thread(save_graph_snapshot)
+    print(f"📇 Local indexes ready: {len(NAME_INDEX)} unique profiles ({seen} records scanned), {len(RECOMMENDER.neighbors)} profiles with known co-authors")
+    print(f"🕸️ Co-author graph: {GRAPH.stats()['nodes']} nodes (snapshot restored: {restored})")
+
+def _profiles_of(data: Any) -> List[Dict[str, Any]]:
+    """Profile list of main_profile.json (email searches wrap it in a dict)"""
+    if isinstance(data, dict):
+        data = data.get("profiles", [])
+    return data if isinstance(data, list) else []
+
+def find_local_profiles(request: SearchRequest) -> List[Dict[str, Any]]:
+    """Exact name matches from the local index, narrowed by email/field filters and the filter expression"""
+    candidates = NAME_INDEX.exact_matches(request.name)
+    if request.email and request.email.strip():
+        email = request.email.strip().lower()
+        candidates = [p for p in candidates if (p.get("email") or "").lower() == email]
+    if request.field_id and request.specialty_ids:
+        field_name, specialty_names = TAXONOMY.resolve(request.field_id, request.specialty_ids)
+        field_filter, specialty_filter = label_filter(field_name, specialty_names)
+        candidates = [
+            p for p in candidates
+            if normalize_label(p.get("green_label")) in field_filter
+            and (not specialty_filter or normalize_label(p.get("blue_label")) in specialty_filter)
+        ]
+    row_filter = compile_filter(request.filter)
+    if row_filter:
+        candidates = [p for p in candidates if row_filter(p)]
+    profiles = []
+    for idx, profile in enumerate(candidates, start=1):
+        profile = {k: v for k, v in profile.items() if k != "score"}
+        profiles.append({"id": idx, **profile})
+    return profiles
+
+@app.get("/api/suggest")
+async def api_suggest(q: str = "", limit: int = 10):
+    """Autocomplete researcher names from locally known profiles"""
+    suggestions = NAME_INDEX.search(q, limit=max(1, min(limit, 50)))
+    return {
+        "success": True,
+        "query": q,
+        "suggestions": suggestions,
+        "total": len(suggestions)
+    }
+
+@app.get("/api/profiles/search")
+async def api_profiles_search(
+    q: str = "",
+    field_id: Optional[int] = None,
+    specialty: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20
+):
+    """Full-text search over scraped profiles with field/specialty facets"""
+    result = await asyncio.to_thread(PROFILE_SEARCH.search, q, field_id, specialty, page, page_size)
+    return {"success": True, **result}
+
+@app.get("/api/recommendations/{profile}")
+async def api_recommendations(profile: str, limit: int = 10):
+    """Similar researchers (keywords, labels, institution) who are not yet co-authors of the profile"""
+    key = profile_key(profile)
+    if not key:
+        raise HTTPException(status_code=400, detail="Geçersiz profil")
+    started = time.perf_counter()
+    recommendations = await asyncio.to_thread(RECOMMENDER.recommend, key, max(1, min(limit, 100)))
+    if not recommendations and key not in RECOMMENDER.rows:
+        raise HTTPException(status_code=404, detail="Profil yerel indekste bulunamadı")
+    return {
+        "success": True,
+        "profile": key,
+        "recommendations": recommendations,
+        "total": len(recommendations),
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+@app.get("/api/supervisor/kills")
+async def api_supervisor_kills(limit: int = 100):
+    """Jobs and orphan browsers killed by the supervisor, newest first"""
+    kills = SUPERVISOR.kills(max(1, min(limit, 500)))
+    return {
+        "success": True,
+        "limits": SUPERVISOR.limits(),
+        "kills": kills,
+        "total": len(kills)
+    }
+
 @app.post("/api/search")
-async def api_search(request: SearchRequest):
+async def api_search(request: SearchRequest, http_request: Request):
     """Search for researchers using Python scraping scripts"""
     print(f"🔍 Searching for researcher: '{request.name}'")
     print(f"🔧 DEBUG: Request data - field_id: {request.field_id}, specialty_ids: {request.specialty_ids}", flush=True)
@@ -43,95 +875,109 @@ async def api_search(request: SearchRequest):
     
     if not request.name or not request.name.strip():
         raise HTTPException(status_code=400, detail="İsim gereklidir")
+    try:
+        # İş başlamadan doğrulanır; iş ifadeyi bir kez derleyip her satırda çalıştırır
+        compile_filter(request.filter)
+    except FilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     session_id = generate_session_id()
     
     # Setup paths
-    scripts_dir = Path("/var/www/akademik-tinder/scripts")
-    session_dir = Path("/var/www/akademik-tinder/public/collaborator-sessions") / session_id
+    session_dir = SESSIONS_ROOT / session_id
     main_profile_path = session_dir / "main_profile.json"
     
     # Create session directory
-    session_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Prepare Python script arguments
-    main_profile_script = scripts_dir / "scrape_main_profile.py"
-    python_args = [
-        "/var/www/akademik-tinder/venv/bin/python",
-        str(main_profile_script),
-        request.name.strip(),
-        session_id
-    ]
+    await asyncio.to_thread(session_dir.mkdir, parents=True, exist_ok=True)
+    http_request.state.session_id = session_id
+    request_profiling(http_request, session_dir)
     
-    # Add email if provided
-    if request.email and request.email.strip():
-        python_args.extend(['--email', request.email.strip()])
+    email = request.email.strip() if request.email and request.email.strip() else None
+    max_wait_seconds = 120 if request.email else 60  # Email varsa 2 dakika, yoksa 1 dakika
+    deadline = request_deadline(http_request, max_wait_seconds)
     
-    # Add field and specialties if provided
+    # Resolve field and specialties if provided
+    field_name, specialty_names = None, []
     if request.field_id and request.specialty_ids:
-        # Load fields data (assuming it exists)
-        fields_path = Path("/var/www/akademik-tinder/public/fields.json")
-        if fields_path.exists():
-            try:
-                with open(fields_path, 'r', encoding='utf-8') as f:
-                    fields_data = json.load(f)
-                
-                field_obj = None
-                if isinstance(fields_data, list):
-                    field_obj = next((f for f in fields_data if f.get('id') == request.field_id), None)
-                
-                if field_obj:
-                    field_name = field_obj.get('name', '')
-                    print(f"🔧 DEBUG: Field found - {field_name}", flush=True)
-                    if field_name:
-                        python_args.extend(['--field', field_name])
-                        
-                        # Handle specialties
-                        if "all" in request.specialty_ids:
-                            specialty_names = [s.get('name', '') for s in field_obj.get('specialties', [])]
-                        else:
-                            specialty_names = [
-                                s.get('name', '') for s in field_obj.get('specialties', [])
-                                if s.get('id') in request.specialty_ids or str(s.get('id')) in request.specialty_ids
-                            ]
-                        
-                        if specialty_names:
-                            python_args.extend(['--specialties', ','.join(specialty_names)])
-            except Exception as e:
-                print(f"⚠️ Fields data load error: {e}")
+        field_name, specialty_names = TAXONOMY.resolve(request.field_id, request.specialty_ids)
+        if field_name:
+            print(f"🔧 DEBUG: Field found - {field_name}", flush=True)
+    await asyncio.to_thread(REQUEST_LOG.append, {"type": "search", "name": request.name.strip(), "email": email,
+                                                 "field": field_name, "specialties": specialty_names})
     
-    print(f"🔄 Starting scraping with args: {python_args}")
+    # Local first: bilinen profiller varsa tarayıcı açmadan session dosyalarını yaz
+    # Devre kesici açıksa upstream'i beklemek yerine her durumda yerel indekse bakılır
+    source = "yok"
+    breaker = await upstream_breaker()
+    upstream_down = breaker["state"] != "closed"
+    local_profiles = find_local_profiles(request) if request.local_first or upstream_down else []
+    if local_profiles:
+        source = "local"
+        print(f"⚡ Found {len(local_profiles)} profiles in local index, skipping scraping")
+        await asyncio.to_thread(write_json, main_profile_path, local_profiles)
+        await asyncio.to_thread(write_marker, session_dir / "main_done.txt", "completed")
+    elif upstream_down:
+        print(f"🚫 Upstream breaker {breaker['state']}, no local profiles for '{request.name}'")
+        raise upstream_unavailable(breaker)
     
-    # Start the Python script
-    try:
-        process = subprocess.Popen(
-            python_args,
-            cwd="/var/www/akademik-tinder",
-            env={**os.environ, "PATH": "/var/www/akademik-tinder/venv/bin:" + os.environ.get("PATH", "")},
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        
-        print(f"✅ Started scraping process with PID: {process.pid}")
-        
-    except Exception as e:
-        print(f"❌ Failed to start scraping: {e}")
-        raise HTTPException(status_code=500, detail=f"Script başlatılamadı: {str(e)}")
+    # Start the scraper
+    if source == "yok":
+        try:
+            limit = max(1, min(request.limit, MAX_PROFILES_LIMIT)) if request.limit else None
+            start_search_job(session_id, request.name.strip(), email, field_name, specialty_names,
+                             deadline=deadline - JOB_DEADLINE_MARGIN, client=client_key(http_request),
+                             max_profiles=limit, filter_expr=request.filter)
+        except Exception as e:
+            print(f"❌ Failed to start scraping: {e}")
+            raise HTTPException(status_code=500, detail=f"Script başlatılamadı: {str(e)}")
     
     # Wait for main profile scraping to complete
     done_path = session_dir / "main_done.txt"
-    max_wait_seconds = 120 if request.email else 60  # Email varsa 2 dakika, yoksa 1 dakika
-    poll_interval = 0.5
-    waited = 0
+    started_waiting = time.time()
     
-    print(f"⏳ Waiting for scraping to complete (max {max_wait_seconds}s)...")
+    print(f"⏳ Waiting for scraping to complete (max {deadline - time.time():.0f}s)...")
     
-    while waited < max_wait_seconds:
-        if main_profile_path.exists() and done_path.exists():
+    while time.time() < deadline:
+        # İstemci bağlantıyı kapattıysa sonucu kimse okumayacak: işi ve tarayıcıyı durdur
+        if await http_request.is_disconnected():
+            cancel_session_jobs(session_id, "client disconnected")
+            raise HTTPException(status_code=499, detail="İstemci bağlantıyı kapattı")
+        if source == "yok" and await STORE.amarker(done_path) == "unavailable":
+            # İş devre kesici açıldığı için durdu: yerel indeksten dön, o da yoksa 503
+            upstream_down = True
+            local_profiles = find_local_profiles(request)
+            if not local_profiles:
+                raise upstream_unavailable(await upstream_breaker())
+            source = "local"
+            await asyncio.to_thread(write_json, main_profile_path, local_profiles)
+            await asyncio.to_thread(write_marker, done_path, "completed")
+        if request.progressive and source == "yok" and not await aexists(done_path):
+            # Progressive: ilk sayfa yazılınca dön, iş arka planda sonraki sayfaları doldurur
+            profiles = _profiles_of(await STORE.aread_json(main_profile_path))
+            if profiles:
+                print(f"⚡ Returning first {len(profiles)} profiles, search continues in background")
+                await asyncio.to_thread(remember_profiles, profiles)
+                # Tek profil/prefetch işleri arama bitince get_search_progress tarafından başlatılır
+                await asyncio.to_thread(write_json, session_dir / FOLLOWUPS_FILE, {
+                    "email": email, "field_name": field_name, "specialty_names": specialty_names,
+                    "prefetch_top_k": PREFETCH_TOP_K if request.prefetch_top_k is None else request.prefetch_top_k,
+                    "client": client_key(http_request),
+                })
+                return {
+                    "success": True,
+                    "sessionId": session_id,
+                    "profiles": profiles,
+                    "total_profiles": len(profiles),
+                    "cursor": len(profiles),
+                    "completed": False,
+                    "progressive": True,
+                    "source": source,
+                    "upstream": "ok",
+                    "message": f"Devamı için /api/search/{session_id}?since={len(profiles)}"
+                }
+        main_profile_data = await STORE.aread_json(main_profile_path) if await aexists(done_path) else None
+        if main_profile_data is not None:
             try:
-                with open(main_profile_path, 'r', encoding='utf-8') as f:
-                    main_profile_data = json.load(f)
-                
                 profiles = []
                 if isinstance(main_profile_data, list):
                     profiles = main_profile_data
@@ -139,34 +985,15 @@ async def api_search(request: SearchRequest):
                     profiles = main_profile_data['profiles']
                 
                 print(f"✅ Found {len(profiles)} profiles")
+                await asyncio.to_thread(remember_profiles, profiles)
                 
-                # If single profile found, automatically start collaborator scraping
-                if len(profiles) == 1 and (not request.email or not request.email.strip()):
-                    print("🤝 Single profile found, starting collaborator scraping...")
-                    
-                    selected_profile = profiles[0]
-                    collab_script = scripts_dir / "scrape_collaborators.py"
-                    collab_args = [
-                        "/var/www/akademik-tinder/venv/bin/python",
-                        str(collab_script),
-                        selected_profile['name'],
-                        session_id,
-                        selected_profile['url']
-                    ]
-                    
-                    # Start collaborator scraping
-                    try:
-                        collab_process = subprocess.Popen(
-                            collab_args,
-                            cwd="/var/www/akademik-tinder",
-                            env={**os.environ, "PATH": "/var/www/akademik-tinder/venv/bin:" + os.environ.get("PATH", "")},
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.DEVNULL
-                        )
-                        print(f"✅ Started collaborator scraping with PID: {collab_process.pid}")
-                    except Exception as e:
-                        print(f"⚠️ Failed to start collaborator scraping: {e}")
-                    
+                # If single profile found, automatically start collaborator scraping; otherwise prefetch
+                followups = {"collaborators_started": False, "prefetching": 0}
+                if not upstream_down and (source == "yok" or (len(profiles) == 1 and not email)):
+                    k = PREFETCH_TOP_K if request.prefetch_top_k is None else request.prefetch_top_k
+                    followups = search_followups(session_id, profiles, email, field_name, specialty_names, k,
+                                                 client_key(http_request))
+                if followups["collaborators_started"]:
                     # Return immediately, collaborators scraping in background
                     return {
                         "success": True,
@@ -174,7 +1001,9 @@ async def api_search(request: SearchRequest):
                         "profiles": profiles,
                         "collaborators": [],  # Empty initially
                         "total_profiles": len(profiles),
-                        "total_collaborators": 0
+                        "total_collaborators": 0,
+                        "source": source,
+                        "upstream": "unavailable" if upstream_down else "ok"
                     }
                 
                 # Multiple profiles or email search
@@ -182,24 +1011,29 @@ async def api_search(request: SearchRequest):
                     "success": True,
                     "sessionId": session_id, 
                     "profiles": profiles,
-                    "total_profiles": len(profiles)
+                    "total_profiles": len(profiles),
+                    "partial": await STORE.amarker(done_path) == "partial",
+                    "prefetching": followups["prefetching"],
+                    "source": source,
+                    "upstream": "unavailable" if upstream_down else "ok"
                 }
                 
             except Exception as e:
                 print(f"⚠️ Error reading main profile: {e}")
         
-        await asyncio.sleep(poll_interval)
-        waited += poll_interval
+        # main_done.txt oluşunca hemen uyan; bağlantı kopması en geç saniyede bir kontrol edilir
+        if request.progressive and source == "yok":
+            await WATCHER.wait((done_path, main_profile_path), min(1.0, deadline - time.time()))
+        else:
+            await WATCHER.wait((done_path,), min(1.0, deadline - time.time()), baseline=[None])
     
     # Timeout
-    print(f"⏰ Scraping timed out after {waited}s")
+    print(f"⏰ Scraping timed out after {time.time() - started_waiting:.0f}s")
     
     # Check if any profiles were found despite timeout
-    if main_profile_path.exists():
+    main_profile_data = await STORE.aread_json(main_profile_path)
+    if main_profile_data is not None:
         try:
-            with open(main_profile_path, 'r', encoding='utf-8') as f:
-                main_profile_data = json.load(f)
-            
             profiles = []
             if isinstance(main_profile_data, list):
                 profiles = main_profile_data
@@ -219,23 +1053,71 @@ async def api_search(request: SearchRequest):
     
     raise HTTPException(status_code=404, detail="Profil bulunamadı veya zaman aşımı")
 
+@app.get("/api/search/{session_id}")
+async def get_search_progress(session_id: str, http_request: Request, since: int = 0, wait: bool = True):
+    """Profiles of a (progressive) search after the cursor
+
+    wait=True long-polls until a later results page adds profiles or the
+    search finishes; the response carries the next cursor.
+    """
+    session_dir = SESSIONS_ROOT / session_id
+    main_profile_path = session_dir / "main_profile.json"
+    done_path = session_dir / "main_done.txt"
+    if not await aexists(session_dir):
+        raise HTTPException(status_code=404, detail="Session bulunamadı")
+    since = max(0, since)
+    deadline = request_deadline(http_request, LONG_POLL_SECONDS)
+    watched = (main_profile_path, done_path)
+    while True:
+        # Sürüm okumadan önce alınır: arada gelen bir sayfa beklemeyi hemen bitirir
+        versions = await WATCHER.versions(watched)
+        profiles = _profiles_of(await STORE.aread_json(main_profile_path))
+        if not wait or len(profiles) > since or versions[1] is not None or time.time() >= deadline:
+            break
+        await WATCHER.wait(watched, min(1.0, deadline - time.time()), versions)
+        if await http_request.is_disconnected():
+            raise HTTPException(status_code=499, detail="İstemci bağlantıyı kapattı")
+    done_marker = await STORE.amarker(done_path)
+    if done_marker == "unavailable":
+        await asyncio.to_thread((session_dir / FOLLOWUPS_FILE).unlink, missing_ok=True)
+        raise upstream_unavailable(await upstream_breaker())
+    await asyncio.to_thread(remember_profiles, profiles[since:])
+    followups = {"collaborators_started": False, "prefetching": 0}
+    pending = await asyncio.to_thread(_claim_followups, session_dir) if done_marker else None
+    if pending is not None:
+        # Arama bitti: senkron aramanın yapacağı tek profil/prefetch işlerini başlat
+        followups = search_followups(session_id, profiles, **pending)
+    return {
+        "success": True,
+        "sessionId": session_id,
+        "profiles": profiles[since:],
+        "cursor": len(profiles),
+        "total_profiles": len(profiles),
+        "completed": bool(done_marker),
+        "partial": done_marker == "partial",
+        "collaborators_started": followups["collaborators_started"],
+        "prefetching": followups["prefetching"],
+        "timestamp": int(time.time())
+    }
+
 @app.post("/api/collaborators/{session_id}")
-async def api_collaborators(session_id: str, request: dict = None):
+async def api_collaborators(session_id: str, http_request: Request, request: dict = None):
     """Get collaborators for a session or start collaborator scraping"""
     print(f"👥 Getting collaborators for session: {session_id}")
     print(f"🔧 Request data: {request}")
     
-    session_dir = Path("/var/www/akademik-tinder/public/collaborator-sessions") / session_id
+    session_dir = SESSIONS_ROOT / session_id
     collab_path = session_dir / "collaborators.json"
     done_path = session_dir / "collaborators_done.txt"
+    if await aexists(session_dir):
+        await asyncio.to_thread(touch_session, session_dir)
     
     # Check if collaborators already exist
-    if collab_path.exists():
+    collaborators = await STORE.aread_json(collab_path)
+    if collaborators is not None:
         try:
-            with open(collab_path, 'r', encoding='utf-8') as f:
-                collaborators = json.load(f)
-            
-            completed = done_path.exists()
+            completed = await aexists(done_path)
+            await asyncio.to_thread(remember_collaborator_session, session_dir, collaborators)
             
             print(f"✅ Found existing {len(collaborators)} collaborators (completed: {completed})")
             
@@ -251,14 +1133,14 @@ async def api_collaborators(session_id: str, request: dict = None):
     
     # If no collaborators exist, check if we need to start scraping
     main_profile_path = session_dir / "main_profile.json"
-    if not main_profile_path.exists():
+    profiles = await STORE.aread_json(main_profile_path)
+    if profiles is None:
         raise HTTPException(status_code=404, detail="Session bulunamadı")
     
     # Progressive POST: profileId ile çağrılırsa scraping başlat ve anlık dosya içeriği dön
     if request and "profileId" in request:
+        request_profiling(http_request, session_dir)
         try:
-            with open(main_profile_path, 'r', encoding='utf-8') as f:
-                profiles = json.load(f)
             # Find selected profile
             profile_id = request["profileId"]
             selected_profile = None
@@ -269,39 +1151,42 @@ async def api_collaborators(session_id: str, request: dict = None):
             if not selected_profile:
                 raise HTTPException(status_code=404, detail="Seçilen profil bulunamadı")
             # Start collaborator scraping (idempotent)
-            scripts_dir = Path("/var/www/akademik-tinder/scripts")
-            collab_script = scripts_dir / "scrape_collaborators.py"
-            collab_args = [
-                "/var/www/akademik-tinder/venv/bin/python",
-                str(collab_script),
-                selected_profile['name'],
-                session_id,
-                selected_profile['url']
-            ]
             # Sadece aynı anda bir scraping başlat (pid dosyası ile kontrol)
             pid_path = session_dir / "collaborators_scraping.pid"
-            if not pid_path.exists():
+            scraping_started = True
+            upstream_down = False
+            start_error = None
+            if await asyncio.to_thread(_claim_pid_file, pid_path):
+                await asyncio.to_thread(SELECTION_STATS.record, selected_profile)
+                await asyncio.to_thread(REQUEST_LOG.append, {"type": "select", "name": selected_profile.get("name"),
+                                                             "profile_url": selected_profile.get("url")})
                 try:
-                    collab_process = subprocess.Popen(
-                        collab_args,
-                        cwd="/var/www/akademik-tinder",
-                        env={**os.environ, "PATH": "/var/www/akademik-tinder/venv/bin:" + os.environ.get("PATH", "")},
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL
-                    )
-                    with open(pid_path, "w") as pidf:
-                        pidf.write(str(collab_process.pid))
+                    # Önceden çekilmiş işbirlikçiler varsa onları benimse, diğer tahminleri iptal et
+                    job_pid = promote_prefetch(session_id, session_dir, selected_profile, http_request)
+                    if job_pid is None:
+                        breaker = await upstream_breaker()
+                        if breaker["state"] != "closed":
+                            raise UpstreamUnavailable(f"upstream breaker {breaker['state']}")
+                        job_pid = start_collaborator_job(
+                            session_id, selected_profile,
+                            deadline=request_deadline(http_request, COLLABORATOR_TIMEOUT) - JOB_DEADLINE_MARGIN,
+                            client=client_key(http_request)
+                        )
+                    await asyncio.to_thread(pid_path.write_text, str(job_pid))
+                except UpstreamUnavailable as e:
+                    # Tarayıcı açılmaz; istemci mevcut sonuçları ve durumu görür, sonra yeniden seçer
+                    print(f"🚫 Not starting collaborator scraping: {e}")
+                    scraping_started = False
+                    upstream_down = True
+                    pid_path.unlink(missing_ok=True)
                 except Exception as e:
                     print(f"⚠️ Failed to start collaborator scraping: {e}")
+                    scraping_started = False
+                    start_error = str(e)
+                    pid_path.unlink(missing_ok=True)
             # Hemen mevcut collaborators.json'u oku
-            collaborators = []
-            if collab_path.exists():
-                try:
-                    with open(collab_path, 'r', encoding='utf-8') as f:
-                        collaborators = json.load(f)
-                except Exception as e:
-                    print(f"⚠️ Error reading collaborators: {e}")
-            completed = done_path.exists()
+            collaborators = await STORE.aread_json(collab_path, [])
+            completed = await aexists(done_path)
             return {
                 "success": True,
                 "sessionId": session_id,
@@ -309,7 +1194,9 @@ async def api_collaborators(session_id: str, request: dict = None):
                 "collaborators": collaborators,
                 "total_collaborators": len(collaborators),
                 "completed": completed,
-                "scraping_started": True
+                "scraping_started": scraping_started,
+                "upstream": "unavailable" if upstream_down else "ok",
+                "error": start_error
             }
         except Exception as e:
             print(f"⚠️ Error processing profile selection: {e}")
@@ -325,46 +1212,117 @@ async def api_collaborators(session_id: str, request: dict = None):
         "message": "Collaborator scraping için profil seçimi gerekli"
     }
 
+def _collaborators_etag(collab_path: Path, done_path: Path, since: Optional[int]) -> str:
+    """Weak ETag from the file's size/mtime and the done marker"""
+    try:
+        st = collab_path.stat()
+        version = f"{st.st_size}-{st.st_mtime_ns}"
+    except OSError:
+        version = "0"
+    return f'W/"{version}-{_read_marker(done_path) or "running"}-{since if since is not None else "all"}"'
+
+async def wait_for_collaborators(session_id: str, http_request: Request, collab_path: Path, done_path: Path,
+                                 deadline: float, until_done: bool) -> None:
+    """Sleep until collaborators.json or the done marker changes (or, with until_done, the job finishes)
+
+    The shared WATCHER stats the files of all waiters once per
+    WAKE_INTERVAL, so a waiter wakes shortly after a new record lands
+    without polling the disk itself.
+    """
+    watched = (done_path,) if until_done else (collab_path, done_path)
+    initial = await WATCHER.versions(watched)
+    # Bekleyen istemci sayısı: hepsi ayrılırsa iş reaper tarafından iptal edilir
+    _session_waiters[session_id] = _session_waiters.get(session_id, 0) + 1
+    try:
+        while time.time() < deadline and not await aexists(done_path):
+            # İşin sahibi başka bir API işçisi olabilir: o yalnızca client_seen'i görür
+            await asyncio.to_thread(touch_session, collab_path.parent)
+            if await WATCHER.wait(watched, min(1.0, deadline - time.time()), initial) and not until_done:
+                return
+            if await http_request.is_disconnected():
+                print(f"🔌 Waiter for session {session_id} disconnected")
+                raise HTTPException(status_code=499, detail="İstemci bağlantıyı kapattı")
+    finally:
+        _session_waiters[session_id] -= 1
+        if _session_waiters[session_id] <= 0:
+            _session_waiters.pop(session_id, None)
+            await asyncio.to_thread(touch_session, collab_path.parent)
+
+async def _read_collaborators(collab_path: Path) -> List[Dict[str, Any]]:
+    try:
+        collaborators = await asyncio.to_thread(STORE.load_json, collab_path)
+    except ValueError as e:
+        print(f"⚠️ Error reading collaborators file: {e}")
+        raise HTTPException(status_code=500, detail="Collaborators dosyası okunamadı")
+    return collaborators if collaborators is not None else []
+
 @app.get("/api/collaborators/{session_id}")
-async def get_collaborators_progress(session_id: str, wait: bool = True):
-    """Get collaborators for a session - waits for completion if wait=True"""
-    print(f"📊 Getting collaborators for session: {session_id} (wait={wait})")
+async def get_collaborators_progress(session_id: str, http_request: Request, response: Response,
+                                     wait: bool = True, since: Optional[int] = None, hold: float = 0):
+    """Get collaborators for a session - waits for completion if wait=True
+
+    With since=<cursor> only records after the cursor are returned together
+    with the next cursor and the expected total (from the co-author graph);
+    wait=True then long-polls until at least one new record lands or the
+    crawl finishes. hold=<seconds> keeps the job alive that long without
+    polls. Responses carry an ETag and an unchanged If-None-Match gets 304.
+    """
+    print(f"📊 Getting collaborators for session: {session_id} (wait={wait}, since={since})")
     
-    session_dir = Path("/var/www/akademik-tinder/public/collaborator-sessions") / session_id
+    session_dir = SESSIONS_ROOT / session_id
     collab_path = session_dir / "collaborators.json"
     done_path = session_dir / "collaborators_done.txt"
     
     # Check if session exists
-    if not session_dir.exists():
+    if not await aexists(session_dir):
         raise HTTPException(status_code=404, detail="Session bulunamadı")
+    await asyncio.to_thread(touch_session, session_dir)
+    
+    if since is not None:
+        since = max(0, since)
+        if wait and not await aexists(done_path) and len(await _read_collaborators(collab_path)) <= since:
+            await wait_for_collaborators(session_id, http_request, collab_path, done_path,
+                                         request_deadline(http_request, LONG_POLL_SECONDS), until_done=False)
+        etag = await asyncio.to_thread(_collaborators_etag, collab_path, done_path, since)
+        if http_request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        collaborators = await _read_collaborators(collab_path)
+        done_marker = await STORE.amarker(done_path)
+        graph = await STORE.aread_json(session_dir / "graph.json")
+        if hold > 0:
+            await asyncio.to_thread(touch_session, session_dir, hold)
+        response.headers["ETag"] = etag
+        return {
+            "success": True,
+            "sessionId": session_id,
+            "collaborators": collaborators[since:],
+            "cursor": len(collaborators),
+            "total_collaborators": len(collaborators),
+            "expected": len(collaborator_links(graph)) if isinstance(graph, dict) else None,
+            "completed": await aexists(done_path),
+            "partial": done_marker in ("partial", "unavailable"),
+            "upstream_unavailable": done_marker == "unavailable",
+            "timestamp": int(time.time())
+        }
     
     # If wait=True, wait for completion
     if wait:
         print(f"⏳ Waiting for collaborators_done.txt to be created...")
-        wait_time = 0
         max_wait = 300  # 5 dakika maximum wait
-        check_interval = 2  # 2 saniye aralıklarla kontrol
-        
-        while wait_time < max_wait:
-            if done_path.exists():
-                print(f"✅ collaborators_done.txt found after {wait_time} seconds")
-                break
-            
-            await asyncio.sleep(check_interval)
-            wait_time += check_interval
-            
-            if wait_time % 10 == 0:  # Her 10 saniyede log
-                print(f"⏳ Still waiting... {wait_time}s elapsed")
-        
-        if not done_path.exists():
-            print(f"⚠️ Timeout: collaborators_done.txt not found after {max_wait} seconds")
+        started = time.time()
+        await wait_for_collaborators(session_id, http_request, collab_path, done_path,
+                                     request_deadline(http_request, max_wait), until_done=True)
+        wait_time = int(time.time() - started)
+        if not await aexists(done_path):
+            print(f"⚠️ Timeout: collaborators_done.txt not found after {wait_time} seconds")
             raise HTTPException(
                 status_code=408, 
-                detail=f"Collaborator scraping zaman aşımı. {max_wait} saniye sonra tamamlanmadı."
+                detail=f"Collaborator scraping zaman aşımı. {wait_time} saniye sonra tamamlanmadı."
             )
+        print(f"✅ collaborators_done.txt found after {wait_time} seconds")
     
     # Check if scraping is completed
-    completed = done_path.exists()
+    completed = await aexists(done_path)
     
     if not completed and not wait:
         # Non-blocking mode, return current status
@@ -375,32 +1333,299 @@ async def get_collaborators_progress(session_id: str, wait: bool = True):
             "total_collaborators": 0,
             "completed": False,
             "status": "🔄 Scraping devam ediyor...",
-            "message": "Scraping henüz tamamlanmadı. wait=true ile çağırın veya daha sonra tekrar deneyin.",
+            "message": "Scraping henüz tamamlanmadı. wait=true ile çağırın veya since=0 ile artımlı sorgulayın.",
             "timestamp": int(time.time())
         }
     
+    etag = await asyncio.to_thread(_collaborators_etag, collab_path, done_path, None)
+    if http_request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
     # Read final collaborators
-    collaborators = []
-    if collab_path.exists():
-        try:
-            with open(collab_path, 'r', encoding='utf-8') as f:
-                collaborators = json.load(f)
-        except Exception as e:
-            print(f"⚠️ Error reading final collaborators file: {e}")
-            raise HTTPException(status_code=500, detail="Collaborators dosyası okunamadı")
+    collaborators = await _read_collaborators(collab_path)
     
     print(f"✅ Returning {len(collaborators)} final collaborators")
+    await asyncio.to_thread(remember_collaborator_session, session_dir, collaborators)
     
+    done_marker = await STORE.amarker(done_path)
+    response.headers["ETag"] = etag
     return {
         "success": True,
         "sessionId": session_id,
         "collaborators": collaborators,
+        "cursor": len(collaborators),
         "total_collaborators": len(collaborators),
         "completed": True,
+        "partial": done_marker in ("partial", "unavailable"),
+        "upstream_unavailable": done_marker == "unavailable",
         "status": f"✅ Scraping tamamlandı! {len(collaborators)} işbirlikçi bulundu.",
         "timestamp": int(time.time())
     }
 
+def _graph_profiles(graph_keys: List[str], scores: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Graph keys with whatever the local name index knows about them"""
+    return [{**NAME_INDEX.profiles.get(key, {}), "key": key, **(scores or {}).get(key, {})} for key in graph_keys]
+
+@app.get("/api/graph/stats")
+async def api_graph_stats():
+    return {"success": True, **GRAPH.stats()}
+
+@app.get("/api/graph/central")
+async def api_graph_central(field: Optional[str] = None, field_id: Optional[int] = None,
+                            metric: str = "pagerank", limit: int = 20):
+    """Most central researchers (PageRank or degree), optionally within one field"""
+    if field_id is not None:
+        field = (TAXONOMY.get_field(field_id) or {}).get("name")
+        if not field:
+            raise HTTPException(status_code=404, detail="Alan bulunamadı")
+    started = time.perf_counter()
+    central = await asyncio.to_thread(GRAPH.central, field, max(1, min(limit, 200)),
+                                      "degree" if metric == "degree" else "pagerank")
+    scores = {item["key"]: {"score": item["score"], "degree": item["degree"]} for item in central}
+    return {
+        "success": True,
+        "field": field,
+        "metric": metric,
+        "researchers": _graph_profiles([item["key"] for item in central], scores),
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+@app.get("/api/graph/path")
+async def api_graph_path(source: str, target: str, max_hops: int = 8):
+    """Shortest collaboration path between two profiles (keys or URLs)"""
+    source_id, target_id = GRAPH.node(source), GRAPH.node(target)
+    if source_id < 0 or target_id < 0:
+        raise HTTPException(status_code=404, detail="Profil grafta bulunamadı")
+    path = await asyncio.to_thread(GRAPH.shortest_path, source_id, target_id, max(1, min(max_hops, 12)))
+    return {
+        "success": True,
+        "found": path is not None,
+        "hops": len(path) - 1 if path else None,
+        "path": _graph_profiles([GRAPH.keys[i] for i in path]) if path else []
+    }
+
+@app.get("/api/graph/neighborhood/{profile}")
+async def api_graph_neighborhood(profile: str, hops: int = 2, limit: int = 200):
+    """Profiles within `hops` collaboration hops, nearest first"""
+    node = GRAPH.node(profile)
+    if node < 0:
+        raise HTTPException(status_code=404, detail="Profil grafta bulunamadı")
+    distance = await asyncio.to_thread(GRAPH.bfs, node, max(1, min(hops, 4)))
+    reached = [i for i in distance.argsort(kind="stable") if distance[i] > 0][:max(1, min(limit, 2000))]
+    return {
+        "success": True,
+        "profile": GRAPH.keys[node],
+        "degree": GRAPH.degree(node),
+        "total": int((distance > 0).sum()),
+        "neighbors": _graph_profiles([GRAPH.keys[i] for i in reached],
+                                     {GRAPH.keys[i]: {"hops": int(distance[i])} for i in reached})
+    }
+
+@app.get("/api/graph/communities")
+async def api_graph_communities(limit: int = 20):
+    """Largest co-authorship communities (label propagation) with their most central members"""
+    communities = await asyncio.to_thread(GRAPH.community_summary, max(1, min(limit, 100)))
+    for community in communities:
+        community["top"] = _graph_profiles(community["top"])
+    return {"success": True, "communities": communities, "total": len(communities)}
+
+@app.post("/api/crawl")
+async def api_crawl(request: CrawlRequest, http_request: Request):
+    """Start a breadth-first crawl of the co-author graph up to `hops` hops from a profile"""
+    if not request.profile_url.strip():
+        raise HTTPException(status_code=400, detail="profile_url gerekli")
+    breaker = await upstream_breaker()
+    if breaker["state"] != "closed":
+        raise upstream_unavailable(breaker)
+    session_id = generate_session_id()
+    session_dir = SESSIONS_ROOT / session_id
+    await asyncio.to_thread(session_dir.mkdir, parents=True, exist_ok=True)
+    request_profiling(http_request, session_dir)
+    http_request.state.session_id = session_id
+    job_id = start_crawl_job(session_id, request, client=client_key(http_request))
+    return {
+        "success": True,
+        "sessionId": session_id,
+        "jobId": job_id,
+        "message": f"Tarama başlatıldı ({request.hops} adım). /api/crawl/{session_id}?since=0 ile takip edin."
+    }
+
+def _read_crawl_events(path: Path, since: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+    """Complete lines of crawl.jsonl after the cursor, and the next cursor"""
+    events = []
+    cursor = since
+    try:
+        with open(path, encoding="utf-8") as f:
+            for idx, line in enumerate(f):
+                if idx < since:
+                    continue
+                if len(events) >= limit or not line.endswith("\n"):
+                    break
+                events.append(json.loads(line))
+                cursor = idx + 1
+    except (OSError, ValueError):
+        pass
+    return events, cursor
+
+@app.get("/api/crawl/{session_id}")
+async def get_crawl_progress(session_id: str, since: int = 0, limit: int = 1000):
+    """Crawl events (node/edge/expanded lines of crawl.jsonl) after the `since` cursor"""
+    session_dir = SESSIONS_ROOT / session_id
+    if not await aexists(session_dir):
+        raise HTTPException(status_code=404, detail="Session bulunamadı")
+    await asyncio.to_thread(touch_session, session_dir)
+    events, cursor = await asyncio.to_thread(_read_crawl_events, session_dir / CRAWL_FILE,
+                                             max(0, since), max(1, min(limit, 5000)))
+    for event in events:
+        if event.get("type") == "edge":
+            GRAPH.add_edge(event["source"], event["target"], event.get("weight", 1))
+    state = await STORE.aread_json(session_dir / CRAWL_STATE_FILE, {})
+    done_marker = await STORE.amarker(session_dir / CRAWL_DONE_FILE)
+    return {
+        "success": True,
+        "sessionId": session_id,
+        "events": events,
+        "cursor": cursor,
+        "pages": state.get("pages", 0),
+        "discovered": len(state.get("seen", {})),
+        "frontier": len(state.get("frontier", {})),
+        "completed": bool(done_marker),
+        "partial": done_marker in ("partial", "unavailable"),
+        "upstream_unavailable": done_marker == "unavailable",
+        "timestamp": int(time.time())
+    }
+
+# --- İşçi düğümleri için kuyruk uçları ---
+
+class QueueLeaseRequest(BaseModel):
+    worker_id: str
+    kinds: List[str] = []
+    lease_seconds: float = job_queue.DEFAULT_LEASE_SECONDS
+
+class QueueWorkerRequest(BaseModel):
+    worker_id: str
+    lease_seconds: float = job_queue.DEFAULT_LEASE_SECONDS
+    result: Any = None
+    error: Optional[str] = None
+
+class QueueEnqueueRequest(BaseModel):
+    kind: str
+    payload: Dict[str, Any]
+    priority: str = "interactive"
+    max_attempts: int = job_queue.DEFAULT_MAX_ATTEMPTS
+
+# Kuyruk uçları yalnızca SCRAPER_QUEUE_TOKEN tanımlıysa uygulamaya eklenir (aşağıda include_router)
+queue_router = APIRouter()
+
+def _queue_guard(http_request: Request) -> job_queue.JobQueue:
+    if QUEUE is None:
+        raise HTTPException(status_code=404, detail="Job queue is not enabled (SCRAPER_ENGINE=queue)")
+    if not QUEUE_TOKEN or http_request.headers.get("X-Queue-Token") != QUEUE_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid queue token")
+    return QUEUE
+
+def _queue_session_dir(session_id: Any) -> Path:
+    try:
+        return resolve_session_dir(session_id, SESSIONS_ROOT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@queue_router.get("/api/queue")
+async def queue_stats(http_request: Request):
+    return await asyncio.to_thread(_queue_guard(http_request).stats)
+
+@queue_router.post("/api/queue/enqueue")
+async def queue_enqueue(body: QueueEnqueueRequest, http_request: Request):
+    queue = _queue_guard(http_request)
+    _queue_session_dir(body.payload.get("session_id"))
+    job_id = await asyncio.to_thread(queue.enqueue, body.kind, body.payload, body.priority, body.max_attempts)
+    return {"id": job_id}
+
+@queue_router.post("/api/queue/lease")
+async def queue_lease(body: QueueLeaseRequest, http_request: Request):
+    queue = _queue_guard(http_request)
+    job = await asyncio.to_thread(queue.lease, body.worker_id, body.kinds or None, body.lease_seconds)
+    return {"job": job}
+
+@queue_router.get("/api/queue/{job_id}")
+async def queue_job(job_id: str, http_request: Request):
+    job = await asyncio.to_thread(_queue_guard(http_request).get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@queue_router.post("/api/queue/{job_id}/heartbeat")
+async def queue_heartbeat(job_id: str, body: QueueWorkerRequest, http_request: Request):
+    queue = _queue_guard(http_request)
+    return {"ok": await asyncio.to_thread(queue.heartbeat, job_id, body.worker_id, body.lease_seconds)}
+
+@queue_router.post("/api/queue/{job_id}/ack")
+async def queue_ack(job_id: str, body: QueueWorkerRequest, http_request: Request):
+    queue = _queue_guard(http_request)
+    return {"ok": await asyncio.to_thread(queue.ack, job_id, body.worker_id, body.result)}
+
+@queue_router.post("/api/queue/{job_id}/fail")
+async def queue_fail(job_id: str, body: QueueWorkerRequest, http_request: Request):
+    queue = _queue_guard(http_request)
+    return {"ok": await asyncio.to_thread(queue.fail, job_id, body.worker_id, body.error or "unknown error")}
+
+@queue_router.post("/api/queue/{job_id}/cancel")
+async def queue_cancel(job_id: str, http_request: Request):
+    return {"ok": await asyncio.to_thread(_queue_guard(http_request).cancel, job_id)}
+
+@queue_router.put("/api/queue/{job_id}/files/{name}")
+async def queue_upload(job_id: str, name: str, worker_id: str, http_request: Request):
+    """Session file pushed by the remote worker holding the job's lease"""
+    queue = _queue_guard(http_request)
+    if name not in job_queue.SESSION_FILES:
+        raise HTTPException(status_code=400, detail="Unknown session file")
+    job = await asyncio.to_thread(queue.get, job_id)
+    if job is None or job["status"] != "leased" or job["worker"] != worker_id:
+        raise HTTPException(status_code=409, detail="Lease not held by this worker")
+    session_dir = _queue_session_dir(job["payload"].get("session_id"))
+    data = await http_request.body()
+
+    def store() -> None:
+        session_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = session_dir / (name + ".upload")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, session_dir / name)
+
+    await asyncio.to_thread(store)
+    return {"ok": True, "bytes": len(data)}
+
+if QUEUE_TOKEN:
+    app.include_router(queue_router)
+elif SCRAPER_ENGINE == "queue":
+    print("⚠️ SCRAPER_QUEUE_TOKEN is not set: /api/queue routes are not mounted, remote workers cannot connect")
+
+@app.get("/api/sessions/{session_id}/timeline")
+async def get_session_timeline(session_id: str):
+    """Span timeline of a session (API requests, jobs, browser steps, parsing, writes)"""
+    session_dir = SESSIONS_ROOT / session_id
+    if not await asyncio.to_thread(session_dir.is_dir):
+        raise HTTPException(status_code=404, detail="Session bulunamadı")
+    spans = await asyncio.to_thread(trace.read_timeline, session_dir)
+    return {
+        "success": True,
+        "sessionId": session_id,
+        "trace_id": trace.trace_id_for(session_dir),
+        "wall_ms": round((max(s["end"] for s in spans) - spans[0]["start"]) * 1000, 2) if spans else 0,
+        "summary": trace.summarize(spans),
+        "spans": spans,
+        "profiles": sorted(p.name for p in session_dir.glob("profile.*.folded"))
+    }
+
+@app.get("/api/sessions/{session_id}/profile/{job}")
+async def get_session_profile(session_id: str, job: str):
+    """Collapsed stacks of a profiled job (job.search / job.collaborators) for flamegraph tools"""
+    path = SESSIONS_ROOT / session_id / trace.PROFILE_FILE.format(job)
+    if "/" in job:
+        raise HTTPException(status_code=404, detail="Profil bulunamadı")
+    try:
+        return PlainTextResponse(await asyncio.to_thread(path.read_text, encoding="utf-8"))
+    except OSError:
+        raise HTTPException(status_code=404, detail="Profil bulunamadı")
+
 @app.get("/")
 async def root():
     return {
@@ -415,14 +1640,18 @@ async def root():
         ],
         "endpoints": [
             "/api/search",
+            "/api/suggest",
+            "/api/profiles/search",
+            "/api/supervisor/kills",
             "/api/collaborators/{session_id}",
+            "/api/sessions/{session_id}/timeline",
             "/health"
         ]
     }
 
 @app.get("/health")
 async def health():
-    scripts_dir = Path("/var/www/akademik-tinder/scripts")
+    scripts_dir = SCRIPTS_DIR
     return {
         "status": "healthy",
         "timestamp": time.time(),
@@ -430,7 +1659,19 @@ async def health():
             "scrape_main_profile": (scripts_dir / "scrape_main_profile.py").exists(),
             "scrape_collaborators": (scripts_dir / "scrape_collaborators.py").exists()
         },
-        "venv_path": "/var/www/akademik-tinder/venv/bin/python"
+        "venv_path": str(ROOT / "venv" / "bin" / "python"),
+        "scraper_engine": SCRAPER_ENGINE,
+        "cdp_browser_pid": _cdp_engine.pid if _cdp_engine else None,
+        "worker_pool": POOL.stats() if POOL else None,
+        "job_queue": await asyncio.to_thread(QUEUE.stats) if QUEUE else None,
+        "driver": provision.STATUS,
+        "upstream": await asyncio.to_thread(get_limiter().snapshot),
+        "cache_warmer": WARMER.stats(),
+        "recommender": RECOMMENDER.stats(),
+        "graph": GRAPH.stats(),
+        "session_cache": STORE.stats(),
+        "long_poll_waiters": len(WATCHER),
+        "leader": is_leader()
     }
 
 if __name__ == "__main__":
@@ -442,4 +1683,9 @@ if __name__ == "__main__":
     print("    - Session-based processing")
     print("    - Automatic collaborator detection")
     print("    - Retry logic and timeouts")
-    uvicorn.run(app, host="0.0.0.0", port=3002) 
\ No newline at end of file
+    # Birden çok işçi: session durumu dosyalarda, tekil döngüler lider işçide (is_leader)
+    workers = int(os.environ.get("API_WORKERS", "1"))
+    if workers > 1:
+        uvicorn.run("api_server:app", host="0.0.0.0", port=3002, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=3002) 
\ No newline at end of file
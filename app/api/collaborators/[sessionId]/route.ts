@@ -8,6 +8,13 @@ export async function GET(request: NextRequest, context: { params: Promise<{ ses
     const { sessionId } = await context.params;
     const collabPath = path.join(process.cwd(), "public", "collaborator-sessions", sessionId, "collaborators.json");
     const donePath = path.join(process.cwd(), "public", "collaborator-sessions", sessionId, "collaborators_done.txt");
+    // İstemci hâlâ takipte: api_server bu dosyanın mtime'ına bakarak terk edilmiş işleri iptal eder
+    const seenPath = path.join(process.cwd(), "public", "collaborator-sessions", sessionId, "client_seen");
+    if (fs.existsSync(path.dirname(seenPath))) {
+      try {
+        fs.writeFileSync(seenPath, "");
+      } catch (e) { /* yazılamazsa takip etmeden devam et */ }
+    }
     if (!fs.existsSync(collabPath)) {
       return NextResponse.json({ collaborators: [], completed: false });
     }
@@ -41,21 +48,32 @@ export async function POST(request: NextRequest, { params }: { params: Promise<{
     // Python scriptini başlat
     const scriptsDir = path.join(process.cwd(), "scripts");
     const collabScript = path.join(scriptsDir, "scrape_collaborators.py");
-    const pythonArgs = [collabScript, selectedProfile.name, sessionId, selectedProfile.url];
+    const maxWaitMs = 240000; // 4 dakika
+    // Scraper'a mutlak son tarih (epoch saniye) verilir; sonuç yazması için 2 sn pay
+    const deadline = String(Date.now() / 1000 + maxWaitMs / 1000 - 2);
+    const pythonArgs = [collabScript, selectedProfile.name, sessionId, selectedProfile.url, deadline];
     const pythonProc = spawn("python", pythonArgs, { 
-      detached: true, 
+      detached: true, // yalnızca ayrı süreç grubu için; istek iptal edilirse grup öldürülür
       stdio: "ignore",
       windowsHide: true  // Windows'ta CMD penceresini gizle
     });
-    pythonProc.unref();
+    const kill = () => {
+      try {
+        if (pythonProc.pid) process.kill(-pythonProc.pid, "SIGKILL");
+      } catch (e) { /* süreç zaten bitmiş */ }
+    };
+    request.signal.addEventListener("abort", kill, { once: true });
+    pythonProc.on("exit", () => request.signal.removeEventListener("abort", kill));
     // collaborators.json dosyasını bekle (polling)
     const collabPath = path.join(sessionDir, "collaborators.json");
     const donePath = path.join(sessionDir, "collaborators_done.txt");
     let collaborators = [];
     let waited = 0;
-    const maxWaitMs = 240000; // 4 dakika
     const pollInterval = 500;
     while (waited < maxWaitMs) {
+      if (request.signal.aborted) {
+        return NextResponse.json({ error: "İstemci bağlantıyı kapattı" }, { status: 499 });
+      }
       if (fs.existsSync(collabPath) && fs.existsSync(donePath)) {
         try {
           collaborators = JSON.parse(fs.readFileSync(collabPath, "utf-8"));
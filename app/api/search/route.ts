@@ -8,6 +8,34 @@ function generateSessionId() {
   return `session_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
 }
 
+// Scraper'a verilen mutlak son tarih (epoch saniye); sonuçları yazması için 2 sn pay bırakılır
+function deadlineArg(maxWaitMs: number) {
+  return String(Date.now() / 1000 + maxWaitMs / 1000 - 2);
+}
+
+// Scraper'ı isteğe bağla: istemci ayrılırsa süreç grubu (chromedriver ve Chrome dahil) öldürülür
+function spawnScraper(args: string[], signal: AbortSignal) {
+  const proc = spawn("/var/www/akademik-tinder/venv/bin/python", args, {
+    cwd: process.cwd(),
+    env: { ...process.env, PATH: "/var/www/akademik-tinder/venv/bin:" + process.env.PATH },
+    detached: true, // yalnızca ayrı süreç grubu için; unref edilmez
+    stdio: "ignore",
+    windowsHide: true  // Windows'ta CMD penceresini gizle
+  });
+  const kill = () => {
+    try {
+      if (proc.pid) process.kill(-proc.pid, "SIGKILL");
+    } catch (e) { /* süreç zaten bitmiş */ }
+  };
+  signal.addEventListener("abort", kill, { once: true });
+  proc.on("exit", () => signal.removeEventListener("abort", kill));
+  return proc;
+}
+
+function clientGone() {
+  return NextResponse.json({ error: "İstemci bağlantıyı kapattı" }, { status: 499 });
+}
+
 export async function POST(request: NextRequest) {
   try {
     const { name, email, fieldId, specialtyIds } = await request.json();
@@ -33,22 +61,16 @@ export async function POST(request: NextRequest) {
       }
       // Profil scraping script'ini başlat
       const mainProfileScript = path.join(scriptsDir, "scrape_main_profile.py");
-      const pythonArgs = [mainProfileScript, name.trim(), sessionId, '--field', fieldName, '--specialties', specialtyNames.join(",")];
-      const pythonProc = spawn("/var/www/akademik-tinder/venv/bin/python", pythonArgs, { 
-        cwd: process.cwd(),
-        env: { ...process.env, PATH: "/var/www/akademik-tinder/venv/bin:" + process.env.PATH },
-        detached: true, 
-        stdio: "ignore",
-        windowsHide: true  // Windows'ta CMD penceresini gizle
-      });
+      const maxWaitMsField = 60000; // 1 dakika
+      const pythonArgs = [mainProfileScript, name.trim(), sessionId, '--field', fieldName, '--specialties', specialtyNames.join(","), '--deadline', deadlineArg(maxWaitMsField)];
+      spawnScraper(pythonArgs, request.signal);
       fs.mkdirSync(sessionDir, { recursive: true });
-      pythonProc.unref();
       // main_profile.json ve main_done.txt oluşana kadar bekle
       const donePath = path.join(sessionDir, "main_done.txt");
       let waited = 0;
       const pollInterval = 500;
-      const maxWaitMsField = 60000; // 1 dakika
       while (waited < maxWaitMsField) {
+        if (request.signal.aborted) return clientGone();
         if (fs.existsSync(mainProfilePath) && fs.existsSync(donePath)) {
           break;
         }
@@ -71,22 +93,17 @@ export async function POST(request: NextRequest) {
         // Tek profil bulunduysa otomatik olarak işbirlikçi scraping başlat
         const selectedProfile = profiles[0];
         const collabScript = path.join(scriptsDir, "scrape_collaborators.py");
-        const pythonArgs2 = [collabScript, selectedProfile.name, sessionId, selectedProfile.url];
-            const pythonProc2 = spawn("/var/www/akademik-tinder/venv/bin/python", pythonArgs2, {
-              cwd: process.cwd(),
-              env: { ...process.env, PATH: "/var/www/akademik-tinder/venv/bin:" + process.env.PATH },
-              detached: true,
-              stdio: "ignore"
-            });
-        pythonProc2.unref();
+        const maxWaitMs2 = 240000; // 4 dakika
+        const pythonArgs2 = [collabScript, selectedProfile.name, sessionId, selectedProfile.url, deadlineArg(maxWaitMs2)];
+        spawnScraper(pythonArgs2, request.signal);
         // İşbirlikçi scraping tamamlanana kadar bekle
         const collabPath = path.join(sessionDir, "collaborators.json");
         const doneCollabPath = path.join(sessionDir, "collaborators_done.txt");
         let collaborators = [];
         let waited2 = 0;
-        const maxWaitMs2 = 240000; // 4 dakika
         const pollInterval2 = 500;
         while (waited2 < maxWaitMs2) {
+          if (request.signal.aborted) return clientGone();
           if (fs.existsSync(collabPath) && fs.existsSync(doneCollabPath)) {
             try {
               collaborators = JSON.parse(fs.readFileSync(collabPath, "utf-8"));
@@ -115,21 +132,16 @@ export async function POST(request: NextRequest) {
     // Email ile arama veya sadece isimle arama
     const mainProfileScript = path.join(scriptsDir, "scrape_main_profile.py");
     let pythonArgs = [mainProfileScript, name.trim(), sessionId];
+    const maxWaitMs = email && email.trim() ? 120000 : 60000; // Email varsa 2 dakika, yoksa 1 dakika
     
     // Email varsa ekle
     if (email && email.trim()) {
       pythonArgs.push('--email', email.trim());
     }
+    pythonArgs.push('--deadline', deadlineArg(maxWaitMs));
     
-    const pythonProc = spawn("/var/www/akademik-tinder/venv/bin/python", pythonArgs, { 
-        cwd: process.cwd(),
-        env: { ...process.env, PATH: "/var/www/akademik-tinder/venv/bin:" + process.env.PATH },
-      detached: true, 
-      stdio: "ignore",
-      windowsHide: true  // Windows'ta CMD penceresini gizle
-    });
+    spawnScraper(pythonArgs, request.signal);
     fs.mkdirSync(sessionDir, { recursive: true });
-    pythonProc.unref();
 
     // main_profile.json ve main_done.txt dosyalarını bekle
     const donePath = path.join(sessionDir, "main_done.txt");
@@ -139,9 +151,9 @@ export async function POST(request: NextRequest) {
     let profiles: any[] = [];
     let waited = 0;
     const pollInterval = 500;
-    const maxWaitMs = email && email.trim() ? 120000 : 60000; // Email varsa 2 dakika, yoksa 1 dakika
     
     while (waited < maxWaitMs) {
+      if (request.signal.aborted) return clientGone();
       // Hem main_profile.json hem de main_done.txt dosyası var mı kontrol et
       if (fs.existsSync(mainProfilePath) && fs.existsSync(donePath)) {
         try {
@@ -192,23 +204,17 @@ export async function POST(request: NextRequest) {
       // Tek profil bulunduysa otomatik olarak işbirlikçi scraping başlat
       const selectedProfile = profiles[0];
       const collabScript = path.join(scriptsDir, "scrape_collaborators.py");
-      const pythonArgs = [collabScript, selectedProfile.name, sessionId, selectedProfile.url];
-      const pythonProc2 = spawn("/var/www/akademik-tinder/venv/bin/python", pythonArgs, { 
-        cwd: process.cwd(),
-        env: { ...process.env, PATH: "/var/www/akademik-tinder/venv/bin:" + process.env.PATH },
-        detached: true, 
-        stdio: "ignore",
-        windowsHide: true  // Windows'ta CMD penceresini gizle
-      });
-      pythonProc2.unref();
+      const maxWaitMs2 = 240000; // 4 dakika
+      const pythonArgs = [collabScript, selectedProfile.name, sessionId, selectedProfile.url, deadlineArg(maxWaitMs2)];
+      spawnScraper(pythonArgs, request.signal);
       // İşbirlikçi scraping tamamlanana kadar bekle
       const collabPath = path.join(sessionDir, "collaborators.json");
       const donePath = path.join(sessionDir, "collaborators_done.txt");
       let collaborators = [];
       let waited2 = 0;
-      const maxWaitMs2 = 240000; // 4 dakika
       const pollInterval2 = 500;
       while (waited2 < maxWaitMs2) {
+        if (request.signal.aborted) return clientGone();
         if (fs.existsSync(collabPath) && fs.existsSync(donePath)) {
           try {
             collaborators = JSON.parse(fs.readFileSync(collabPath, "utf-8"));
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Off-peak cache warming from the API request log
+
+api_server.py appends every search and profile selection to
+logs/requests.jsonl. The warmer ranks researchers by frequency and recency
+(each request decays with a half-life), and during the configured
+off-peak window refreshes their search results and collaborator graphs
+until the window's job budget is spent. The jobs run at background
+priority in the worker pool, so the scraper concurrency and upstream rate
+limits apply to them like to any other job.
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from name_index import fold_name
+
+# Yalnızca bu kadar eski istekler sıralamaya girer
+LOG_MAX_AGE_DAYS = 30
+
+
+class RequestLog:
+    """Append-only JSON lines log of searches and selections"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, event: Dict[str, Any]) -> None:
+        line = json.dumps({"ts": time.time(), **event}, ensure_ascii=False)
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        except OSError as e:
+            print(f"⚠️ Request log write failed: {e}")
+
+    def entries(self, since: float = 0.0) -> Iterator[Dict[str, Any]]:
+        try:
+            f = open(self.path, encoding="utf-8")
+        except OSError:
+            return
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("ts", 0) >= since:
+                    yield entry
+
+
+def rank_researchers(entries: Iterator[Dict[str, Any]], now: float, half_life_hours: float) -> List[Dict[str, Any]]:
+    """Researchers by decayed request count; keeps the latest filters and selected profile"""
+    researchers: Dict[str, Dict[str, Any]] = {}
+    half_life = half_life_hours * 3600
+    for entry in entries:
+        key = fold_name(entry.get("name"))
+        if not key:
+            continue
+        researcher = researchers.setdefault(key, {
+            "key": key, "name": entry["name"], "email": None, "field": None, "specialties": [],
+            "profile_url": None, "score": 0.0, "count": 0, "last_seen": 0.0,
+        })
+        researcher["score"] += 0.5 ** (max(0.0, now - entry["ts"]) / half_life)
+        researcher["count"] += 1
+        if entry["ts"] >= researcher["last_seen"]:
+            researcher["last_seen"] = entry["ts"]
+            if entry.get("type") == "search":
+                researcher.update(name=entry["name"], email=entry.get("email"),
+                                  field=entry.get("field"), specialties=entry.get("specialties") or [])
+        if entry.get("type") == "select" and entry.get("profile_url"):
+            researcher["profile_url"] = entry["profile_url"]
+    return sorted(researchers.values(), key=lambda r: -r["score"])
+
+
+def window_start(window: str, now: datetime) -> Optional[datetime]:
+    """Start of the "HH:MM-HH:MM" window containing now (may wrap midnight), else None"""
+    try:
+        start_text, end_text = window.split("-")
+        start = datetime.strptime(start_text.strip(), "%H:%M").time()
+        end = datetime.strptime(end_text.strip(), "%H:%M").time()
+    except ValueError:
+        return None
+    today_start = datetime.combine(now.date(), start)
+    if start <= end:
+        return today_start if start <= now.time() < end else None
+    if now.time() >= start:
+        return today_start
+    if now.time() < end:
+        return today_start - timedelta(days=1)
+    return None
+
+
+class CacheWarmer:
+    """Plans warming jobs and tracks what was refreshed and how much budget is spent"""
+
+    def __init__(self, log: RequestLog, state_path: Path, window: str, budget: int,
+                 max_age_hours: float = 24.0, half_life_hours: float = 72.0, top_n: int = 50):
+        self.log = log
+        self.state_path = Path(state_path)
+        self.window = window
+        self.budget = budget
+        self.max_age = max_age_hours * 3600
+        self.half_life_hours = half_life_hours
+        self.top_n = top_n
+        self.state: Dict[str, Any] = {"warmed": {}, "window": None, "spent": 0}
+        try:
+            self.state.update(json.loads(self.state_path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            pass
+
+    def _save(self) -> None:
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self.state, ensure_ascii=False), encoding="utf-8")
+            tmp_path.replace(self.state_path)
+        except OSError as e:
+            print(f"⚠️ Cache warmer state could not be saved: {e}")
+
+    def remaining_budget(self, now: Optional[datetime] = None) -> int:
+        """Jobs left in the current off-peak window (0 outside it)"""
+        start = window_start(self.window, now or datetime.now())
+        if start is None or self.budget <= 0:
+            return 0
+        if self.state["window"] != start.isoformat():
+            self.state.update(window=start.isoformat(), spent=0)
+            self._save()
+        return max(0, self.budget - self.state["spent"])
+
+    def plan(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Warming tasks for the top researchers whose cache is older than max_age, within budget"""
+        now = now or time.time()
+        budget = self.remaining_budget()
+        tasks: List[Dict[str, Any]] = []
+        ranked = rank_researchers(self.log.entries(now - LOG_MAX_AGE_DAYS * 86400), now, self.half_life_hours)
+        for researcher in ranked[:self.top_n]:
+            warmed = self.state["warmed"].get(researcher["key"], {})
+            if now - warmed.get("search", 0) > self.max_age:
+                tasks.append({"kind": "search", "researcher": researcher})
+            if researcher["profile_url"] and now - warmed.get("collaborators", 0) > self.max_age:
+                tasks.append({"kind": "collaborators", "researcher": researcher})
+            if len(tasks) >= budget:
+                break
+        return tasks[:budget]
+
+    def spend(self) -> None:
+        self.state["spent"] += 1
+        self._save()
+
+    def mark_warmed(self, task: Dict[str, Any], session_id: str) -> Optional[str]:
+        """Record a refresh; returns the session it replaces (to be deleted)"""
+        warmed = self.state["warmed"].setdefault(task["researcher"]["key"], {})
+        previous = warmed.get(f"{task['kind']}_session")
+        warmed[task["kind"]] = time.time()
+        warmed[f"{task['kind']}_session"] = session_id
+        self._save()
+        return previous
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "budget": self.budget,
+            "remaining": self.remaining_budget(),
+            "warmed_researchers": len(self.state["warmed"]),
+        }
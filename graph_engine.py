@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Compact co-authorship graph engine for Akademik YÖK
+
+Profiles are interned to int32 ids (by profile key) and field labels to
+uint16 codes. Edges are appended to flat arrays and compiled lazily into
+an undirected CSR adjacency (indptr/indices/weights), so per node the
+engine keeps a label code, an indptr slot and the cached PageRank and
+community arrays, plus 8 bytes per edge direction. BFS, shortest
+collaboration paths, degree, PageRank and label-propagation communities
+all run as vectorized numpy/scipy passes over the CSR arrays; centrality
+and communities are cached until the graph changes.
+
+snapshot()/restore() persist the interned tables and edge list in one
+.npz file, so a restarted API does not have to re-read every session.
+"""
+
+import json
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from name_index import profile_key
+from taxonomy import normalize_label
+
+# Güncellemeler en fazla bu sıklıkla CSR'ı yeniden kurar
+REBUILD_INTERVAL = 10.0
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOL = 1e-6
+PAGERANK_MAX_ITER = 100
+COMMUNITY_MAX_ITER = 20
+
+
+def _pack(strings: List[str]) -> np.ndarray:
+    return np.frombuffer("\n".join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack(data: np.ndarray) -> List[str]:
+    text = data.tobytes().decode("utf-8")
+    return text.split("\n") if text else []
+
+
+class GraphEngine:
+    """Interned co-author graph with CSR adjacency and cached analytics"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.ids: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.label_ids: Dict[str, int] = {"": 0}
+        self.labels: List[str] = [""]
+        self._node_label = array("H")
+        # Ham kenar listesi (her ortaklık bir kez, sonradan tekilleştirilir)
+        self._src = array("i")
+        self._dst = array("i")
+        self._weight = array("f")
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.weights = np.zeros(0, dtype=np.float32)
+        self._dirty = False
+        self._built_at = 0.0
+        self._pagerank: Optional[np.ndarray] = None
+        self._communities: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    # --- Ekleme ---
+
+    def intern(self, url: Optional[str]) -> int:
+        """Id of a profile (by URL or key), creating it on first sight; -1 for empty"""
+        key = profile_key(url)
+        if not key:
+            return -1
+        with self._lock:
+            node = self.ids.get(key)
+            if node is None:
+                node = self.ids[key] = len(self.keys)
+                self.keys.append(key)
+                self._node_label.append(0)
+                self._dirty = True
+            return node
+
+    def set_label(self, url: Optional[str], label: Optional[str]) -> None:
+        label = normalize_label(label)
+        node = self.intern(url)
+        if node < 0 or not label:
+            return
+        with self._lock:
+            code = self.label_ids.get(label)
+            if code is None:
+                code = self.label_ids[label] = len(self.labels)
+                self.labels.append(label)
+            self._node_label[node] = code
+
+    def add_profiles(self, profiles: Iterable[Dict[str, Any]]) -> None:
+        for profile in profiles or []:
+            if isinstance(profile, dict) and profile.get("url") and not profile.get("deleted"):
+                self.set_label(profile["url"], profile.get("green_label"))
+
+    def _has_edge(self, source: int, target: int, weight: float) -> bool:
+        """Edge already in the built CSR with at least this weight (rows have sorted indices)"""
+        if max(source, target) >= len(self.indptr) - 1:
+            return False
+        start, end = self.indptr[source], self.indptr[source + 1]
+        pos = start + int(np.searchsorted(self.indices[start:end], target))
+        return pos < end and self.indices[pos] == target and self.weights[pos] >= weight
+
+    def add_edge(self, a: Optional[str], b: Optional[str], weight: float = 1.0) -> None:
+        source, target = self.intern(a), self.intern(b)
+        if source < 0 or target < 0 or source == target:
+            return
+        with self._lock:
+            # Tekrar gelen bir graf (aynı session'ın yeniden okunması) önbellekleri geçersiz kılmasın
+            if self._has_edge(source, target, float(weight or 1)):
+                return
+            self._src.append(source)
+            self._dst.append(target)
+            self._weight.append(float(weight or 1))
+            self._dirty = True
+
+    def add_graph(self, center_url: Optional[str], graph: Dict[str, Any]) -> None:
+        """Edges of a scraped co-author graph (graph.json); the center node is center_url"""
+        nodes = graph.get("nodes", [])
+        hrefs = [center_url if n.get("center") else n.get("href") for n in nodes]
+        for edge in graph.get("edges", []):
+            try:
+                self.add_edge(hrefs[edge["source"]], hrefs[edge["target"]], edge.get("weight", 1))
+            except (IndexError, KeyError, TypeError):
+                continue
+
+    def add_graph_file(self, path: Path) -> None:
+        try:
+            graph = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(graph, dict):
+            self.add_graph(graph.get("profile_url"), graph)
+
+    def add_crawl_file(self, path: Path) -> None:
+        """Edge events of a multi-hop crawl (crawl.jsonl)"""
+        try:
+            f = open(path, encoding="utf-8")
+        except OSError:
+            return
+        with f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get("type") == "edge":
+                    self.add_edge(event.get("source"), event.get("target"), event.get("weight", 1))
+
+    # --- CSR ---
+
+    def _edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Deduplicated undirected edges (a < b), keeping the largest observed weight"""
+        src = np.frombuffer(self._src, dtype=np.int32) if len(self._src) else np.zeros(0, np.int32)
+        dst = np.frombuffer(self._dst, dtype=np.int32) if len(self._dst) else np.zeros(0, np.int32)
+        weight = np.frombuffer(self._weight, dtype=np.float32) if len(self._weight) else np.zeros(0, np.float32)
+        a, b = np.minimum(src, dst).astype(np.int64), np.maximum(src, dst).astype(np.int64)
+        pair = a * max(len(self.keys), 1) + b
+        order = np.lexsort((weight, pair))
+        pair, weight = pair[order], weight[order]
+        last = np.ones(len(pair), dtype=bool)
+        last[:-1] = pair[1:] != pair[:-1]
+        pair, weight = pair[last], weight[last]
+        n = max(len(self.keys), 1)
+        return (pair // n).astype(np.int32), (pair % n).astype(np.int32), weight
+
+    def _rebuild(self) -> None:
+        a, b, weight = self._edge_arrays()
+        # Ham listeyi tekilleştirilmiş haliyle değiştir ki büyümesin
+        self._src, self._dst, self._weight = array("i", a.tobytes()), array("i", b.tobytes()), array("f", weight.tobytes())
+        n = len(self.keys)
+        adjacency = sparse.csr_matrix(
+            (np.concatenate([weight, weight]), (np.concatenate([a, b]), np.concatenate([b, a]))),
+            shape=(n, n), dtype=np.float32,
+        )
+        adjacency.sort_indices()
+        self.indptr = adjacency.indptr.astype(np.int64)
+        self.indices = adjacency.indices.astype(np.int32)
+        self.weights = adjacency.data.astype(np.float32)
+        self._pagerank = None
+        self._communities = None
+        self._dirty = False
+        self._built_at = time.time()
+
+    def _ensure_csr(self) -> None:
+        if self._dirty and (time.time() - self._built_at >= REBUILD_INTERVAL or not len(self.indices)):
+            self._rebuild()
+
+    def _adjacency(self) -> sparse.csr_matrix:
+        n = len(self.indptr) - 1
+        return sparse.csr_matrix((self.weights, self.indices, self.indptr), shape=(n, n))
+
+    def _neighbors(self, frontier: np.ndarray) -> np.ndarray:
+        """Concatenated neighbour ids of every node in frontier (one gather, no Python loop)"""
+        starts, ends = self.indptr[frontier], self.indptr[frontier + 1]
+        lengths = ends - starts
+        if not lengths.sum():
+            return np.zeros(0, dtype=np.int32)
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return self.indices[offsets + np.arange(lengths.sum())]
+
+    # --- Sorgular ---
+
+    def node(self, url: Optional[str]) -> int:
+        return self.ids.get(profile_key(url), -1)
+
+    def degree(self, node: int) -> int:
+        with self._lock:
+            self._ensure_csr()
+            if node < 0 or node >= len(self.indptr) - 1:
+                return 0
+            return int(self.indptr[node + 1] - self.indptr[node])
+
+    def bfs(self, source: int, max_hops: Optional[int] = None) -> np.ndarray:
+        """Hop distance from source to every node (-1 when unreachable), level by level"""
+        with self._lock:
+            self._ensure_csr()
+            n = len(self.indptr) - 1
+            distance = np.full(n, -1, dtype=np.int16)
+            if source < 0 or source >= n:
+                return distance
+            distance[source] = 0
+            frontier = np.array([source], dtype=np.int64)
+            hop = 0
+            while len(frontier) and (max_hops is None or hop < max_hops):
+                hop += 1
+                reached = np.unique(self._neighbors(frontier))
+                frontier = reached[distance[reached] < 0]
+                distance[frontier] = hop
+            return distance
+
+    def shortest_path(self, source: int, target: int, max_hops: int = 8) -> Optional[List[int]]:
+        """Fewest-hop collaboration path between two profiles as a list of node ids"""
+        with self._lock:
+            self._ensure_csr()
+            n = len(self.indptr) - 1
+            if not (0 <= source < n and 0 <= target < n):
+                return None
+            if source == target:
+                return [source]
+            parent = np.full(n, -1, dtype=np.int32)
+            parent[source] = source
+            frontier = np.array([source], dtype=np.int64)
+            for _ in range(max_hops):
+                if not len(frontier):
+                    break
+                lengths = self.indptr[frontier + 1] - self.indptr[frontier]
+                owners = np.repeat(frontier, lengths)
+                reached = self._neighbors(frontier)
+                fresh = parent[reached] < 0
+                reached, owners = reached[fresh], owners[fresh]
+                # Aynı düğüme birden çok ebeveynden ulaşılırsa ilki kalır
+                reached, first = np.unique(reached, return_index=True)
+                parent[reached] = owners[first]
+                if parent[target] >= 0:
+                    path = [target]
+                    while path[-1] != source:
+                        path.append(int(parent[path[-1]]))
+                    return path[::-1]
+                frontier = reached.astype(np.int64)
+            return None
+
+    def pagerank(self) -> np.ndarray:
+        """Weighted PageRank by power iteration (cached until the graph changes)"""
+        with self._lock:
+            self._ensure_csr()
+            if self._pagerank is not None:
+                return self._pagerank
+            adjacency = self._adjacency()
+            n = adjacency.shape[0]
+            if n == 0:
+                self._pagerank = np.zeros(0, dtype=np.float32)
+                return self._pagerank
+            out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+            dangling = out_weight == 0
+            inverse = np.where(dangling, 0, 1 / np.where(dangling, 1, out_weight))
+            transition = (sparse.diags(inverse) @ adjacency).T.tocsr()
+            rank = np.full(n, 1 / n)
+            for _ in range(PAGERANK_MAX_ITER):
+                new = PAGERANK_DAMPING * (transition @ rank + rank[dangling].sum() / n) + (1 - PAGERANK_DAMPING) / n
+                converged = np.abs(new - rank).sum() < PAGERANK_TOL
+                rank = new
+                if converged:
+                    break
+            self._pagerank = rank.astype(np.float32)
+            return self._pagerank
+
+    def _colour_classes(self, owners: np.ndarray) -> List[np.ndarray]:
+        """Independent node sets covering the graph (vectorized Jones-Plassmann colouring)
+
+        Nodes of one class share no edge, so updating a whole class at once
+        cannot make neighbours swap labels back and forth.
+        """
+        n = len(self.indptr) - 1
+        priority = np.random.default_rng(0).permutation(n)
+        colour = np.full(n, -1, dtype=np.int64)
+        classes: List[np.ndarray] = []
+        while (colour < 0).any():
+            uncoloured = colour < 0
+            live = uncoloured[owners] & uncoloured[self.indices]
+            best = np.full(n, -1, dtype=np.int64)
+            np.maximum.at(best, owners[live], priority[self.indices[live]])
+            # Renksiz komşularından daha yüksek öncelikli renksiz düğümler bir sınıf oluşturur
+            chosen = np.flatnonzero(uncoloured & (priority > best))
+            colour[chosen] = len(classes)
+            classes.append(chosen)
+        return classes
+
+    def communities(self) -> np.ndarray:
+        """Community id per node by semi-synchronous weighted label propagation (cached)
+
+        Nodes are updated one colour class at a time, which converges where a
+        fully synchronous update oscillates (paths, stars, bipartite parts):
+
+        >>> g = GraphEngine()
+        >>> g.add_edge("a", "b"); [g.add_edge("hub", leaf) for leaf in "xyz"] and None
+        >>> g.communities().tolist()
+        [0, 0, 1, 1, 1, 1]
+        """
+        with self._lock:
+            self._ensure_csr()
+            if self._communities is not None:
+                return self._communities
+            n = len(self.indptr) - 1
+            labels = np.arange(n, dtype=np.int64)
+            owners = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.indptr))
+            # Her renk sınıfının kenarları; kendi etiketine küçük bir ağırlık: eşitlikte yerinde kalsın
+            steps = []
+            for members in self._colour_classes(owners):
+                in_class = np.zeros(n, dtype=bool)
+                in_class[members] = True
+                edges = np.flatnonzero(in_class[owners])
+                steps.append((
+                    np.concatenate([owners[edges], members]),
+                    np.concatenate([self.indices[edges], members]),
+                    np.concatenate([self.weights[edges], np.full(len(members), 1e-3, dtype=np.float32)]),
+                ))
+            for _ in range(COMMUNITY_MAX_ITER):
+                changed = False
+                for step_owners, step_neighbours, step_weights in steps:
+                    pair = step_owners * n + labels[step_neighbours]
+                    unique_pairs, inverse = np.unique(pair, return_inverse=True)
+                    totals = np.bincount(inverse, weights=step_weights)
+                    pair_owner, pair_label = unique_pairs // n, unique_pairs % n
+                    # Her düğüm için en ağır etiket (eşitlikte küçük etiket)
+                    order = np.lexsort((pair_label, -totals, pair_owner))
+                    first = np.ones(len(order), dtype=bool)
+                    first[1:] = pair_owner[order][1:] != pair_owner[order][:-1]
+                    nodes, best = pair_owner[order][first], pair_label[order][first]
+                    if not np.array_equal(labels[nodes], best):
+                        labels[nodes] = best
+                        changed = True
+                if not changed:
+                    break
+            # Topluluk numaralarını 0..k-1 aralığına sıkıştır
+            _, self._communities = np.unique(labels, return_inverse=True)
+            self._communities = self._communities.astype(np.int32)
+            return self._communities
+
+    def central(self, field: Optional[str] = None, limit: int = 20, metric: str = "pagerank") -> List[Dict[str, Any]]:
+        """Most central profiles, optionally restricted to one field label"""
+        with self._lock:
+            scores = self.pagerank() if metric == "pagerank" else np.diff(self.indptr).astype(np.float32)
+            candidates = np.arange(len(scores))
+            if field:
+                code = self.label_ids.get(normalize_label(field))
+                if code is None:
+                    return []
+                node_label = np.frombuffer(self._node_label, dtype=np.uint16)[:len(scores)]
+                candidates = candidates[node_label == code]
+            if not len(candidates):
+                return []
+            k = min(limit, len(candidates))
+            top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            top = top[np.argsort(-scores[top])]
+            degree = np.diff(self.indptr)
+            return [{"key": self.keys[i], "score": round(float(scores[i]), 6), "degree": int(degree[i])} for i in top]
+
+    def community_summary(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Largest communities with their most central members"""
+        with self._lock:
+            communities = self.communities()
+            rank = self.pagerank()
+            if not len(communities):
+                return []
+            sizes = np.bincount(communities)
+            largest = np.argsort(-sizes)[:limit]
+            result = []
+            for community in largest:
+                members = np.flatnonzero(communities == community)
+                top = members[np.argsort(-rank[members])[:5]]
+                result.append({"community": int(community), "size": int(sizes[community]),
+                               "top": [self.keys[i] for i in top]})
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "nodes": len(self.keys),
+            "edges": int(len(self.indices) // 2),
+            "labels": len(self.labels) - 1,
+            "stale": self._dirty,
+            "array_bytes": int(self.indptr.nbytes + self.indices.nbytes + self.weights.nbytes
+                               + len(self._node_label) * 2 + len(self._src) * 12),
+        }
+
+    # --- Kalıcılık ---
+
+    def snapshot(self, path: Path) -> None:
+        """Write interned tables and the deduplicated edge list to one .npz (atomically)"""
+        path = Path(path)
+        with self._lock:
+            a, b, weight = self._edge_arrays()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp.npz")
+            np.savez(tmp_path, keys=_pack(self.keys), labels=_pack(self.labels[1:]),
+                     node_label=np.frombuffer(self._node_label, dtype=np.uint16) if len(self._node_label) else np.zeros(0, np.uint16),
+                     src=a, dst=b, weight=weight)
+            tmp_path.replace(path)
+
+    def restore(self, path: Path) -> bool:
+        try:
+            with np.load(Path(path)) as data:
+                keys = _unpack(data["keys"])
+                labels = [""] + _unpack(data["labels"])
+                node_label, src, dst, weight = data["node_label"], data["src"], data["dst"], data["weight"]
+        except (OSError, ValueError, KeyError):
+            return False
+        with self._lock:
+            self.keys = keys
+            self.ids = {key: i for i, key in enumerate(keys)}
+            self.labels = labels
+            self.label_ids = {label: i for i, label in enumerate(labels)}
+            self._node_label = array("H", node_label.astype(np.uint16).tobytes())
+            self._src = array("i", src.astype(np.int32).tobytes())
+            self._dst = array("i", dst.astype(np.int32).tobytes())
+            self._weight = array("f", weight.astype(np.float32).tobytes())
+            self._dirty = True
+            self._rebuild()
+        return True
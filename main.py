@@ -4,14 +4,21 @@ Akademik YÖK MCP Server
 
 This MCP server provides tools to interact with the YÖK Academic API.
 It allows searching for researchers and finding their collaborators.
+
+The collaborator tools report MCP progress (profiles found, collaborators
+done out of the expected total, elapsed time) while they poll the API.
+When the client's time budget runs out they return the collaborators
+collected so far with a resume_token; passing it to get_collaborators
+later fetches only the rest.
 """
 
 import asyncio
+import base64
 import json
 import time
 from typing import Any, Dict, List, Optional
 import httpx
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 from pydantic import BaseModel, Field
 
 
@@ -19,16 +26,18 @@ from pydantic import BaseModel, Field
 class Profile(BaseModel):
     id: int
     name: str
-    institution: str
-    email: str
+    institution: str = ""
+    email: Optional[str] = ""
     url: str
 
 
 class SearchResponse(BaseModel):
-    message: str
-    request: Dict[str, Any]
+    message: str = ""
+    request: Dict[str, Any] = {}
     sessionId: str
     profiles: List[Profile]
+    # Tek profil bulunduğunda API işbirlikçi taramasını kendisi başlatır
+    collaborators: Optional[List[Dict[str, Any]]] = None
 
 
 class Collaborator(BaseModel):
@@ -59,10 +68,146 @@ API_CONFIG = {
     "timeout": 120.0,  # Increased from 30 to 120 seconds
     "max_retries": 3,
     "retry_delay": 2.0,
-    "collaborator_timeout": 180.0  # Even longer for collaborator requests
+    "collaborator_timeout": 180.0,  # Even longer for collaborator requests
+    "long_poll": 25.0,  # Seconds each collaborator progress poll may wait on the server
+    "resume_hold": 300.0  # Keep a timed-out collaborator job alive this long for the resume token
 }
 
 
+class ProgressReporter:
+    """MCP progress notifications for one tool call (progress never decreases)"""
+
+    def __init__(self, ctx: Optional[Context], started: Optional[float] = None):
+        self.ctx = ctx
+        self.started = started or time.time()
+        self.progress = 0.0
+
+    def elapsed(self) -> float:
+        return time.time() - self.started
+
+    async def report(self, message: str, progress: Optional[float] = None, total: Optional[float] = None) -> None:
+        text = f"{message} ({self.elapsed():.0f}s)"
+        print(f"📈 {text}")
+        if self.ctx is None:
+            return
+        try:
+            # Ilerleme artmadıysa bildirim yerine log mesajı gönderilir (MCP ilerlemenin artmasını ister)
+            if progress is None or progress <= self.progress:
+                await self.ctx.info(text)
+                return
+            self.progress = progress
+            try:
+                await self.ctx.report_progress(progress=progress, total=total, message=text)
+            except TypeError:
+                # message parametresi olmayan eski fastmcp sürümleri
+                await self.ctx.report_progress(progress=progress, total=total)
+        except Exception as e:
+            print(f"⚠️ Progress notification failed: {str(e)}")
+
+
+async def with_heartbeat(awaitable, reporter: ProgressReporter, message: str, interval: float = 10.0) -> Any:
+    """Await a long call while reporting the elapsed time every interval seconds"""
+    task = asyncio.ensure_future(awaitable)
+    while not task.done():
+        await asyncio.wait({task}, timeout=interval)
+        if not task.done():
+            await reporter.report(message)
+    return task.result()
+
+
+def encode_resume_token(session_id: str, cursor: int) -> str:
+    data = json.dumps({"sessionId": session_id, "cursor": cursor}).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii")
+
+
+def decode_resume_token(token: str) -> Dict[str, Any]:
+    data = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    return {"sessionId": str(data["sessionId"]), "cursor": int(data["cursor"])}
+
+
+async def poll_collaborators(
+    client: httpx.AsyncClient,
+    session_id: str,
+    cursor: int,
+    deadline: float,
+    reporter: ProgressReporter,
+    offset: float = 0
+) -> Dict[str, Any]:
+    """
+    Long-poll the API's collaborator cursor until the job completes or the deadline passes.
+
+    Every batch is reported as progress (offset + collaborators done out of
+    offset + the expected total). Returns the collaborators after the
+    starting cursor and the cursor to resume from.
+    """
+    collaborators: List[Dict[str, Any]] = []
+    status: Dict[str, Any] = {}
+    while True:
+        remaining = deadline - time.time()
+        if remaining < 2:
+            break
+        wait = min(API_CONFIG["long_poll"], remaining - 1)
+        try:
+            response = await client.get(
+                f"{BASE_URL}/api/collaborators/{session_id}",
+                params={"since": cursor, "wait": "true", "hold": API_CONFIG["resume_hold"]},
+                headers={"X-Request-Timeout": str(max(wait, 1))},
+                timeout=remaining
+            )
+            response.raise_for_status()
+            status = response.json()
+        except httpx.HTTPStatusError as e:
+            print(f"❌ Collaborator poll failed: {str(e)}")
+            if e.response.status_code == 404:
+                return {"success": False, "error": f"Session not found: {session_id}", "error_type": "http",
+                        "status_code": 404}
+            await asyncio.sleep(min(API_CONFIG["retry_delay"], max(0, deadline - time.time())))
+            continue
+        except httpx.HTTPError as e:
+            print(f"⏰ Collaborator poll interrupted: {str(e)}")
+            await asyncio.sleep(min(API_CONFIG["retry_delay"], max(0, deadline - time.time())))
+            continue
+        collaborators.extend(status.get("collaborators", []))
+        cursor = status.get("cursor", cursor)
+        expected = status.get("expected")
+        await reporter.report(
+            f"{cursor}/{expected if expected is not None else '?'} collaborators done",
+            progress=offset + cursor,
+            total=offset + expected if expected else None
+        )
+        if status.get("completed"):
+            break
+    return {
+        "success": True,
+        "collaborators": collaborators,
+        "cursor": cursor,
+        "expected": status.get("expected"),
+        "completed": bool(status.get("completed")),
+        "partial": bool(status.get("partial")),
+        "upstream_unavailable": bool(status.get("upstream_unavailable"))
+    }
+
+
+def collaborators_result(session_id: str, polled: Dict[str, Any], since: int = 0) -> Dict[str, Any]:
+    """Tool result for polled collaborators, with a resume token when the job is still running"""
+    result = {
+        "success": True,
+        "sessionId": session_id,
+        "collaborators": polled["collaborators"],
+        "total_collaborators": polled["cursor"],
+        "expected_collaborators": polled["expected"],
+        "since": since,
+        "completed": polled["completed"],
+        "partial": polled["partial"] or not polled["completed"],
+        "upstream_unavailable": polled["upstream_unavailable"]
+    }
+    if not polled["completed"]:
+        result["resume_token"] = encode_resume_token(session_id, polled["cursor"])
+        result["message"] = (f"Time budget reached with {polled['cursor']} collaborators; the scraper keeps running. "
+                             "Call get_collaborators with resume_token to fetch the rest.")
+    return result
+
+
 async def make_api_request(
     client: httpx.AsyncClient,
     method: str,
@@ -86,7 +231,8 @@ async def make_api_request(
                 method,
                 url,
                 json=payload,
-                headers={"Content-Type": "application/json"},
+                # Let the server stop scraping and return partial results before we time out
+                headers={"Content-Type": "application/json", "X-Request-Timeout": str(max(timeout - 5, 1))},
                 timeout=timeout
             )
             response.raise_for_status()
@@ -134,7 +280,8 @@ async def search_researcher(
     email: Optional[str] = None,
     field_id: Optional[int] = None,
     specialty_ids: Optional[List[str]] = None,
-    profile_id: Optional[int] = None
+    profile_id: Optional[int] = None,
+    timeout_seconds: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Search for researchers in the YÖK Academic database.
@@ -145,6 +292,7 @@ async def search_researcher(
         field_id: Field ID for filtering (optional)
         specialty_ids: List of specialty IDs for filtering (optional)
         profile_id: Profile ID for filtering (optional)
+        timeout_seconds: Time budget for the search (default: the configured API timeout)
     
     Returns:
         Dictionary containing search results with sessionId and profiles
@@ -171,7 +319,7 @@ async def search_researcher(
                 method="POST",
                 url=f"{BASE_URL}/api/search",
                 payload=payload,
-                timeout=API_CONFIG["timeout"]
+                timeout=min(timeout_seconds or API_CONFIG["timeout"], API_CONFIG["timeout"])
             )
             
             if not api_result["success"]:
@@ -189,7 +337,8 @@ async def search_researcher(
                 "message": search_response.message,
                 "sessionId": search_response.sessionId,
                 "profiles": [profile.dict() for profile in search_response.profiles],
-                "total_profiles": len(search_response.profiles)
+                "total_profiles": len(search_response.profiles),
+                "collaborators_started": search_response.collaborators is not None
             }
             
     except Exception as e:
@@ -201,54 +350,101 @@ async def search_researcher(
         }
 
 
+async def collect_collaborators(
+    client: httpx.AsyncClient,
+    session_id: str,
+    researcher_name: Optional[str],
+    profile_id: Optional[int],
+    cursor: int,
+    start: bool,
+    deadline: float,
+    reporter: ProgressReporter,
+    offset: float = 0
+) -> Dict[str, Any]:
+    """Start collaborator scraping (unless resuming) and poll it until completion or the deadline"""
+    if start:
+        # Fixed payload - include researcher name if available
+        payload = {
+            "name": researcher_name or "",
+            "sessionId": session_id  # Include session ID in payload
+        }
+        if profile_id is not None:
+            payload["profileId"] = profile_id
+        # İşin kendi süresi istemcinin bütçesinden bağımsız: bütçe dolarsa resume_token ile devam edilir
+        api_result = await make_api_request(
+            client=client,
+            method="POST",
+            url=f"{BASE_URL}/api/collaborators/{session_id}",
+            payload=payload,
+            timeout=API_CONFIG["collaborator_timeout"]  # Longer timeout for collaborators
+        )
+        if not api_result["success"]:
+            return api_result
+        started = api_result["data"]
+        if isinstance(started, dict) and started.get("scraping_started") is False:
+            # İş hiç başlamadı: süre boyunca beklemek ve geçersiz bir resume_token dönmek yerine hemen bildir
+            unavailable = started.get("upstream") == "unavailable"
+            return {
+                "success": False,
+                "error": "YÖK Akademik is currently unavailable, try again later" if unavailable
+                         else f"Collaborator scraping could not be started: {started.get('error') or 'unknown error'}",
+                "error_type": "upstream_unavailable" if unavailable else "start_failed",
+                "session_id": session_id,
+                "collaborators": started.get("collaborators") or []
+            }
+        await reporter.report("Collaborator scraping started")
+    polled = await poll_collaborators(client, session_id, cursor, deadline, reporter, offset)
+    if not polled["success"]:
+        return polled
+    print(f"✅ Collaborators retrieved. {polled['cursor']} collaborators (completed: {polled['completed']})")
+    return collaborators_result(session_id, polled, since=cursor)
+
+
 @mcp.tool()
-async def get_collaborators(session_id: str, researcher_name: Optional[str] = None) -> Dict[str, Any]:
+async def get_collaborators(
+    session_id: str,
+    researcher_name: Optional[str] = None,
+    profile_id: Optional[int] = None,
+    resume_token: Optional[str] = None,
+    timeout_seconds: Optional[float] = None,
+    ctx: Context = None
+) -> Dict[str, Any]:
     """
     Get collaborators for a researcher using their session ID from a previous search.
     
+    Reports progress as collaborators are scraped. If timeout_seconds runs out
+    first, the collaborators found so far are returned with a resume_token;
+    call again with it to get only the remaining ones.
+    
     Args:
         session_id: The session ID obtained from search_researcher tool
         researcher_name: Optional researcher name to include in payload
+        profile_id: Profile to get collaborators for when the search found several (optional)
+        resume_token: Token from an earlier partial result (optional)
+        timeout_seconds: Time budget for this call (default: the configured collaborator timeout)
     
     Returns:
         Dictionary containing collaborator information
     """
     
     print(f"👥 Getting collaborators for session: {session_id}")
+    reporter = ProgressReporter(ctx)
+    deadline = reporter.started + (timeout_seconds or API_CONFIG["collaborator_timeout"])
+    
+    cursor = 0
+    if resume_token:
+        try:
+            token = decode_resume_token(resume_token)
+        except (ValueError, KeyError, TypeError) as e:
+            return {"success": False, "error": f"Invalid resume token: {str(e)}", "error_type": "validation"}
+        if token["sessionId"] != session_id:
+            return {"success": False, "error": "Resume token belongs to another session", "error_type": "validation"}
+        cursor = token["cursor"]
     
     try:
         async with httpx.AsyncClient() as client:
-            # Fixed payload - include researcher name if available
-            payload = {
-                "name": researcher_name or "",
-                "sessionId": session_id  # Include session ID in payload
-            }
-            
-            api_result = await make_api_request(
-                client=client,
-                method="POST",
-                url=f"{BASE_URL}/api/collaborators/{session_id}",
-                payload=payload,
-                timeout=API_CONFIG["collaborator_timeout"]  # Longer timeout for collaborators
-            )
-            
-            if not api_result["success"]:
-                return api_result
-            
-            result = api_result["data"]
-            
-            # Validate response structure
-            collaborators_response = CollaboratorsResponse(**result)
-            
-            print(f"✅ Collaborators retrieved. Found {len(collaborators_response.collaborators)} collaborators")
-            
-            return {
-                "success": True,
-                "sessionId": collaborators_response.sessionId,
-                "profile": collaborators_response.profile.dict(),
-                "collaborators": [collab.dict() for collab in collaborators_response.collaborators],
-                "total_collaborators": len(collaborators_response.collaborators)
-            }
+            return await collect_collaborators(client, session_id, researcher_name, profile_id, cursor,
+                                               start=not resume_token, deadline=deadline, reporter=reporter)
             
     except Exception as e:
         print(f"💥 Collaborators retrieval failed with unexpected error: {str(e)}")
@@ -266,11 +462,18 @@ async def search_and_get_collaborators(
     field_id: Optional[int] = None,
     specialty_ids: Optional[List[str]] = None,
     profile_id: Optional[int] = None,
-    researcher_index: int = 0
+    researcher_index: int = 0,
+    timeout_seconds: Optional[float] = None,
+    ctx: Context = None
 ) -> Dict[str, Any]:
     """
     Complete workflow: Search for a researcher and automatically get their collaborators.
     
+    Reports progress for both steps (profiles found, collaborators done out of
+    the expected total, elapsed time). If timeout_seconds runs out while
+    collaborators are still being scraped, the ones found so far are returned
+    with a resume_token for get_collaborators.
+    
     Args:
         name: The name of the researcher to search for (required)
         email: Email address of the researcher (optional)
@@ -278,6 +481,7 @@ async def search_and_get_collaborators(
         specialty_ids: List of specialty IDs for filtering (optional)
         profile_id: Profile ID for filtering (optional)
         researcher_index: Index of researcher to get collaborators for if multiple found (default: 0)
+        timeout_seconds: Time budget for the whole workflow (default: search + collaborator timeouts)
     
     Returns:
         Dictionary containing both search results and collaborator information
@@ -285,16 +489,20 @@ async def search_and_get_collaborators(
     
     print(f"🚀 Starting complete workflow for: '{name}'")
     start_time = time.time()
+    reporter = ProgressReporter(ctx, start_time)
+    deadline = start_time + (timeout_seconds or API_CONFIG["timeout"] + API_CONFIG["collaborator_timeout"])
     
     # Step 1: Search for researcher
     print("📝 Step 1: Searching for researcher...")
-    search_result = await search_researcher(
+    await reporter.report(f"Searching for '{name}'")
+    search_result = await with_heartbeat(search_researcher(
         name=name,
         email=email,
         field_id=field_id,
         specialty_ids=specialty_ids,
-        profile_id=profile_id
-    )
+        profile_id=profile_id,
+        timeout_seconds=deadline - time.time()
+    ), reporter, f"Searching for '{name}'")
     
     if not search_result.get("success", False):
         return {
@@ -335,11 +543,20 @@ async def search_and_get_collaborators(
             "step_failed": "search"
         }
     
+    await reporter.report(f"{len(profiles)} profiles found", progress=1)
+    
     print("👥 Step 2: Getting collaborators...")
-    collaborators_result = await get_collaborators(
-        session_id=session_id,
-        researcher_name=selected_researcher["name"]
-    )
+    try:
+        async with httpx.AsyncClient() as client:
+            # Tek profilde API taramayı zaten başlattı; aksi halde seçilen profil için başlatılır
+            collaborators_result = await collect_collaborators(
+                client, session_id, selected_researcher["name"], selected_researcher["id"], cursor=0,
+                start=not search_result.get("collaborators_started"), deadline=deadline,
+                reporter=reporter, offset=1
+            )
+    except Exception as e:
+        print(f"💥 Collaborators retrieval failed with unexpected error: {str(e)}")
+        collaborators_result = {"success": False, "error": f"Collaborators error: {str(e)}", "error_type": "unexpected"}
     
     end_time = time.time()
     total_time = end_time - start_time
@@ -349,7 +566,9 @@ async def search_and_get_collaborators(
     # Combine results
     return {
         "success": True,
-        "workflow_completed": True,
+        "workflow_completed": collaborators_result.get("completed", False),
+        "partial": collaborators_result.get("partial", False),
+        "resume_token": collaborators_result.get("resume_token"),
         "execution_time": total_time,
         "search_result": search_result,
         "collaborators_result": collaborators_result,
@@ -369,8 +588,8 @@ def main():
     print("🚀 Starting Akademik YÖK MCP Server...")
     print("📚 Available tools:")
     print("  - search_researcher: Search for researchers")
-    print("  - get_collaborators: Get collaborators using session ID")  
-    print("  - search_and_get_collaborators: Complete workflow")
+    print("  - get_collaborators: Get collaborators using session ID (resumable)")  
+    print("  - search_and_get_collaborators: Complete workflow with progress notifications")
     print(f"\n🌐 API Base URL: {BASE_URL}")
     print(f"⚙️  Configuration:")
     print(f"    - Default timeout: {API_CONFIG['timeout']}s")
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Local researcher-name index for Akademik YÖK
+
+Keeps every profile seen so far (main searches and collaborator pages) in
+memory and answers fuzzy/prefix name lookups without opening a browser.
+"""
+
+import json
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Türkçe harfleri ASCII karşılıklarına indir (İ/ı dahil)
+_TURKISH_FOLD = str.maketrans({
+    "İ": "i", "I": "i", "ı": "i",
+    "Ş": "s", "ş": "s",
+    "Ğ": "g", "ğ": "g",
+    "Ç": "c", "ç": "c",
+    "Ö": "o", "ö": "o",
+    "Ü": "u", "ü": "u",
+})
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+# Profil kaydında tutulan alanlar
+PROFILE_FIELDS = ("name", "title", "url", "photoUrl", "header", "green_label", "blue_label", "keywords", "email")
+
+# Yerel sonuç "kesin eşleşme" sayılması için gereken minimum skor
+LOCAL_MATCH_THRESHOLD = 0.9
+
+
+def fold_name(text: Optional[str]) -> str:
+    """Turkish-aware, diacritic-free, lowercase form used for name matching"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text.translate(_TURKISH_FOLD))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return _NON_ALNUM_RE.sub(" ", text).strip()
+
+
+def trigrams(folded: str) -> Set[str]:
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def profile_key(url: Optional[str]) -> str:
+    """Stable key for a profile URL (authorId when present, otherwise the URL)"""
+    if not url:
+        return ""
+    try:
+        query = parse_qs(urlparse(url).query)
+    except ValueError:
+        return url
+    author_id = query.get("authorId") or query.get("authorid")
+    return author_id[0] if author_id else url
+
+
+class NameIndex:
+    """Trigram + token-prefix index over known profiles"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.profiles: Dict[str, Dict[str, Any]] = {}
+        self._folded: Dict[str, str] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        # (token, key) çiftleri sıralı tutulur, prefix araması bisect ile yapılır
+        self._tokens: List[Tuple[str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def add(self, profile: Dict[str, Any]) -> None:
+        url = profile.get("url")
+        name = profile.get("name")
+        if not url or not name or profile.get("deleted"):
+            return
+        key = profile_key(url)
+        with self._lock:
+            record = self.profiles.setdefault(key, {})
+            # Boş alanlar mevcut (daha detaylı) bilgiyi ezmesin
+            for field in PROFILE_FIELDS:
+                value = profile.get(field)
+                if value:
+                    record[field] = value
+            folded = fold_name(record["name"])
+            old = self._folded.get(key)
+            if old == folded:
+                return
+            if old is not None:
+                self._unindex(key, old)
+            self._folded[key] = folded
+            for gram in trigrams(folded):
+                self._trigrams.setdefault(gram, set()).add(key)
+            for token in folded.split():
+                pos = bisect_left(self._tokens, (token, key))
+                self._tokens.insert(pos, (token, key))
+
+    def add_many(self, profiles: Iterable[Dict[str, Any]]) -> None:
+        for profile in profiles or []:
+            if isinstance(profile, dict):
+                self.add(profile)
+
+    def _unindex(self, key: str, folded: str) -> None:
+        for gram in trigrams(folded):
+            keys = self._trigrams.get(gram)
+            if keys:
+                keys.discard(key)
+        for token in folded.split():
+            pos = bisect_left(self._tokens, (token, key))
+            if pos < len(self._tokens) and self._tokens[pos] == (token, key):
+                del self._tokens[pos]
+
+    def _prefix_keys(self, prefix: str) -> Set[str]:
+        keys = set()
+        pos = bisect_left(self._tokens, (prefix, ""))
+        while pos < len(self._tokens) and self._tokens[pos][0].startswith(prefix):
+            keys.add(self._tokens[pos][1])
+            pos += 1
+        return keys
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Ranked suggestions: exact > every token prefix-matched > trigram similarity"""
+        folded_query = fold_name(query)
+        if not folded_query:
+            return []
+        query_tokens = folded_query.split()
+        query_grams = trigrams(folded_query)
+
+        with self._lock:
+            # Her sorgu kelimesi bir isim kelimesinin başlangıcı olmalı (autocomplete)
+            prefix_hits: Optional[Set[str]] = None
+            for token in query_tokens:
+                hits = self._prefix_keys(token)
+                prefix_hits = hits if prefix_hits is None else prefix_hits & hits
+            prefix_hits = prefix_hits or set()
+
+            gram_counts: Dict[str, int] = {}
+            for gram in query_grams:
+                for key in self._trigrams.get(gram, ()):
+                    gram_counts[key] = gram_counts.get(key, 0) + 1
+
+            scored = []
+            for key in prefix_hits | set(gram_counts):
+                folded = self._folded[key]
+                if folded == folded_query:
+                    score = 1.0
+                else:
+                    # Dice katsayısı, prefix eşleşmesine bonus
+                    dice = 2.0 * gram_counts.get(key, 0) / (len(query_grams) + len(trigrams(folded)))
+                    score = 0.5 + 0.39 * dice if key in prefix_hits else 0.5 * dice
+                if score >= 0.12:
+                    scored.append((score, key))
+
+            scored.sort(key=lambda item: (-item[0], self._folded[item[1]]))
+            return [
+                {**self.profiles[key], "score": round(score, 3)}
+                for score, key in scored[:limit]
+            ]
+
+    def exact_matches(self, query: str) -> List[Dict[str, Any]]:
+        """Profiles whose folded name equals the query (candidates for local-first search)"""
+        return [p for p in self.search(query, limit=100) if p["score"] >= LOCAL_MATCH_THRESHOLD]
+
+    def load_sessions(self, sessions_root: Path) -> int:
+        """Index main_profile.json and collaborators.json of every stored session"""
+        before = len(self.profiles)
+        for profiles in iter_session_profiles(sessions_root):
+            self.add_many(profiles)
+        return len(self.profiles) - before
+
+
+def iter_session_profiles(sessions_root: Path) -> Iterator[List[Dict[str, Any]]]:
+    """Yield the profile lists stored in each session's main_profile.json and collaborators.json"""
+    for session_dir in sorted(Path(sessions_root).glob("session_*")):
+        for filename in ("main_profile.json", "collaborators.json"):
+            path = session_dir / filename
+            if not path.exists():
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Could not read {path}: {e}")
+                continue
+            if isinstance(data, dict):
+                data = data.get("profiles", [])
+            if isinstance(data, list):
+                yield data
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Speculative collaborator prefetch for Akademik YÖK searches
+
+When a search returns several profiles, the likeliest picks are ranked
+(filter match, email match, how often each profile was chosen before) and
+their collaborator crawls start at background priority under
+<session>/prefetch/<profileId>/. When the user selects a profile its
+prefetched files are adopted into the session and the other crawls are
+cancelled.
+"""
+
+import json
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from name_index import profile_key
+from taxonomy import normalize_label
+
+# Benimsenen prefetch dosyaları (done işareti en son kopyalanır)
+PREFETCH_FILES = ("graph.json", "collaborators.json", "collaborators_done.txt")
+
+# Sıralama ağırlıkları
+EMAIL_MATCH_SCORE = 10.0
+EMAIL_DOMAIN_SCORE = 2.0
+FIELD_MATCH_SCORE = 3.0
+SPECIALTY_MATCH_SCORE = 2.0
+SELECTION_SCORE = 1.0
+
+
+class SelectionStats:
+    """How often each profile was selected, persisted as a small JSON file"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        try:
+            self._counts = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            pass
+
+    def record(self, profile: Dict[str, Any]) -> None:
+        key = profile_key(profile.get("url"))
+        if not key:
+            return
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            data = json.dumps(self._counts)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(data, encoding="utf-8")
+            tmp_path.replace(self.path)
+        except OSError as e:
+            print(f"⚠️ Selection stats could not be saved: {e}")
+
+    def count(self, profile: Dict[str, Any]) -> int:
+        return self._counts.get(profile_key(profile.get("url")), 0)
+
+
+def score_profile(profile: Dict[str, Any], field_filter: FrozenSet[str], specialty_filter: FrozenSet[str],
+                  email: Optional[str], stats: SelectionStats) -> float:
+    score = 0.0
+    profile_email = (profile.get("email") or "").lower()
+    if email and profile_email:
+        if profile_email == email.lower():
+            score += EMAIL_MATCH_SCORE
+        elif profile_email.rsplit("@", 1)[-1] == email.lower().rsplit("@", 1)[-1]:
+            score += EMAIL_DOMAIN_SCORE
+    if field_filter and normalize_label(profile.get("green_label")) in field_filter:
+        score += FIELD_MATCH_SCORE
+    if specialty_filter and normalize_label(profile.get("blue_label")) in specialty_filter:
+        score += SPECIALTY_MATCH_SCORE
+    return score + SELECTION_SCORE * stats.count(profile)
+
+
+def rank_candidates(profiles: List[Dict[str, Any]], k: int, field_filter: FrozenSet[str],
+                    specialty_filter: FrozenSet[str], email: Optional[str],
+                    stats: SelectionStats) -> List[Dict[str, Any]]:
+    """Top-k profiles with a URL; ties keep the search result order"""
+    candidates = [p for p in profiles if p.get("url")]
+    ranked = sorted(
+        enumerate(candidates),
+        key=lambda item: (-score_profile(item[1], field_filter, specialty_filter, email, stats), item[0])
+    )
+    return [profile for _, profile in ranked[:max(0, k)]]
+
+
+def prefetch_session_id(session_id: str, profile_id: Any) -> str:
+    """Session id (relative to the sessions root) a prefetch crawl writes into"""
+    return f"{session_id}/prefetch/{profile_id}"
+
+
+def adopt_prefetch(session_dir: Path, profile_id: Any) -> Dict[str, bool]:
+    """Copy a prefetched crawl into the session; reports whether it had a graph and had finished"""
+    source = session_dir / "prefetch" / str(profile_id)
+    copied = {name: False for name in PREFETCH_FILES}
+    for name in PREFETCH_FILES:
+        if (source / name).exists():
+            shutil.copy2(source / name, session_dir / name)
+            copied[name] = True
+    return {"graph": copied["graph.json"], "done": copied["collaborators_done.txt"]}
+
+
+def link_prefetch(session_dir: Path, profile_id: Any) -> None:
+    """Point the session's files at a prefetch crawl that is still writing (relative symlinks)"""
+    for name in PREFETCH_FILES:
+        target = session_dir / name
+        if target.is_symlink() or target.exists():
+            target.unlink()
+        target.symlink_to(Path("prefetch") / str(profile_id) / name)
+
+
+def discard_prefetch(session_dir: Path, keep: Any = None) -> None:
+    """Delete prefetched crawls (except the one a running adopted crawl still writes into)"""
+    root = session_dir / "prefetch"
+    if keep is None:
+        shutil.rmtree(root, ignore_errors=True)
+        return
+    for path in root.glob("*"):
+        if path.name != str(keep):
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Full-text profile search for Akademik YÖK
+
+SQLite FTS5 index over scraped profiles (name, title, header, labels and
+keywords) that is updated incrementally as sessions produce results.
+Facet counts per field/specialty are kept up to date on every write.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from name_index import fold_name, profile_key
+from taxonomy import Taxonomy, normalize_label
+
+# FTS sütunları ve bm25 ağırlıkları (isim ve anahtar kelimeler daha önemli)
+FTS_COLUMNS = ("name", "title", "header", "green_label", "blue_label", "keywords")
+BM25_WEIGHTS = (5.0, 1.0, 1.0, 2.0, 2.0, 3.0)
+
+MAX_PAGE_SIZE = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    name TEXT NOT NULL,
+    title TEXT,
+    header TEXT,
+    green_label TEXT,
+    blue_label TEXT,
+    keywords TEXT,
+    email TEXT,
+    photoUrl TEXT,
+    field_id INTEGER,
+    specialty TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS profiles_field ON profiles(field_id);
+CREATE INDEX IF NOT EXISTS profiles_specialty ON profiles(specialty);
+CREATE VIRTUAL TABLE IF NOT EXISTS profiles_fts USING fts5(
+    name, title, header, green_label, blue_label, keywords,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS facet_counts (
+    facet TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (facet, value)
+);
+"""
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an AND of prefix terms, safe against FTS syntax"""
+    tokens = fold_name(text).split()
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _profile_header(profile: Dict[str, Any]) -> str:
+    # İşbirlikçi kayıtlarında kurum bilgisi "info" alanında tek satır olarak tutuluyor
+    header = profile.get("header")
+    if header:
+        return header
+    info = profile.get("info") or ""
+    return info if "\n" not in info else ""
+
+
+class ProfileSearchIndex:
+    """Incrementally updated FTS5 index with precomputed facet counts"""
+
+    def __init__(self, db_path: Path, taxonomy: Taxonomy):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.taxonomy = taxonomy
+        # Kilit yalnızca yazma bağlantısını korur; okumalar WAL sayesinde iş parçacığı başına ayrı bağlantıda
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+
+    def close(self) -> None:
+        with self._lock:
+            for reader in self._readers:
+                reader.close()
+            self._readers.clear()
+            self._conn.close()
+
+    def _reader(self) -> sqlite3.Connection:
+        """Read-only connection of the calling thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    def _bump_facets(self, field_id: Optional[int], specialty: Optional[str], delta: int) -> None:
+        for facet, value in (("field", field_id), ("specialty", specialty)):
+            if value is None or value == "":
+                continue
+            self._conn.execute(
+                "INSERT INTO facet_counts (facet, value, count) VALUES (?, ?, ?) "
+                "ON CONFLICT (facet, value) DO UPDATE SET count = count + excluded.count",
+                (facet, str(value), delta)
+            )
+        self._conn.execute("DELETE FROM facet_counts WHERE count <= 0")
+
+    def _upsert(self, profile: Dict[str, Any]) -> bool:
+        url = profile.get("url")
+        name = profile.get("name")
+        if not url or not name or profile.get("deleted"):
+            return False
+        key = profile_key(url)
+        existing = self._conn.execute("SELECT * FROM profiles WHERE key = ?", (key,)).fetchone()
+
+        record = dict(existing) if existing else {"key": key}
+        # Boş alanlar mevcut (daha detaylı) bilgiyi ezmesin
+        incoming = {
+            "url": url,
+            "name": name,
+            "title": profile.get("title"),
+            "header": _profile_header(profile),
+            "green_label": profile.get("green_label"),
+            "blue_label": profile.get("blue_label"),
+            "keywords": profile.get("keywords"),
+            "email": profile.get("email"),
+            "photoUrl": profile.get("photoUrl"),
+        }
+        for column, value in incoming.items():
+            if value and value != "-":
+                record[column] = value
+        record["field_id"] = self.taxonomy.field_id_for(record.get("green_label"))
+        record["specialty"] = normalize_label(record.get("blue_label")) or None
+        record["updated_at"] = time.time()
+
+        columns = ("key", "url", "name", "title", "header", "green_label", "blue_label",
+                   "keywords", "email", "photoUrl", "field_id", "specialty", "updated_at")
+        values = tuple(record.get(c) for c in columns)
+        if existing:
+            if all(existing[c] == record.get(c) for c in columns if c != "updated_at"):
+                return False
+            self._bump_facets(existing["field_id"], existing["specialty"], -1)
+            self._conn.execute(
+                f"UPDATE profiles SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?",
+                values + (existing["id"],)
+            )
+            rowid = existing["id"]
+            self._conn.execute("DELETE FROM profiles_fts WHERE rowid = ?", (rowid,))
+        else:
+            cursor = self._conn.execute(
+                f"INSERT INTO profiles ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                values
+            )
+            rowid = cursor.lastrowid
+        self._bump_facets(record["field_id"], record["specialty"], 1)
+        # FTS'e Türkçe katlanmış metin yazılır (ı/i ayrımı unicode61 tarafından yapılmıyor)
+        self._conn.execute(
+            f"INSERT INTO profiles_fts (rowid, {', '.join(FTS_COLUMNS)}) VALUES (?, {', '.join('?' for _ in FTS_COLUMNS)})",
+            (rowid,) + tuple(fold_name(record.get(c)) for c in FTS_COLUMNS)
+        )
+        return True
+
+    def upsert_many(self, profiles: Iterable[Dict[str, Any]]) -> int:
+        """Insert or merge profiles; returns how many rows changed"""
+        changed = 0
+        with self._lock, self._conn:
+            for profile in profiles or []:
+                if isinstance(profile, dict) and self._upsert(profile):
+                    changed += 1
+        return changed
+
+    def facet_counts(self) -> Dict[str, Dict[str, int]]:
+        """Precomputed facet counts over the whole index"""
+        rows = self._reader().execute("SELECT facet, value, count FROM facet_counts").fetchall()
+        facets: Dict[str, Dict[str, int]] = {"field": {}, "specialty": {}}
+        for row in rows:
+            facets.setdefault(row["facet"], {})[row["value"]] = row["count"]
+        return facets
+
+    def search(
+        self,
+        query: str = "",
+        field_id: Optional[int] = None,
+        specialty: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20
+    ) -> Dict[str, Any]:
+        """Keyword search with field/specialty facets and pagination"""
+        page = max(1, page)
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        match = _fts_query(query or "")
+
+        where: List[str] = []
+        params: List[Any] = []
+        if match:
+            # MATCH bir kez çalışır; sıralama aynı eşleşmenin bm25 skoruyla yapılır
+            from_sql = "profiles_fts JOIN profiles p ON p.id = profiles_fts.rowid"
+            where.append("profiles_fts MATCH ?")
+            params.append(match)
+        else:
+            from_sql = "profiles p"
+        base_where = list(where)
+        base_params = list(params)
+        if field_id is not None:
+            where.append("p.field_id = ?")
+            params.append(field_id)
+        if specialty:
+            where.append("p.specialty = ?")
+            params.append(normalize_label(specialty))
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+        if match:
+            order_sql = "ORDER BY bm25(profiles_fts, " + ", ".join(str(w) for w in BM25_WEIGHTS) + ")"
+        else:
+            order_sql = "ORDER BY p.updated_at DESC"
+
+        conn = self._reader()
+        # Okuma tek bir işlemde: sayım, sayfa ve facet'ler aynı anlık görüntüden
+        with conn:
+            conn.execute("BEGIN")
+            total = conn.execute(f"SELECT COUNT(*) FROM {from_sql} {where_sql}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT p.* FROM {from_sql} {where_sql} {order_sql} LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size]
+            ).fetchall()
+
+            if not base_where and field_id is None and specialty is None:
+                facets = None
+            else:
+                # Facet sayıları: sorguya uyan küme üzerinde, diğer facet filtresi uygulanarak
+                facets = {"field": {}, "specialty": {}}
+                for facet, column, extra, extra_params in (
+                    ("field", "field_id", "p.specialty = ?" if specialty else None, [normalize_label(specialty)] if specialty else []),
+                    ("specialty", "specialty", "p.field_id = ?" if field_id is not None else None, [field_id] if field_id is not None else []),
+                ):
+                    conditions = base_where + ([extra] if extra else []) + [f"p.{column} IS NOT NULL"]
+                    for row in conn.execute(
+                        f"SELECT p.{column} AS value, COUNT(*) AS count FROM {from_sql} "
+                        f"WHERE {' AND '.join(conditions)} GROUP BY p.{column}",
+                        base_params + extra_params
+                    ):
+                        facets[facet][str(row["value"])] = row["count"]
+
+        if facets is None:
+            facets = self.facet_counts()
+
+        results = []
+        for row in rows:
+            profile = {k: row[k] for k in row.keys() if k not in ("id", "key", "updated_at")}
+            results.append(profile)
+        return {
+            "query": query,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pages": (total + page_size - 1) // page_size,
+            "results": results,
+            "facets": facets
+        }
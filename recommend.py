@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Collaborator recommendations for Akademik YÖK
+
+Every known profile becomes a sparse TF-IDF vector over its keywords
+(whole phrases and words), field and specialty labels and institution
+(first part of the header). Term counts are appended row by row as
+profiles arrive; the L2-normalized TF-IDF matrix is rebuilt from them in
+one vectorized pass by a background thread when it is stale and swapped
+in atomically, so queries never wait for a rebuild: they run a single
+sparse matrix product against the last built matrix (batched for several
+profiles) followed by an argpartition top-k, excluding the profile's
+known co-authors. Profiles added since are scored as queries right away
+and become candidates with the next rebuild.
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from name_index import PROFILE_FIELDS, fold_name, profile_key
+
+# Terim ağırlıkları: etiketler ve kurum tek terim olduğu için daha ağır sayılır
+PHRASE_WEIGHT = 2.0
+WORD_WEIGHT = 1.0
+FIELD_WEIGHT = 1.5
+SPECIALTY_WEIGHT = 2.0
+INSTITUTION_WEIGHT = 1.0
+
+# Güncellemeler en fazla bu sıklıkla matrisi yeniden kurar
+REBUILD_INTERVAL = 10.0
+
+_STOPWORDS = {"ve", "ile", "icin", "bir", "of", "and", "the", "in", "for", "to"}
+
+
+def profile_terms(profile: Dict[str, Any]) -> Dict[str, float]:
+    """Weighted term counts of a profile"""
+    terms: Dict[str, float] = {}
+
+    def add(term: str, weight: float) -> None:
+        if term:
+            terms[term] = terms.get(term, 0.0) + weight
+
+    for phrase in (profile.get("keywords") or "").replace(",", ";").split(";"):
+        folded = fold_name(phrase)
+        if not folded or folded == "-":
+            continue
+        add("kw:" + folded, PHRASE_WEIGHT)
+        for word in folded.split():
+            if len(word) > 2 and word not in _STOPWORDS:
+                add("w:" + word, WORD_WEIGHT)
+    add("field:" + fold_name(profile.get("green_label")), FIELD_WEIGHT)
+    add("spec:" + fold_name(profile.get("blue_label")), SPECIALTY_WEIGHT)
+    header = profile.get("header") or ""
+    add("inst:" + fold_name(header.split("/")[0]), INSTITUTION_WEIGHT)
+    return {term: weight for term, weight in terms.items() if not term.endswith(":")}
+
+
+class Recommender:
+    """Incremental TF-IDF matrix over profiles plus the known co-author graph"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.vocabulary: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.profiles: Dict[str, Dict[str, Any]] = {}
+        self.neighbors: Dict[str, Set[str]] = {}
+        # Ham terim sayıları (satır başına sütun ve ağırlık dizileri)
+        self._row_terms: List[Tuple[np.ndarray, np.ndarray]] = []
+        # (matris, idf) çifti tek atamayla değiştirilir; sorgular kilitsiz okuyabilir
+        self._model: Optional[Tuple[sparse.csr_matrix, np.ndarray]] = None
+        self._dirty = False
+        self._built_at = 0.0
+        self._stale = threading.Event()
+        self._rebuilder: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, profile: Dict[str, Any]) -> None:
+        url = profile.get("url")
+        if not url or profile.get("deleted"):
+            return
+        key = profile_key(url)
+        with self._lock:
+            record = self.profiles.setdefault(key, {})
+            for field in PROFILE_FIELDS:
+                value = profile.get(field)
+                if value:
+                    record[field] = value
+            if "header" not in record and profile.get("info") and "\n" not in profile["info"]:
+                record["header"] = profile["info"]
+            terms = profile_terms(record)
+            columns = np.array([self.vocabulary.setdefault(term, len(self.vocabulary)) for term in terms], dtype=np.int32)
+            weights = np.array(list(terms.values()), dtype=np.float32)
+            row = self.rows.get(key)
+            if row is None:
+                self.rows[key] = len(self.keys)
+                self.keys.append(key)
+                self._row_terms.append((columns, weights))
+            else:
+                self._row_terms[row] = (columns, weights)
+            self._dirty = True
+            self._stale.set()
+            if self._rebuilder is None:
+                self._rebuilder = threading.Thread(target=self._rebuild_loop, name="recommender-rebuild", daemon=True)
+                self._rebuilder.start()
+
+    def add_many(self, profiles: Iterable[Dict[str, Any]]) -> None:
+        for profile in profiles or []:
+            if isinstance(profile, dict):
+                self.add(profile)
+
+    def add_graph(self, center_url: Optional[str], collaborator_urls: Iterable[str]) -> None:
+        """Record co-authorship edges (both directions) so they are never recommended"""
+        center = profile_key(center_url)
+        if not center:
+            return
+        with self._lock:
+            for url in collaborator_urls:
+                other = profile_key(url)
+                if other and other != center:
+                    self.neighbors.setdefault(center, set()).add(other)
+                    self.neighbors.setdefault(other, set()).add(center)
+
+    def add_graph_file(self, path: Path) -> None:
+        try:
+            graph = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self.add_graph(graph.get("profile_url"), (n.get("href") for n in graph.get("nodes", []) if not n.get("center")))
+
+    def _rebuild(self) -> None:
+        """Build the TF-IDF matrix from a snapshot of the rows and swap it in"""
+        # Satır listesi kilit altında kopyalanır (girdiler değiştirilmez, yerine yenisi konur); hesap kilitsiz
+        with self._lock:
+            row_terms = list(self._row_terms)
+            width = len(self.vocabulary)
+            self._dirty = False
+        # Tüm satırlar tek seferde CSR'a, idf ağırlıklandırma ve L2 normalizasyonu vektörel
+        lengths = np.array([len(c) for c, _ in row_terms], dtype=np.int64)
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        indices = np.concatenate([c for c, _ in row_terms]) if row_terms else np.zeros(0, np.int32)
+        data = np.concatenate([w for _, w in row_terms]) if row_terms else np.zeros(0, np.float32)
+        counts = sparse.csr_matrix((data, indices, indptr), shape=(len(row_terms), width))
+        df = np.bincount(indices, minlength=width)
+        idf = (np.log((1 + len(row_terms)) / (1 + df)) + 1).astype(np.float32)
+        matrix = counts.multiply(idf).tocsr()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        self._model = (sparse.csr_matrix(sparse.diags(1 / norms) @ matrix, dtype=np.float32), idf)
+        self._built_at = time.time()
+
+    def _rebuild_loop(self) -> None:
+        # En fazla REBUILD_INTERVAL'da bir yeniden kurar; bu sırada gelen eklemeler bir sonraki tura kalır
+        while True:
+            self._stale.wait()
+            time.sleep(max(0.0, self._built_at + REBUILD_INTERVAL - time.time()))
+            self._stale.clear()
+            try:
+                self._rebuild()
+            except Exception as e:
+                print(f"⚠️ Recommender rebuild failed: {e}")
+
+    def _current_model(self) -> Tuple[sparse.csr_matrix, np.ndarray]:
+        model = self._model
+        if model is None:
+            # Henüz hiç kurulmadıysa (ilk sorgu) bir kez senkron kurulur
+            self._rebuild()
+            model = self._model
+        return model
+
+    def _query_vectors(self, keys: List[str], idf: np.ndarray, width: int) -> sparse.csr_matrix:
+        # Matris kurulduktan sonra gelen profiller ve yeni terimler için vektör anında hesaplanır
+        rows, cols, vals = [], [], []
+        for i, key in enumerate(keys):
+            row = self.rows[key]
+            columns, weights = self._row_terms[row]
+            mask = columns < width
+            tfidf = weights[mask] * idf[columns[mask]]
+            norm = float(np.sqrt((tfidf ** 2).sum())) or 1.0
+            rows.extend([i] * int(mask.sum()))
+            cols.extend(columns[mask].tolist())
+            vals.extend((tfidf / norm).tolist())
+        return sparse.csr_matrix((vals, (rows, cols)), shape=(len(keys), width), dtype=np.float32)
+
+    def recommend_batch(self, keys: List[str], limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """Top-k similar, not-yet-collaborating profiles for several profiles with one matrix product"""
+        if not any(key in self.rows for key in keys):
+            return {key: [] for key in keys}
+        matrix, idf = self._current_model()
+        with self._lock:
+            known = [key for key in keys if key in self.rows]
+            queries = self._query_vectors(known, idf, matrix.shape[1])
+        # Çarpım kilitsiz: eklemeler ve arka plandaki yeniden kurma beklemez
+        scores = (matrix @ queries.T).T.toarray()
+        with self._lock:
+            results: Dict[str, List[Dict[str, Any]]] = {key: [] for key in keys}
+            size = scores.shape[1]
+            for i, key in enumerate(known):
+                row_scores = scores[i]
+                excluded = [self.rows[key]] + [self.rows[n] for n in self.neighbors.get(key, ()) if self.rows.get(n, size) < size]
+                if self.rows[key] < size:
+                    row_scores[excluded] = -1
+                else:
+                    row_scores[excluded[1:]] = -1
+                k = min(limit, size)
+                top = np.argpartition(-row_scores, k - 1)[:k] if k else np.array([], dtype=np.int64)
+                top = top[np.argsort(-row_scores[top])]
+                results[key] = [
+                    {**self.profiles[self.keys[j]], "key": self.keys[j], "score": round(float(row_scores[j]), 4)}
+                    for j in top if row_scores[j] > 0
+                ]
+            return results
+
+    def recommend(self, key: str, limit: int = 10) -> List[Dict[str, Any]]:
+        return self.recommend_batch([key], limit)[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "profiles": len(self.keys),
+            "terms": len(self.vocabulary),
+            "nnz": int(self._model[0].nnz) if self._model is not None else 0,
+            "stale": self._dirty,
+        }
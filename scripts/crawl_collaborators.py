@@ -0,0 +1,20 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from yok_scraper.jobs import run_crawl_job
+
+if len(sys.argv) < 4:
+    print("Kullanım: python crawl_collaborators.py <isim> <sessionId> <profil_url> [hops] [max_sayfa] [deadline] [sıralama]")
+    sys.exit(1)
+
+target_name = sys.argv[1]
+session_id = sys.argv[2]
+profile_url = sys.argv[3]
+hops = int(sys.argv[4]) if len(sys.argv) > 4 else 2
+max_pages = int(sys.argv[5]) if len(sys.argv) > 5 else 50
+deadline = float(sys.argv[6]) if len(sys.argv) > 6 and sys.argv[6] != "-" else None  # epoch saniye
+order = sys.argv[7] if len(sys.argv) > 7 else "weight"
+
+# Aynı session'da önceki checkpoint varsa oradan devam eder
+run_crawl_job(target_name, session_id, profile_url, hops, max_pages, order, deadline=deadline, resume=True)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+In-memory view of session files for the async API
+
+Scraper jobs (other processes, possibly other hosts) own the session
+files; the API only reads them. SessionStore caches every parsed file
+keyed by path and revalidates it with one stat() against the cached
+(mtime, size), so repeated polls of an unchanged collaborators.json cost
+a stat instead of a read and a parse. The a* helpers run the filesystem
+work on the default thread pool so the event loop never blocks on disk.
+
+SessionWatcher turns file changes into events: every long-poll waiter
+registers the files it waits on and a single task stats all watched
+files once per interval (in one thread hop), waking only the waiters
+whose files changed.
+
+The cache is never the truth, so several uvicorn workers can serve the
+same sessions: each keeps its own cache, and the mtime check keeps all of
+them consistent with the files. Running jobs do belong to the API worker
+that started them; the others learn about them only through files (the
+client_seen and pid-file mtimes, see api_server.py).
+"""
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Version = Optional[Tuple[int, int]]
+
+
+def loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def file_version(path: Path) -> Version:
+    """(mtime_ns, size) of a file, None when it does not exist"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class SessionStore:
+    """mtime-validated LRU cache of parsed session files (values are shared; treat them as read-only)"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Path, Tuple[Version, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, path: Path, parse) -> Any:
+        version = file_version(path)
+        if version is None:
+            self.invalidate(path)
+            return None
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached is not None and cached[0] == version:
+                self._cache.move_to_end(path)
+                self.hits += 1
+                return cached[1]
+        value = parse(path.read_bytes())
+        with self._lock:
+            self.misses += 1
+            self._cache[path] = (version, value)
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return value
+
+    def load_json(self, path: Path) -> Any:
+        """Parsed JSON file, None when it is missing; raises ValueError when it is invalid"""
+        try:
+            return self._get(Path(path), loads)
+        except OSError:
+            return None
+
+    def read_json(self, path: Path, default: Any = None) -> Any:
+        """Parsed JSON file; default when it is missing or (mid-write by a non-atomic writer) invalid"""
+        try:
+            value = self.load_json(path)
+        except ValueError:
+            return default
+        return default if value is None else value
+
+    def marker(self, path: Path) -> str:
+        """Stripped text of a marker file ("" when missing)"""
+        try:
+            return self._get(Path(path), lambda data: data.decode("utf-8", "replace").strip()) or ""
+        except OSError:
+            return ""
+
+    def invalidate(self, path: Path) -> None:
+        with self._lock:
+            self._cache.pop(Path(path), None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+    async def aread_json(self, path: Path, default: Any = None) -> Any:
+        return await asyncio.to_thread(self.read_json, path, default)
+
+    async def amarker(self, path: Path) -> str:
+        return await asyncio.to_thread(self.marker, path)
+
+
+async def aexists(path: Path) -> bool:
+    return await asyncio.to_thread(Path(path).exists)
+
+
+class SessionWatcher:
+    """Wakes async waiters when any of their watched files changes"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self._waiters: Dict[asyncio.Event, Tuple[Tuple[Path, ...], List[Version]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _versions(paths: Set[Path]) -> Dict[Path, Version]:
+        return {path: file_version(path) for path in paths}
+
+    async def _run(self) -> None:
+        while self._waiters:
+            await asyncio.sleep(self.interval)
+            waiters = list(self._waiters.items())
+            paths = {path for _, (watched, _) in waiters for path in watched}
+            # Tüm bekleyenlerin dosyaları tek thread geçişinde stat edilir
+            versions = await asyncio.to_thread(self._versions, paths)
+            for event, (watched, baseline) in waiters:
+                if [versions[path] for path in watched] != baseline:
+                    event.set()
+        self._task = None
+
+    async def versions(self, paths: Tuple[Path, ...]) -> List[Version]:
+        return await asyncio.to_thread(lambda: [file_version(Path(p)) for p in paths])
+
+    async def wait(self, paths: Tuple[Path, ...], timeout: float, baseline: Optional[List[Version]] = None) -> bool:
+        """Wait until one of paths differs from baseline (default: their current versions) or timeout passes"""
+        paths = tuple(Path(p) for p in paths)
+        if baseline is None:
+            baseline = await self.versions(paths)
+        event = asyncio.Event()
+        self._waiters[event] = (paths, baseline)
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=max(0.0, timeout))
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters.pop(event, None)
+
+    def __len__(self) -> int:
+        return len(self._waiters)
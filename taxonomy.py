@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Field/specialty taxonomy index for Akademik YÖK
+
+Loads public/fields.json once, keeps id and normalized-name lookups in memory
+and reloads them when the file changes on disk.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+DEFAULT_FIELDS_PATH = Path(__file__).resolve().parent / "public" / "fields.json"
+
+# Dosya değişikliği kontrolü en fazla bu sıklıkta yapılır (saniye)
+RELOAD_CHECK_INTERVAL = 1.0
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_label(text: Optional[str]) -> str:
+    """Turkish-aware casefold used for comparing field/specialty labels"""
+    if not text:
+        return ""
+    # str.lower() "I" -> "i" ve "İ" -> "i̇" yapar; Türkçe kurallarını önce uygula
+    text = text.replace("I", "ı").replace("İ", "i")
+    return _WHITESPACE_RE.sub(" ", text.lower()).strip()
+
+
+def normalize_labels(names: Iterable[str]) -> FrozenSet[str]:
+    """Normalize a list of labels into a frozenset for O(1) membership checks"""
+    return frozenset(n for n in (normalize_label(name) for name in names) if n)
+
+
+def label_filter(field_name: Optional[str], specialty_names: Optional[Iterable[str]]) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """Precomputed (field, specialties) sets the scraper checks each row against"""
+    return normalize_labels([field_name] if field_name else []), normalize_labels(specialty_names or [])
+
+
+class Taxonomy:
+    """In-memory index over fields.json with mtime based hot reload"""
+
+    def __init__(self, path: Path = DEFAULT_FIELDS_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self.fields_by_id: Dict[int, Dict[str, Any]] = {}
+        self.specialties_by_id: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self.field_id_by_name: Dict[str, int] = {}
+        # load() içinde temizlenmiş uzmanlık listeleri (yalnızca sözlük ve geçerli id'li girdiler)
+        self.specialties_by_field: Dict[int, List[Dict[str, Any]]] = {}
+        self.load()
+
+    def load(self) -> None:
+        """(Re)build every map from disk; keeps the previous maps on error"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Fields data load error: {e}")
+            return
+
+        fields_by_id: Dict[int, Dict[str, Any]] = {}
+        specialties_by_id: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        field_id_by_name: Dict[str, int] = {}
+        specialties_by_field: Dict[int, List[Dict[str, Any]]] = {}
+
+        skipped = 0
+        for field in data if isinstance(data, list) else []:
+            # Bozuk kayıtlar (id'siz, sayı olmayan id, sözlük olmayan girdi) atlanır; yeniden yükleme sürer
+            try:
+                field_id = int(field.get("id"))
+                specialties = [s for s in field.get("specialties") or [] if isinstance(s, dict)]
+            except (AttributeError, TypeError, ValueError):
+                skipped += 1
+                continue
+            fields_by_id[field_id] = field
+            field_id_by_name[normalize_label(field.get("name"))] = field_id
+            valid: List[Dict[str, Any]] = []
+            for specialty in specialties:
+                # Uzmanlık id'leri her alan içinde 1'den başlıyor
+                try:
+                    key = (field_id, int(specialty.get("id")))
+                except (TypeError, ValueError):
+                    skipped += 1
+                    continue
+                valid.append(specialty)
+                specialties_by_id[key] = specialty
+            specialties_by_field[field_id] = valid
+        if skipped:
+            print(f"⚠️ Skipped {skipped} malformed taxonomy entries")
+
+        with self._lock:
+            self.fields_by_id = fields_by_id
+            self.specialties_by_id = specialties_by_id
+            self.field_id_by_name = field_id_by_name
+            self.specialties_by_field = specialties_by_field
+            self._mtime = mtime
+        print(f"📚 Taxonomy loaded: {len(fields_by_id)} fields, {len(specialties_by_id)} specialties")
+
+    def refresh(self) -> None:
+        """Reload the file if its mtime changed (checked at most once per interval)"""
+        now = time.monotonic()
+        if now - self._last_check < RELOAD_CHECK_INTERVAL:
+            return
+        self._last_check = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.load()
+
+    def get_field(self, field_id: Any) -> Optional[Dict[str, Any]]:
+        self.refresh()
+        try:
+            return self.fields_by_id.get(int(field_id))
+        except (TypeError, ValueError):
+            return None
+
+    def field_id_for(self, name: Optional[str]) -> Optional[int]:
+        self.refresh()
+        return self.field_id_by_name.get(normalize_label(name))
+
+    def resolve(self, field_id: Any, specialty_ids: Optional[List[Any]]) -> Tuple[Optional[str], List[str]]:
+        """Map a field id and specialty ids (or ["all"]) to the display names used on YÖK"""
+        field = self.get_field(field_id)
+        if not field:
+            return None, []
+        specialties = self.specialties_by_field.get(int(field_id), [])
+        requested = {str(s) for s in (specialty_ids or [])}
+        if "all" in requested:
+            names = [s.get("name") for s in specialties]
+        else:
+            names = [s.get("name") for s in specialties if str(s.get("id")) in requested]
+        return field.get("name") or "", [n for n in names if isinstance(n, str) and n]
@@ -0,0 +1,23 @@
+"""
+YÖK Akademik scraping library
+
+Importable building blocks for the search and collaborator scrapers:
+driver setup, page parsing, graph extraction, session-file jobs and a
+pre-forked worker pool. scripts/*.py and the API servers are thin
+wrappers around this package.
+"""
+
+from .config import BASE, DEFAULT_PHOTO_URL, MAX_PROFILES, MAX_PROFILES_EMAIL, MAX_PROFILES_LIMIT, SESSIONS_ROOT
+from .pool import JobCancelled, JobHandle, WorkerPool
+
+__all__ = [
+    "BASE",
+    "DEFAULT_PHOTO_URL",
+    "MAX_PROFILES",
+    "MAX_PROFILES_EMAIL",
+    "MAX_PROFILES_LIMIT",
+    "SESSIONS_ROOT",
+    "JobCancelled",
+    "JobHandle",
+    "WorkerPool",
+]
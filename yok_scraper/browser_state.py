@@ -0,0 +1,93 @@
+"""
+Cookie jar shared by every scraping job
+
+Each job starts a fresh Chrome, so without help every job would wait for
+the consent banner and build a new site session before its first search.
+The jar (data/browser_state.json, or BROWSER_STATE_PATH on remote workers)
+keeps the YÖK Akademik cookies of the last healthy session: the consent
+choice and the site session. Drivers load them through the DevTools
+cookie commands before their first navigation, so the banner does not
+show up and the session is reused.
+
+Session cookies (no expiry) are only trusted for SESSION_MAX_AGE seconds
+after they were saved; persistent ones (the consent cookie) until they
+expire. When a job using restored cookies still fails to open the search,
+the jar is cleared and the job retries once from a clean browser, and the
+next successful search saves a fresh jar.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import PROJECT_ROOT
+
+STATE_PATH = Path(os.environ.get("BROWSER_STATE_PATH", str(PROJECT_ROOT / "data" / "browser_state.json")))
+# Kaydedilen site oturumuna (süresiz çerezler) güvenilen süre
+SESSION_MAX_AGE = float(os.environ.get("BROWSER_SESSION_MAX_AGE", "1800"))
+# Değişiklik yoksa jar en fazla bu sıklıkla yeniden yazılır
+SAVE_INTERVAL = 300.0
+COOKIE_DOMAIN = "yok.gov.tr"
+
+# Network/Storage.setCookies'in kabul ettiği alanlar
+_COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+
+def _normalize(cookie: Dict[str, Any]) -> Dict[str, Any]:
+    # Selenium "expiry", CDP "expires" (-1: oturum çerezi) kullanır
+    cookie = dict(cookie)
+    if "expiry" in cookie:
+        cookie["expires"] = cookie.pop("expiry")
+    if cookie.get("expires") is not None and cookie["expires"] < 0:
+        cookie.pop("expires")
+    return {field: cookie[field] for field in _COOKIE_FIELDS if cookie.get(field) is not None}
+
+
+def _read() -> Dict[str, Any]:
+    try:
+        return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def state_age() -> Optional[float]:
+    """Seconds since the jar was saved, None when there is none"""
+    saved_at = _read().get("saved_at")
+    return time.time() - saved_at if saved_at else None
+
+
+def load_cookies() -> List[Dict[str, Any]]:
+    """Cookies still worth restoring, in DevTools CookieParam form"""
+    state = _read()
+    now = time.time()
+    session_fresh = now - state.get("saved_at", 0) < SESSION_MAX_AGE
+    cookies = []
+    for cookie in state.get("cookies", []):
+        expires = cookie.get("expires")
+        if (expires is None and session_fresh) or (expires is not None and expires > now):
+            cookies.append(cookie)
+    return cookies
+
+
+def save_cookies(cookies: List[Dict[str, Any]]) -> int:
+    """Store the site's cookies (other domains are dropped); returns how many were kept"""
+    kept = [_normalize(c) for c in cookies if COOKIE_DOMAIN in (c.get("domain") or "")]
+    if not kept:
+        return 0
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # Birden çok iş aynı anda yazabilir: her süreç kendi geçici dosyasını kullanır
+    tmp_path = STATE_PATH.with_name(f"{STATE_PATH.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps({"saved_at": time.time(), "cookies": kept}, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, STATE_PATH)
+    return len(kept)
+
+
+def save_due(force: bool = False) -> bool:
+    age = state_age()
+    return force or age is None or age >= SAVE_INTERVAL
+
+
+def clear_cookies() -> None:
+    STATE_PATH.unlink(missing_ok=True)
@@ -0,0 +1,663 @@
+#!/usr/bin/env python3
+"""
+Async Chrome DevTools Protocol scraping engine for Akademik YÖK
+
+One headless Chrome, one websocket and one asyncio event loop drive many
+pages (tabs) at once. Images, fonts, stylesheets and analytics are blocked
+at the network layer, and waits are driven by lifecycle events and DOM
+mutation observers instead of WebDriverWait polling.
+
+Jobs write the same session files as the Selenium jobs in
+yok_scraper.jobs (main_profile.json / main_done.txt, collaborators.json /
+collaborators_done.txt), so the API can use either interchangeably:
+
+    python -m yok_scraper.cdp main <isim> <sessionId> [--field F] [--specialties A,B] [--email E] [--deadline T] [--limit N] [--filter EXPR]
+    python -m yok_scraper.cdp collaborators <isim> <sessionId> [profil_url] [--deadline T]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import websockets
+
+from taxonomy import label_filter, normalize_label
+
+from . import browser_state
+from .config import BASE, CHROME_MARKER, MAX_PROFILES, MAX_PROFILES_EMAIL, SESSIONS_ROOT
+from .deadline import Deadline
+from .filters import compile_filter
+from .graph import GRAPH_DATA_JS, collaborator_links
+from .parsing import COLLABORATOR_PAGE_JS, PROFILE_ROWS_JS, lightweight_profile, parse_collaborator_page, parse_profile_row
+from .ratelimit import UpstreamUnavailable, get_limiter
+from .sessions import session_path, write_json, write_marker
+from .trace import session_trace, span
+
+CHROME_BINARY = "/usr/bin/google-chrome"
+
+# Aynı anda açık tutulabilecek sekme sayısı (tüm işler için toplam)
+MAX_PAGES = int(os.environ.get("CDP_MAX_PAGES", "32"))
+# Bir işbirlikçi işinin paralel kullandığı sekme sayısı
+COLLABORATOR_TABS = int(os.environ.get("CDP_COLLABORATOR_TABS", "4"))
+
+DEFAULT_TIMEOUT = 10.0
+
+# Ağ seviyesinde engellenen istekler (prefs yalnızca render'ı kapatıyordu)
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css", "*.css?*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*", "*yandex.ru*", "*mc.yandex*",
+]
+
+CHROME_ARGS = [
+    "--headless=new",
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-software-rasterizer",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=TranslateUI",
+    "--blink-settings=imagesEnabled=false",
+    "--mute-audio",
+    "--no-first-run",
+    "--window-size=1920,1080",
+    "--user-agent=Mozilla/5.0",
+    CHROME_MARKER,
+]
+
+
+class CDPError(Exception):
+    """Error response from the DevTools protocol"""
+
+
+class NavigationError(CDPError):
+    """A page load failed or timed out; counted against the upstream by the rate limiter"""
+
+    upstream = True
+
+
+class CDPConnection:
+    """Single websocket to the browser; pages are multiplexed as flattened sessions"""
+
+    def __init__(self, ws_url: str):
+        self.ws_url = ws_url
+        self._ws = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._listeners: Dict[Optional[str], Callable[[str, Dict[str, Any]], None]] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        self._ws = await websockets.connect(self.ws_url, max_size=64 * 1024 * 1024, ping_interval=None)
+        self._reader_task = asyncio.create_task(self._reader())
+
+    async def close(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+
+    async def _reader(self) -> None:
+        try:
+            async for raw in self._ws:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.pop(message["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CDPError(message["error"].get("message", str(message["error"]))))
+                    else:
+                        future.set_result(message.get("result", {}))
+                else:
+                    listener = self._listeners.get(message.get("sessionId"))
+                    if listener is not None:
+                        listener(message.get("method", ""), message.get("params", {}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(CDPError("Browser connection closed"))
+            self._pending.clear()
+
+    def on_session_event(self, session_id: Optional[str], listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        self._listeners[session_id] = listener
+
+    def remove_session(self, session_id: str) -> None:
+        self._listeners.pop(session_id, None)
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None,
+                   session_id: Optional[str] = None, timeout: float = 30.0) -> Dict[str, Any]:
+        message_id = next(self._ids)
+        message: Dict[str, Any] = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        await self._ws.send(json.dumps(message))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+
+class Page:
+    """One tab attached through a flattened CDP session"""
+
+    def __init__(self, connection: CDPConnection, target_id: str, session_id: str):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+        self.main_frame_id: Optional[str] = None
+        self._lifecycle: Dict[str, asyncio.Event] = {}
+        connection.on_session_event(session_id, self._on_event)
+
+    def _on_event(self, method: str, params: Dict[str, Any]) -> None:
+        if method == "Page.lifecycleEvent" and params.get("frameId") == self.main_frame_id:
+            name = params.get("name", "")
+            if name == "init":
+                # Yeni doküman: önceki yaşam döngüsü olayları geçersiz
+                for event in self._lifecycle.values():
+                    event.clear()
+            self._lifecycle.setdefault(name, asyncio.Event()).set()
+        elif method == "Page.frameNavigated" and not params.get("frame", {}).get("parentId"):
+            self.main_frame_id = params["frame"]["id"]
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: float = 30.0) -> Dict[str, Any]:
+        return await self.connection.send(method, params, session_id=self.session_id, timeout=timeout)
+
+    async def setup(self) -> None:
+        await asyncio.gather(
+            self.send("Page.enable"),
+            self.send("Runtime.enable"),
+            self.send("Network.enable"),
+        )
+        await self.send("Page.setLifecycleEventsEnabled", {"enabled": True})
+        await self.send("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        tree = await self.send("Page.getFrameTree")
+        self.main_frame_id = tree["frameTree"]["frame"]["id"]
+
+    async def wait_lifecycle(self, name: str, timeout: float = DEFAULT_TIMEOUT) -> bool:
+        event = self._lifecycle.setdefault(name, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def goto(self, url: str, wait_until: str = "DOMContentLoaded", timeout: float = 30.0) -> None:
+        """Navigate and wait for a lifecycle event (load, DOMContentLoaded, networkIdle, ...)"""
+        for event in self._lifecycle.values():
+            event.clear()
+        result = await self.send("Page.navigate", {"url": url}, timeout=timeout)
+        if result.get("errorText"):
+            raise NavigationError(f"Navigation to {url} failed: {result['errorText']}")
+        if not await self.wait_lifecycle(wait_until, timeout):
+            raise NavigationError(f"Timed out waiting for {wait_until} on {url}")
+
+    async def evaluate(self, expression: str, timeout: float = 30.0) -> Any:
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression,
+            "awaitPromise": True,
+            "returnByValue": True,
+        }, timeout=timeout)
+        if result.get("exceptionDetails"):
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text", "JS error"))
+        return result.get("result", {}).get("value")
+
+    async def wait_for(self, predicate_js: str, timeout: float = DEFAULT_TIMEOUT) -> bool:
+        """Resolve as soon as a DOM mutation makes the JS predicate truthy
+
+        A navigation destroys the execution context mid-wait, so the wait is
+        re-armed on the new document until the timeout runs out.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            script = _WAIT_FOR_JS % (predicate_js, int(remaining * 1000))
+            try:
+                if await self.evaluate(script, timeout=remaining + 5):
+                    return True
+                return False
+            except CDPError:
+                await self.wait_lifecycle("DOMContentLoaded", timeout=max(0.1, deadline - loop.time()))
+
+    async def wait_for_selector(self, selector: str, timeout: float = DEFAULT_TIMEOUT) -> bool:
+        return await self.wait_for(f"document.querySelector({json.dumps(selector)})", timeout)
+
+    async def click(self, selector: str) -> bool:
+        return bool(await self.evaluate(
+            f"(() => {{ const el = document.querySelector({json.dumps(selector)}); if (!el) return false; el.click(); return true; }})()"
+        ))
+
+    async def click_link_text(self, text: str) -> bool:
+        return bool(await self.evaluate(
+            "(() => { const el = Array.from(document.querySelectorAll('a'))"
+            f".find(a => a.textContent.trim() === {json.dumps(text)}); if (!el) return false; el.click(); return true; }})()"
+        ))
+
+    async def close(self) -> None:
+        self.connection.remove_session(self.session_id)
+        try:
+            await self.connection.send("Target.closeTarget", {"targetId": self.target_id}, timeout=5)
+        except Exception:
+            pass
+
+
+# predicate, timeout_ms
+_WAIT_FOR_JS = """
+new Promise((resolve) => {
+    const check = () => { try { return !!(%s); } catch (e) { return false; } };
+    if (check()) return resolve(true);
+    const observer = new MutationObserver(() => {
+        if (check()) { observer.disconnect(); clearTimeout(timer); resolve(true); }
+    });
+    observer.observe(document.documentElement || document, { childList: true, subtree: true, attributes: true });
+    const timer = setTimeout(() => { observer.disconnect(); resolve(check()); }, %d);
+})
+"""
+
+
+class CDPEngine:
+    """Owns the Chrome process and hands out pages under a global tab limit"""
+
+    def __init__(self, chrome_binary: Optional[str] = None, max_pages: int = MAX_PAGES):
+        self.chrome_binary = chrome_binary or os.environ.get("CHROME_BINARY", CHROME_BINARY)
+        self.max_pages = max_pages
+        self._slots = asyncio.Semaphore(max_pages)
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._profile_dir: Optional[str] = None
+        self.connection: Optional[CDPConnection] = None
+        self.restored_cookies = 0
+
+    async def start(self) -> None:
+        self._profile_dir = tempfile.mkdtemp(prefix="akademik-cdp-")
+        self._process = await asyncio.create_subprocess_exec(
+            self.chrome_binary,
+            *CHROME_ARGS,
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self._profile_dir}",
+            "about:blank",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        # Chrome seçtiği portu profil klasöründeki DevToolsActivePort dosyasına yazar
+        port_file = Path(self._profile_dir) / "DevToolsActivePort"
+        for _ in range(200):
+            if port_file.exists():
+                lines = port_file.read_text().split()
+                if len(lines) >= 2:
+                    break
+            if self._process.returncode is not None:
+                raise CDPError(f"Chrome exited with code {self._process.returncode}")
+            await asyncio.sleep(0.05)
+        else:
+            raise CDPError("Chrome did not expose a DevTools port")
+        port, path = lines[0], lines[1]
+        self.connection = CDPConnection(f"ws://127.0.0.1:{port}{path}")
+        await self.connection.connect()
+        print(f"[CDP] Chrome başlatıldı (pid {self._process.pid}, port {port})", flush=True)
+        await self.restore_cookies()
+
+    async def restore_cookies(self) -> None:
+        """Load the shared cookie jar into the browser (all tabs share it)"""
+        cookies = await asyncio.to_thread(browser_state.load_cookies)
+        if cookies:
+            try:
+                await self.connection.send("Storage.setCookies", {"cookies": cookies})
+            except Exception as e:
+                print(f"[WARN] Kayıtlı çerezler yüklenemedi: {e}", flush=True)
+                cookies = []
+        self.restored_cookies = len(cookies)
+
+    async def save_cookies(self, force: bool = False) -> None:
+        if not browser_state.save_due(force):
+            return
+        try:
+            cookies = (await self.connection.send("Storage.getCookies")).get("cookies", [])
+            await asyncio.to_thread(browser_state.save_cookies, cookies)
+        except Exception as e:
+            print(f"[WARN] Çerezler kaydedilemedi: {e}", flush=True)
+
+    async def reset_cookies(self) -> None:
+        """Drop a stale session from the shared jar and the browser"""
+        await asyncio.to_thread(browser_state.clear_cookies)
+        try:
+            await self.connection.send("Storage.clearCookies")
+        except Exception:
+            pass
+        self.restored_cookies = 0
+
+    async def stop(self) -> None:
+        if self.connection is not None:
+            try:
+                await self.connection.send("Browser.close", timeout=5)
+            except Exception:
+                pass
+            await self.connection.close()
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
+            await self._process.wait()
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self._process else None
+
+    @asynccontextmanager
+    async def page(self):
+        async with self._slots:
+            target = await self.connection.send("Target.createTarget", {"url": "about:blank"})
+            attached = await self.connection.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+            page = Page(self.connection, target["targetId"], attached["sessionId"])
+            try:
+                await page.setup()
+                yield page
+            finally:
+                await page.close()
+
+
+# --- Sayfa verisini tek seferde çeken JS parçaları ---
+
+_NEXT_PAGE_JS = """
+(() => {
+    const pagination = document.querySelector('ul.pagination');
+    if (!pagination) return null;
+    const items = Array.from(pagination.querySelectorAll('li'));
+    const active = pagination.querySelector('li.active');
+    const index = items.indexOf(active);
+    if (index < 0 || index === items.length - 1) return null;
+    const next = items[index + 1].querySelector('a');
+    if (!next) return null;
+    const first = document.querySelector("tr[id^='authorInfo_']");
+    window.__akademikPrevRow = first;
+    next.click();
+    return true;
+})()
+"""
+
+async def _open_search(engine: CDPEngine, page: Page, target_name: str) -> None:
+    """Search the name; with restored cookies a failure is retried once after resetting them"""
+    try:
+        await _search_page(engine, page, target_name)
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        if not engine.restored_cookies:
+            raise
+        print(f"[WARN] Kayıtlı oturumla arama açılamadı ({e}), çerezler sıfırlanıp yeniden deneniyor.", flush=True)
+        await engine.reset_cookies()
+        await _search_page(engine, page, target_name)
+
+
+async def _search_page(engine: CDPEngine, page: Page, target_name: str) -> None:
+    with span("search.page_load"):
+        async with get_limiter().aslot("search"):
+            await page.goto(BASE + "AkademikArama/")
+    if not await page.wait_for_selector("#aramaTerim"):
+        raise CDPError("Arama kutusu bulunamadı")
+    # Çerez banner'ı varsa hemen kapat, yoksa beklemeden devam et
+    consented = await page.evaluate(
+        "(() => { const b = Array.from(document.querySelectorAll('button'))"
+        ".find(x => x.textContent.includes('Tümünü Kabul Et')); if (b) b.click(); return !!b; })()"
+    )
+    await page.evaluate(
+        f"(() => {{ const k = document.getElementById('aramaTerim'); k.value = {json.dumps(target_name)}; "
+        "k.dispatchEvent(new Event('input', { bubbles: true })); })()"
+    )
+    with span("search.submit"):
+        async with get_limiter().aslot("search"):
+            await page.click("#searchButton")
+            if not await page.wait_for("Array.from(document.querySelectorAll('a')).some(a => a.textContent.trim() === 'Akademisyenler')"):
+                raise CDPError("'Akademisyenler' sekmesi bulunamadı")
+    await page.click_link_text("Akademisyenler")
+    await engine.save_cookies(force=bool(consented) or not engine.restored_cookies)
+
+
+async def run_search_job(
+    engine: CDPEngine,
+    target_name: str,
+    session_id: str,
+    field: Optional[str] = None,
+    specialties: Optional[List[str]] = None,
+    email: Optional[str] = None,
+    sessions_root: Path = SESSIONS_ROOT,
+    deadline: Optional[float] = None,
+    max_profiles: Optional[int] = None,
+    filter_expr: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """CDP port of yok_scraper.jobs.run_search_job"""
+    budget = Deadline(deadline)
+    partial = False
+    session_dir = session_path(session_id, sessions_root)
+    main_profile_path = session_dir / "main_profile.json"
+    field_filter, specialty_filter = label_filter(field, specialties or [])
+    row_filter = compile_filter(filter_expr)
+    max_profiles = max_profiles or (MAX_PROFILES_EMAIL if email else MAX_PROFILES)
+
+    profiles: List[Dict[str, Any]] = []
+    profile_urls = set()
+    matched: Optional[Dict[str, Any]] = None
+
+    with session_trace(session_dir), span("job.search", engine="cdp", name=target_name):
+        try:
+            async with engine.page() as page:
+                await _open_search(engine, page, target_name)
+                page_num = 1
+                while True:
+                    print(f"[INFO] {page_num}. sayfa yükleniyor...", flush=True)
+                    if not await page.wait_for("document.querySelector(\"tr[id^='authorInfo_']\") && document.querySelector(\"tr[id^='authorInfo_']\") !== window.__akademikPrevRow"):
+                        print("[ERROR] Profil satırları yüklenemedi", flush=True)
+                        break
+                    rows = await page.evaluate(PROFILE_ROWS_JS) or []
+                    print(f"[INFO] {page_num}. sayfada {len(rows)} profil bulundu.", flush=True)
+                    for row in rows:
+                        if field_filter and normalize_label(row["green_label"]) not in field_filter:
+                            continue
+                        if specialty_filter and normalize_label(row["blue_label"]) not in specialty_filter:
+                            continue
+                        if row_filter and not row_filter(row):
+                            continue
+                        url = row["url"]
+                        if url in profile_urls:
+                            continue
+                        if email:
+                            if row["email"].lower() == email.lower():
+                                matched = parse_profile_row(row, len(profiles) + 1)
+                                print(f"[EMAIL_FOUND] Email eşleşmesi bulundu: {row['link_text']} - {row['email']}", flush=True)
+                                break
+                            profiles.append(lightweight_profile(row, len(profiles) + 1))
+                        else:
+                            profiles.append(parse_profile_row(row, len(profiles) + 1))
+                        profile_urls.add(url)
+                        if len(profiles) >= max_profiles:
+                            break
+                    if matched or len(profiles) >= max_profiles:
+                        break
+                    await asyncio.to_thread(write_json, main_profile_path, profiles)
+                    if budget.expired():
+                        print(f"[DEADLINE] Süre doldu, {len(profiles)} profil ile dönülüyor.", flush=True)
+                        partial = True
+                        break
+                    # Tıklama ve yeni satırların gelmesi tek upstream yüklemesi sayılır
+                    async with get_limiter().aslot("search"):
+                        more = await page.evaluate(_NEXT_PAGE_JS)
+                        if more:
+                            await page.wait_for("document.querySelector(\"tr[id^='authorInfo_']\") !== window.__akademikPrevRow")
+                    if not more:
+                        print("[INFO] Son sayfaya gelindi, döngü bitiyor.", flush=True)
+                        break
+                    page_num += 1
+
+        except UpstreamUnavailable as e:
+            print(f"[ERROR] {e}", flush=True)
+            await asyncio.to_thread(write_marker, session_dir / "main_done.txt", "unavailable")
+            raise
+
+        if matched:
+            await asyncio.to_thread(write_json, main_profile_path, [matched])
+            await asyncio.to_thread(write_marker, session_dir / "main_done.txt", "completed")
+            await run_collaborators_job(engine, matched["name"], session_id, matched["url"], sessions_root, deadline)
+            return [matched]
+
+        if email:
+            result: Any = {"profiles": profiles, "email_found": False,
+                           "message": f"Email '{email}' bulunamadı. {len(profiles)} profil tarandı."}
+        else:
+            result = profiles
+        await asyncio.to_thread(write_json, main_profile_path, result)
+        if profiles:
+            await asyncio.to_thread(write_marker, session_dir / "main_done.txt", "partial" if partial else "completed")
+        print(f"[INFO] Toplam {len(profiles)} profil toplandı.", flush=True)
+        return profiles
+
+
+async def _scrape_collaborator(page: Page, idx: int, name: str, href: str, weight: Optional[float] = None) -> Dict[str, Any]:
+    data = None
+    if href:
+        with span("collaborator.load", idx=idx, name=name):
+            async with get_limiter().aslot("profile"):
+                await page.goto(href)
+                await page.wait_for("Array.from(document.querySelectorAll('td')).some(c => Array.from(c.children).some(x => x.tagName === 'H6'))", timeout=5)
+        data = await page.evaluate(COLLABORATOR_PAGE_JS)
+    return parse_collaborator_page(data, idx, name, href, weight)
+
+
+async def run_collaborators_job(
+    engine: CDPEngine,
+    target_name: str,
+    session_id: str,
+    profile_url: Optional[str] = None,
+    sessions_root: Path = SESSIONS_ROOT,
+    deadline: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """CDP port of yok_scraper.jobs.run_collaborators_job; collaborator pages load in parallel tabs"""
+    budget = Deadline(deadline)
+    session_dir = session_path(session_id, sessions_root)
+    collaborators_path = session_dir / "collaborators.json"
+
+    with session_trace(session_dir), span("job.collaborators", engine="cdp", name=target_name):
+        try:
+            async with engine.page() as page:
+                if profile_url:
+                    async with get_limiter().aslot("profile"):
+                        await page.goto(profile_url)
+                else:
+                    await _open_search(engine, page, target_name)
+                    if not await page.wait_for_selector("tr[id^='authorInfo_'] a"):
+                        raise CDPError("Profil satırı bulunamadı")
+                    await page.click("tr[id^='authorInfo_'] a")
+                if not await page.wait_for_selector("a[href='viewAuthorGraphs.jsp']"):
+                    raise CDPError("İşbirlikçi sekmesi bulunamadı")
+                async with get_limiter().aslot("graph"):
+                    await page.click("a[href='viewAuthorGraphs.jsp']")
+                    if not await page.wait_for("document.querySelectorAll('svg g').length > 2"):
+                        raise CDPError("İşbirlikçi grafiği yüklenemedi")
+                graph = await page.evaluate(GRAPH_DATA_JS) or {"nodes": [], "edges": []}
+        except UpstreamUnavailable as e:
+            print(f"[ERROR] {e}", flush=True)
+            await asyncio.to_thread(write_marker, session_dir / "collaborators_done.txt", "unavailable")
+            return []
+        await asyncio.to_thread(write_json, session_dir / "graph.json", {"profile_url": profile_url, **graph})
+        links = collaborator_links(graph)
+
+        print(f"[INFO] {len(links)} işbirlikçi bulundu.", flush=True)
+        results: Dict[int, Dict[str, Any]] = {}
+        queue: asyncio.Queue = asyncio.Queue()
+        for idx, obj in enumerate(links, start=1):
+            queue.put_nowait((idx, obj["name"], obj["href"], obj["weight"]))
+        write_lock = asyncio.Lock()
+        unavailable = False
+
+        async def worker() -> None:
+            nonlocal unavailable
+            async with engine.page() as tab:
+                while not queue.empty():
+                    if budget.expired() or unavailable:
+                        return
+                    idx, name, href, weight = queue.get_nowait()
+                    try:
+                        record = await _scrape_collaborator(tab, idx, name, href, weight)
+                    except UpstreamUnavailable as e:
+                        # Devre kesici açık: kalan sekmeler de yeni sayfa açmadan durur
+                        print(f"[ERROR] {e}", flush=True)
+                        unavailable = True
+                        return
+                    except Exception as e:
+                        print(f"[ERROR] İşbirlikçi işlenemedi ({name}): {e}", flush=True)
+                        record = await _scrape_collaborator(tab, idx, name, "", weight)
+                    results[idx] = record
+                    async with write_lock:
+                        snapshot = [results[i] for i in sorted(results)]
+                        await asyncio.to_thread(write_json, collaborators_path, snapshot)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(COLLABORATOR_TABS, len(links))))))
+
+        collaborators = [results[i] for i in sorted(results)]
+        partial = len(collaborators) < len(links)
+        if partial and not unavailable:
+            print(f"[DEADLINE] Süre doldu, {len(collaborators)}/{len(links)} işbirlikçi ile dönülüyor.", flush=True)
+        if unavailable:
+            await asyncio.to_thread(write_marker, session_dir / "collaborators_done.txt", "unavailable")
+        elif collaborators:
+            await asyncio.to_thread(write_marker, session_dir / "collaborators_done.txt", "partial" if partial else "done")
+        return collaborators
+
+
+async def _main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="CDP tabanlı YÖK Akademik scraper")
+    sub = parser.add_subparsers(dest="job", required=True)
+    main_parser = sub.add_parser("main")
+    main_parser.add_argument("name")
+    main_parser.add_argument("session_id")
+    main_parser.add_argument("--field", type=str, default=None)
+    main_parser.add_argument("--specialties", type=str, default=None)
+    main_parser.add_argument("--email", type=str, default=None)
+    main_parser.add_argument("--deadline", type=float, default=None)
+    main_parser.add_argument("--limit", type=int, default=None)
+    main_parser.add_argument("--filter", type=str, default=None)
+    collab_parser = sub.add_parser("collaborators")
+    collab_parser.add_argument("name")
+    collab_parser.add_argument("session_id")
+    collab_parser.add_argument("profile_url", nargs="?", default=None)
+    collab_parser.add_argument("--deadline", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    engine = CDPEngine()
+    await engine.start()
+    try:
+        if args.job == "main":
+            specialties = [s.strip() for s in args.specialties.split(',')] if args.specialties else []
+            await run_search_job(engine, args.name, args.session_id, args.field, specialties, args.email,
+                                 deadline=args.deadline, max_profiles=args.limit, filter_expr=args.filter)
+        else:
+            await run_collaborators_job(engine, args.name, args.session_id, args.profile_url, deadline=args.deadline)
+    finally:
+        await engine.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(sys.argv[1:])))
@@ -0,0 +1,54 @@
+"""
+Collaborator (co-author graph) scraping on YÖK Akademik (Selenium)
+"""
+
+from typing import Any, Dict, List, Optional
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .graph import extract_graph
+from .parsing import COLLABORATOR_PAGE_JS, parse_collaborator_page
+from .ratelimit import get_limiter
+from .trace import span
+from .search import open_search
+
+
+def open_graph(driver, target_name: str, profile_url: Optional[str] = None) -> Dict[str, Any]:
+    """Go to the profile (directly or via search), open the graph tab and read it"""
+    limiter = get_limiter()
+    if profile_url:
+        with limiter.slot("profile"):
+            driver.get(profile_url)
+    else:
+        open_search(driver, target_name)
+        WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "tr[id^='authorInfo_'] a"))
+        ).click()
+
+    # Sonra işbirlikçiler sekmesine geç
+    with limiter.slot("graph"):
+        WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, "//a[@href='viewAuthorGraphs.jsp']"))
+        ).click()
+        WebDriverWait(driver, 10).until(
+            lambda d: len(d.find_elements(By.CSS_SELECTOR, "svg g")) > 2
+        )
+    # Graf verisini (düğümler, linkler, ortak yayın sayıları) tek çağrıda oku
+    with span("graph.extract") as graph_attrs:
+        graph = extract_graph(driver)
+        graph_attrs["nodes"] = len(graph.get("nodes", []))
+    print(f"[INFO] Graf okundu ({graph.get('method')}): {len(graph.get('nodes', []))} düğüm, {len(graph.get('edges', []))} bağlantı", flush=True)
+    return graph
+
+
+def scrape_collaborator(driver, idx: int, name: str, href: str, weight: Optional[float] = None) -> Dict[str, Any]:
+    """Visit one collaborator's profile page and build its record"""
+    page = None
+    if href:
+        with span("collaborator.load"), get_limiter().slot("profile"):
+            driver.get(href)
+        with span("collaborator.extract"):
+            page = driver.execute_script("return " + COLLABORATOR_PAGE_JS.strip())
+    return parse_collaborator_page(page, idx, name, href, weight)
@@ -0,0 +1,23 @@
+"""
+Shared constants for the YÖK Akademik scraping package
+"""
+
+import os
+from pathlib import Path
+
+BASE = "https://akademik.yok.gov.tr/"
+DEFAULT_PHOTO_URL = "/default_photo.jpg"
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# API ile aynı kök (AKADEMIK_ROOT); uzak işçiler kendi çalışma dizinlerini verir
+SESSIONS_ROOT = Path(os.environ.get("AKADEMIK_ROOT", PROJECT_ROOT)) / "public" / "collaborator-sessions"
+
+# Sonuç limitleri (email aramasında daha fazla profil taranır)
+MAX_PROFILES = 20
+MAX_PROFILES_EMAIL = 100
+# İstemcinin isteyebileceği en yüksek sonuç limiti (progressive/limitli aramalar)
+MAX_PROFILES_LIMIT = int(os.environ.get("SEARCH_MAX_PROFILES", "200"))
+
+# Scraper Chrome'larını tanımak için komut satırına eklenen (Chrome'un yok saydığı) anahtar;
+# supervisor sahibi ölmüş tarayıcıları bununla bulur
+CHROME_MARKER = "--akademik-scraper"
@@ -0,0 +1,122 @@
+"""
+Multi-hop co-author crawl state
+
+jobs.run_crawl_job expands the co-author graph breadth-first from a seed
+profile up to `hops` hops. Each expanded profile costs one graph page (through the
+upstream rate limiter like every other page load); the crawl stops at
+the page budget, the deadline or when the frontier is exhausted. Within a
+hop the frontier is ordered by co-publication weight (or by how many
+expanded profiles link to a candidate), so the strongest ties are
+expanded first when the budget runs out.
+
+Discovered nodes and edges are appended to <session>/crawl.jsonl as they
+are found; <session>/crawl_state.json checkpoints visited profiles, the
+frontier and the stream length after every expansion, so a yielded,
+killed or redelivered job resumes where it stopped. crawl_done.txt marks
+the end ("done", "partial" or "unavailable" when the upstream breaker
+opened mid-crawl).
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+CRAWL_FILE = "crawl.jsonl"
+CRAWL_STATE_FILE = "crawl_state.json"
+CRAWL_DONE_FILE = "crawl_done.txt"
+
+DEFAULT_HOPS = 2
+DEFAULT_MAX_PAGES = int(os.environ.get("CRAWL_MAX_PAGES", "50"))
+MAX_HOPS = 4
+ORDERS = ("weight", "degree")
+
+
+def node_key(url: Optional[str]) -> str:
+    """Dedupe key of a profile URL (authorId when present)"""
+    author_id = parse_qs(urlparse(url or "").query).get("authorId")
+    return author_id[0] if author_id else (url or "")
+
+
+class CrawlState:
+    """Visited set, frontier and counters of one crawl (the checkpoint contents)"""
+
+    def __init__(self, seed_url: str, seed_name: str, hops: int, order: str):
+        self.seed_url = seed_url
+        self.hops = hops
+        self.order = order
+        self.pages = 0
+        self.stream_bytes = 0
+        # Görülen her profil: isim, url ve ilk görüldüğü derinlik
+        self.seen: Dict[str, Dict[str, Any]] = {}
+        self.visited: List[str] = []
+        # Genişletilmeyi bekleyenler: derinlik, toplam ortak yayın ağırlığı ve bağlanan profil sayısı
+        self.frontier: Dict[str, Dict[str, Any]] = {}
+        self.discover(seed_url, seed_name, 0, None)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CrawlState":
+        state = cls.__new__(cls)
+        state.__dict__.update(data)
+        return state
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+    def discover(self, url: str, name: str, depth: int, weight: Optional[float]) -> bool:
+        """Register a profile reached at depth; True when it was not seen before"""
+        key = node_key(url)
+        new = key not in self.seen
+        if new:
+            self.seen[key] = {"url": url, "name": name, "depth": depth}
+        if depth < self.hops and key not in self.visited:
+            entry = self.frontier.setdefault(key, {"depth": depth, "weight": 0.0, "degree": 0})
+            entry["weight"] += weight or 0
+            entry["degree"] += 1
+        return new
+
+    def pop(self) -> Optional[str]:
+        """Next profile to expand: shallowest first, then the strongest tie"""
+        if not self.frontier:
+            return None
+        first, second = ("weight", "degree") if self.order == "weight" else ("degree", "weight")
+        key = min(self.frontier, key=lambda k: (self.frontier[k]["depth"], -self.frontier[k][first], -self.frontier[k][second]))
+        del self.frontier[key]
+        self.visited.append(key)
+        return key
+
+    def expand(self, node: Dict[str, Any], graph: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Add an expanded profile's co-author graph; returns the events to stream"""
+        events: List[Dict[str, Any]] = []
+        nodes = graph.get("nodes", [])
+        # Merkez düğümün adresi genişletilen profilin kendisi
+        hrefs = [node["url"] if n.get("center") else n.get("href") for n in nodes]
+        center = next((n["index"] for n in nodes if n.get("center")), None)
+        weights: Dict[int, float] = {}
+        for edge in graph.get("edges", []):
+            if center in (edge["source"], edge["target"]):
+                other = edge["target"] if edge["source"] == center else edge["source"]
+                weights[other] = weights.get(other, 0) + edge.get("weight", 1)
+        for n, href in zip(nodes, hrefs):
+            if n.get("center") or not href:
+                continue
+            if self.discover(href, n.get("name", ""), node["depth"] + 1, weights.get(n["index"])):
+                events.append({"type": "node", **self.seen[node_key(href)]})
+        for edge in graph.get("edges", []):
+            source, target = hrefs[edge["source"]], hrefs[edge["target"]]
+            if source and target:
+                events.append({"type": "edge", "source": source, "target": target, "weight": edge.get("weight", 1)})
+        events.append({"type": "expanded", "url": node["url"], "depth": node["depth"],
+                       "collaborators": len(nodes) - (center is not None)})
+        return events
+
+
+def append_events(path: Path, events: List[Dict[str, Any]]) -> int:
+    """Append events as JSON lines; returns the bytes written"""
+    data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events).encode("utf-8")
+    with open(path, "ab") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return len(data)
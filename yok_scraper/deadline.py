@@ -0,0 +1,37 @@
+"""
+Request deadlines carried into scraping jobs
+
+A deadline is an absolute wall-clock time (epoch seconds) so it survives
+being passed to a pool worker, a script subprocess (--deadline) or the CDP
+engine unchanged. Jobs check it between pages/collaborators and stop with
+whatever they have collected.
+"""
+
+import time
+from typing import Optional
+
+# İşin sonuçları yazabilmesi için bekleme sürelerinden ayrılan pay
+WRITE_MARGIN = 1.0
+
+
+class Deadline:
+    """Remaining time budget of one request (None means unbounded)"""
+
+    def __init__(self, expires_at: Optional[float] = None):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: Optional[float]) -> "Deadline":
+        return cls(time.time() + seconds if seconds else None)
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return float("inf")
+        return self.expires_at - time.time()
+
+    def expired(self) -> bool:
+        return self.remaining() <= WRITE_MARGIN
+
+    def timeout(self, default: float) -> float:
+        """Wait timeout for one step: the default, capped by the remaining budget"""
+        return max(0.5, min(default, self.remaining() - WRITE_MARGIN))
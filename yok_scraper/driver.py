@@ -0,0 +1,112 @@
+"""
+Selenium Chrome driver setup shared by every scraping job
+
+New drivers start with the cookies of the shared jar (browser_state), so
+the consent banner and a fresh site session are skipped on most jobs.
+"""
+
+import os
+from typing import Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+from . import browser_state
+from .config import CHROME_MARKER
+
+# Varsayılan tarayıcı; provision.py seçtiği yolları CHROME_BINARY/CHROMEDRIVER_PATH olarak dışa aktarır
+CHROME_BINARY = "/usr/bin/google-chrome"
+
+CHROME_ARGUMENTS = (
+    "--headless=new",
+    "--disable-gpu",
+    "user-agent=Mozilla/5.0",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-setuid-sandbox",
+    "--disable-extensions",
+    "--disable-software-rasterizer",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=TranslateUI",
+    "--disable-ipc-flooding-protection",
+    "--no-first-run",
+    "--window-size=1920,1080",
+    CHROME_MARKER,
+)
+
+PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.stylesheets": 2,
+    "profile.managed_default_content_settings.fonts": 2,
+}
+
+
+def chrome_options(binary_location: Optional[str] = None) -> webdriver.ChromeOptions:
+    options = webdriver.ChromeOptions()
+    for argument in CHROME_ARGUMENTS:
+        options.add_argument(argument)
+    options.add_experimental_option("prefs", PREFS)
+    options.binary_location = binary_location or os.environ.get("CHROME_BINARY", CHROME_BINARY)
+    return options
+
+
+def resolve_driver_path() -> str:
+    """Provisioned chromedriver; resolves (once per process) only if the service did not provision"""
+    driver_path = os.environ.get("CHROMEDRIVER_PATH")
+    if driver_path:
+        return driver_path
+    from .provision import provision
+    status = provision(run_preflight=False)
+    if status["status"] != "ok":
+        raise RuntimeError(f"Chromedriver provisioning failed: {status.get('error')}")
+    return status["chromedriver"]
+
+
+def restore_browser_state(driver) -> int:
+    """Load the shared cookie jar into a driver before its first navigation; returns the cookie count"""
+    cookies = browser_state.load_cookies()
+    if cookies:
+        try:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        except Exception as e:
+            print(f"[WARN] Kayıtlı çerezler yüklenemedi: {e}", flush=True)
+            cookies = []
+    driver.restored_cookies = len(cookies)
+    return len(cookies)
+
+
+def save_browser_state(driver, force: bool = False) -> None:
+    """Store the driver's site cookies in the shared jar (at most every SAVE_INTERVAL unless forced)"""
+    if not browser_state.save_due(force):
+        return
+    try:
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+        browser_state.save_cookies(cookies)
+    except Exception as e:
+        print(f"[WARN] Çerezler kaydedilemedi: {e}", flush=True)
+
+
+def reset_browser_state(driver) -> None:
+    """Drop a stale session: clear the shared jar and the driver's cookies"""
+    browser_state.clear_cookies()
+    try:
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    except Exception:
+        pass
+    driver.restored_cookies = 0
+
+
+def create_driver(binary_location: Optional[str] = None, driver_path: Optional[str] = None) -> webdriver.Chrome:
+    """Headless Chrome with images/stylesheets/fonts disabled and the shared cookies restored"""
+    driver = webdriver.Chrome(
+        service=Service(driver_path or resolve_driver_path()),
+        options=chrome_options(binary_location)
+    )
+    driver.set_window_size(1920, 1080)
+    restore_browser_state(driver)
+    return driver
@@ -0,0 +1,184 @@
+"""
+Profile filter expressions evaluated inside the search row loop
+
+    institution:"ankara üniversitesi" AND (keyword:"derin öğrenme" OR keyword:yapay) NOT title:arş
+
+A term is `field:value` (value quoted when it has spaces) or a bare value
+that matches any field; terms combine with AND (also implicit), OR, NOT
+and parentheses. Matching is a Turkish-aware, diacritic-free substring
+test (name_index.fold_name).
+
+compile_filter parses the expression once per job into a predicate over
+raw PROFILE_ROWS_JS rows, so non-matching rows are skipped before any
+profile record is built and never count toward the result limit. The
+predicate reads only the fields a term needs, folding each at most once
+per row, and also accepts finished profile records (local index hits).
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from name_index import fold_name
+
+from .parsing import row_keywords
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+
+class FilterError(ValueError):
+    """The filter expression cannot be parsed"""
+
+
+def _info_lines(row: Dict[str, Any]) -> List[str]:
+    return [line.strip() for line in (row.get("info") or "").splitlines()]
+
+
+def _info_line(row: Dict[str, Any], index: int) -> str:
+    lines = _info_lines(row)
+    return lines[index] if len(lines) > index else ""
+
+
+# Ham satırda (info metni) ve hazır profil kaydında aynı alanın okunuşu; info satırları: unvan, isim, kurum, ...
+_GETTERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "institution": lambda r: r["header"] if "header" in r else _info_line(r, 2),
+    "title": lambda r: r["title"] if "title" in r else _info_line(r, 0),
+    # Anahtar kelimeler profil kaydıyla aynı kuralla çıkarılır (parse_profile_row)
+    "keyword": lambda r: r["keywords"] if "keywords" in r else row_keywords(r),
+    "specialty": lambda r: r.get("blue_label") or "",
+    "field": lambda r: r.get("green_label") or "",
+    "name": lambda r: r.get("name") or r.get("link_text") or "",
+    "any": lambda r: r.get("info") or " ".join(str(r.get(k) or "") for k in ("title", "name", "header", "green_label", "blue_label", "keywords")),
+}
+
+FIELD_ALIASES = {
+    "institution": "institution", "inst": "institution", "kurum": "institution", "universite": "institution",
+    "title": "title", "unvan": "title",
+    "keyword": "keyword", "keywords": "keyword", "kw": "keyword", "anahtar": "keyword",
+    "specialty": "specialty", "spec": "specialty", "uzmanlik": "specialty",
+    "field": "field", "alan": "field",
+    "name": "name", "isim": "name",
+}
+
+_TOKEN_RE = re.compile(r'\s*(?:(?P<paren>[()])|(?:(?P<field>[^\W\d][\w]*):)?(?:"(?P<quoted>[^"]*)"|(?P<word>[^\s()"]+)))')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def _tokenize(expression: str) -> List[Tuple[str, Any]]:
+    tokens: List[Tuple[str, Any]] = []
+    pos = 0
+    expression = expression.strip()
+    while pos < len(expression):
+        match = _TOKEN_RE.match(expression, pos)
+        if not match or match.end() == pos:
+            raise FilterError(f"Geçersiz filtre ifadesi ({pos}. karakter): {expression[pos:pos + 20]!r}")
+        pos = match.end()
+        if match["paren"]:
+            tokens.append((match["paren"], None))
+        elif match["word"] is not None and match["field"] is None and match["word"].upper() in _OPERATORS:
+            tokens.append((match["word"].upper(), None))
+        else:
+            field = fold_name(match["field"]) if match["field"] else "any"
+            if field != "any" and field not in FIELD_ALIASES:
+                raise FilterError(f"Bilinmeyen filtre alanı: {match['field']} ({', '.join(sorted(set(FIELD_ALIASES.values())))})")
+            value = fold_name(match["quoted"] if match["quoted"] is not None else match["word"])
+            if value:
+                tokens.append(("TERM", (FIELD_ALIASES.get(field, "any"), value)))
+    return tokens
+
+
+class _Parser:
+    """Recursive descent: or := and (OR and)*; and := not (AND? not)*; not := NOT not | atom"""
+
+    def __init__(self, tokens: List[Tuple[str, Any]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, Any]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self) -> Callable[["_RowView"], bool]:
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise FilterError(f"Beklenmeyen ifade: {self.peek()}")
+        return node
+
+    def parse_or(self):
+        nodes = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else (lambda view: any(node(view) for node in nodes))
+
+    def parse_and(self):
+        nodes = [self.parse_not()]
+        while self.peek() not in (None, "OR", ")"):
+            if self.peek() == "AND":
+                self.take()
+            nodes.append(self.parse_not())
+        return nodes[0] if len(nodes) == 1 else (lambda view: all(node(view) for node in nodes))
+
+    def parse_not(self):
+        if self.peek() == "NOT":
+            self.take()
+            node = self.parse_not()
+            return lambda view: not node(view)
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind = self.peek()
+        if kind is None:
+            raise FilterError("Filtre ifadesi eksik bitti")
+        kind, value = self.take()
+        if kind == "(":
+            node = self.parse_or()
+            if self.peek() != ")":
+                raise FilterError("Kapanmayan parantez")
+            self.take()
+            return node
+        if kind != "TERM":
+            raise FilterError(f"Beklenmeyen ifade: {kind}")
+        field, needle = value
+        return lambda view: needle in view[field]
+
+
+class _RowView:
+    """Folded field values of one row, computed on first use"""
+
+    __slots__ = ("row", "cache")
+
+    def __init__(self, row: Dict[str, Any]):
+        self.row = row
+        self.cache: Dict[str, str] = {}
+
+    def __getitem__(self, field: str) -> str:
+        value = self.cache.get(field)
+        if value is None:
+            value = self.cache[field] = fold_name(_GETTERS[field](self.row))
+        return value
+
+
+def compile_filter(expression: Optional[str]) -> Optional[Predicate]:
+    """Predicate for a filter expression (None when the expression is empty); raises FilterError
+
+    A raw row and the profile record built from it give the same answer:
+
+    >>> from yok_scraper.parsing import parse_profile_row
+    >>> row = {"info": "PROF. DR.\\nAYŞE YILMAZ\\nANKARA ÜNİVERSİTESİ\\nMÜHENDİSLİK   Bilgisayar   Derin Öğrenme; Yapay Zeka",
+    ...        "green_label": "MÜHENDİSLİK", "blue_label": "Bilgisayar", "link_text": "AYŞE YILMAZ",
+    ...        "url": "", "img": "", "email": ""}
+    >>> match = compile_filter('keyword:"derin ogrenme" institution:ankara')
+    >>> match(row), match(parse_profile_row(row, 1))
+    (True, True)
+    """
+    if not expression or not expression.strip():
+        return None
+    tokens = _tokenize(expression)
+    if not tokens:
+        return None
+    node = _Parser(tokens).parse()
+    return lambda row: node(_RowView(row))
@@ -0,0 +1,373 @@
+"""
+Durable job queue for scraper worker nodes
+
+The API enqueues search and collaborator jobs; workers on any machine
+lease them, heartbeat while running, upload session files as they change
+and ack (or fail) when done. A lease that is not renewed expires and the
+job is redelivered to another worker, up to max_attempts times.
+
+Brokers share one interface:
+
+    SQLiteJobQueue  embedded, durable; the API host owns the file
+    MemoryJobQueue  in-process stand-in for tests and single-host setups
+    HTTPJobQueue    worker-side client for a remote API's /api/queue endpoints
+
+open_queue() picks one from a URL: "sqlite:///path/queue.db", "memory://"
+or "http(s)://api-host:3002".
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .pool import PRIORITIES
+
+DEFAULT_LEASE_SECONDS = 30.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Uzak işçinin API'ye yükleyebileceği session dosyaları
+SESSION_FILES = (
+    "main_profile.json", "main_done.txt",
+    "graph.json", "collaborators.json", "collaborators_done.txt",
+    "crawl.jsonl", "crawl_state.json", "crawl_done.txt",
+    "timeline.jsonl",
+)
+
+ACTIVE_STATUSES = ("queued", "leased")
+
+
+class JobQueue:
+    """Broker interface; jobs are dicts with id, kind, payload, status, attempts, worker, result, error"""
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], priority: str = "interactive",
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> str:
+        raise NotImplementedError
+
+    def lease(self, worker_id: str, kinds: Optional[Iterable[str]] = None,
+              lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+        """Claim the most urgent queued job; expired leases are redelivered first"""
+        raise NotImplementedError
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extend the lease; False when the worker lost it (expired, cancelled or redelivered)"""
+        raise NotImplementedError
+
+    def ack(self, job_id: str, worker_id: str, result: Any = None) -> bool:
+        raise NotImplementedError
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Give the job back for redelivery, or mark it failed after max_attempts"""
+        raise NotImplementedError
+
+    def cancel(self, job_id: str) -> bool:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class MemoryJobQueue(JobQueue):
+    """Non-durable in-process broker with the same semantics as SQLiteJobQueue"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, kind, payload, priority="interactive", max_attempts=DEFAULT_MAX_ATTEMPTS):
+        job_id = f"q_{uuid.uuid4().hex[:12]}"
+        now = time.time()
+        with self._lock:
+            self._jobs[job_id] = {
+                "id": job_id, "kind": kind, "payload": payload, "priority": PRIORITIES[priority],
+                "status": "queued", "attempts": 0, "max_attempts": max_attempts, "worker": None,
+                "lease_expires": None, "created": now, "updated": now, "result": None, "error": None,
+            }
+        return job_id
+
+    def _expire(self, now: float) -> None:
+        for job in self._jobs.values():
+            if job["status"] == "leased" and job["lease_expires"] < now:
+                job.update(status="queued" if job["attempts"] < job["max_attempts"] else "failed",
+                           worker=None, lease_expires=None, updated=now, error="lease expired")
+
+    def lease(self, worker_id, kinds=None, lease_seconds=DEFAULT_LEASE_SECONDS):
+        now = time.time()
+        kinds = set(kinds) if kinds else None
+        with self._lock:
+            self._expire(now)
+            queued = [j for j in self._jobs.values()
+                      if j["status"] == "queued" and (kinds is None or j["kind"] in kinds)]
+            if not queued:
+                return None
+            job = min(queued, key=lambda j: (j["priority"], j["created"]))
+            job.update(status="leased", worker=worker_id, lease_expires=now + lease_seconds,
+                       attempts=job["attempts"] + 1, updated=now)
+            return dict(job)
+
+    def _owned(self, job_id: str, worker_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] != "leased" or job["worker"] != worker_id:
+            return None
+        return job
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        with self._lock:
+            job = self._owned(job_id, worker_id)
+            if job is None:
+                return False
+            job.update(lease_expires=time.time() + lease_seconds, updated=time.time())
+            return True
+
+    def ack(self, job_id, worker_id, result=None):
+        with self._lock:
+            job = self._owned(job_id, worker_id)
+            if job is None:
+                return False
+            job.update(status="done", result=result, lease_expires=None, updated=time.time())
+            return True
+
+    def fail(self, job_id, worker_id, error):
+        with self._lock:
+            job = self._owned(job_id, worker_id)
+            if job is None:
+                return False
+            job.update(status="queued" if job["attempts"] < job["max_attempts"] else "failed",
+                       worker=None, lease_expires=None, error=error, updated=time.time())
+            return True
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] not in ACTIVE_STATUSES:
+                return False
+            job.update(status="cancelled", lease_expires=None, updated=time.time())
+            return True
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            self._expire(time.time())
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            workers = sorted({j["worker"] for j in self._jobs.values() if j["status"] == "leased"})
+            return {"broker": "memory", "counts": counts, "workers": workers}
+
+
+class SQLiteJobQueue(JobQueue):
+    """Durable broker in one SQLite file (WAL); safe for several processes on the API host"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        priority INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        worker TEXT,
+        lease_expires REAL,
+        created REAL NOT NULL,
+        updated REAL NOT NULL,
+        result TEXT,
+        error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (status, priority, created);
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _write(self, sql: str, params: tuple) -> int:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(sql, params)
+            conn.execute("COMMIT")
+            return cursor.rowcount
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def enqueue(self, kind, payload, priority="interactive", max_attempts=DEFAULT_MAX_ATTEMPTS):
+        job_id = f"q_{uuid.uuid4().hex[:12]}"
+        now = time.time()
+        self._write(
+            "INSERT INTO jobs (id, kind, payload, priority, status, max_attempts, created, updated) "
+            "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+            (job_id, kind, json.dumps(payload, ensure_ascii=False), PRIORITIES[priority], max_attempts, now, now)
+        )
+        return job_id
+
+    def _expire(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+            "worker = NULL, lease_expires = NULL, updated = ?, error = 'lease expired' "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (now, now)
+        )
+
+    def lease(self, worker_id, kinds=None, lease_seconds=DEFAULT_LEASE_SECONDS):
+        now = time.time()
+        kinds = list(kinds or [])
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._expire(conn, now)
+            kind_sql = f" AND kind IN ({','.join('?' * len(kinds))})" if kinds else ""
+            row = conn.execute(
+                f"SELECT id FROM jobs WHERE status = 'queued'{kind_sql} ORDER BY priority, created LIMIT 1",
+                tuple(kinds)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, updated = ? "
+                "WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row["id"])
+            )
+            job = self._row(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+            conn.execute("COMMIT")
+            return job
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        now = time.time()
+        return self._write(
+            "UPDATE jobs SET lease_expires = ?, updated = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (now + lease_seconds, now, job_id, worker_id)
+        ) == 1
+
+    def ack(self, job_id, worker_id, result=None):
+        return self._write(
+            "UPDATE jobs SET status = 'done', result = ?, lease_expires = NULL, updated = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (json.dumps(result, ensure_ascii=False, default=str), time.time(), job_id, worker_id)
+        ) == 1
+
+    def fail(self, job_id, worker_id, error):
+        return self._write(
+            "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+            "worker = NULL, lease_expires = NULL, error = ?, updated = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (error, time.time(), job_id, worker_id)
+        ) == 1
+
+    def cancel(self, job_id):
+        return self._write(
+            "UPDATE jobs SET status = 'cancelled', lease_expires = NULL, updated = ? "
+            "WHERE id = ? AND status IN ('queued', 'leased')",
+            (time.time(), job_id)
+        ) == 1
+
+    def get(self, job_id):
+        return self._row(self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def stats(self):
+        conn = self._connect()
+        counts = {row["status"]: row["n"] for row in
+                  conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")}
+        workers = [row["worker"] for row in
+                   conn.execute("SELECT DISTINCT worker FROM jobs WHERE status = 'leased' ORDER BY worker")]
+        return {"broker": "sqlite", "path": str(self.path), "counts": counts, "workers": workers}
+
+
+class HTTPJobQueue(JobQueue):
+    """Worker-side client for the API's /api/queue endpoints"""
+
+    def __init__(self, base_url: str, token: Optional[str] = None, timeout: float = 15.0):
+        import httpx
+        self._client = httpx.Client(base_url=base_url.rstrip("/"), timeout=timeout,
+                                    headers={"X-Queue-Token": token} if token else {})
+
+    def _post(self, path: str, body: Dict[str, Any]) -> Any:
+        response = self._client.post(path, json=body)
+        response.raise_for_status()
+        return response.json()
+
+    def enqueue(self, kind, payload, priority="interactive", max_attempts=DEFAULT_MAX_ATTEMPTS):
+        return self._post("/api/queue/enqueue", {"kind": kind, "payload": payload, "priority": priority,
+                                                 "max_attempts": max_attempts})["id"]
+
+    def lease(self, worker_id, kinds=None, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return self._post("/api/queue/lease", {"worker_id": worker_id, "kinds": list(kinds or []),
+                                               "lease_seconds": lease_seconds}).get("job")
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return self._post(f"/api/queue/{job_id}/heartbeat", {"worker_id": worker_id,
+                                                             "lease_seconds": lease_seconds})["ok"]
+
+    def ack(self, job_id, worker_id, result=None):
+        return self._post(f"/api/queue/{job_id}/ack", {"worker_id": worker_id, "result": result})["ok"]
+
+    def fail(self, job_id, worker_id, error):
+        return self._post(f"/api/queue/{job_id}/fail", {"worker_id": worker_id, "error": error})["ok"]
+
+    def cancel(self, job_id):
+        return self._post(f"/api/queue/{job_id}/cancel", {})["ok"]
+
+    def get(self, job_id):
+        response = self._client.get(f"/api/queue/{job_id}")
+        return response.json() if response.status_code == 200 else None
+
+    def stats(self):
+        return self._client.get("/api/queue").json()
+
+    def upload(self, job_id: str, worker_id: str, name: str, data: bytes) -> bool:
+        """Push one session file of a leased job into the API's session store"""
+        response = self._client.put(f"/api/queue/{job_id}/files/{name}", content=data,
+                                    params={"worker_id": worker_id})
+        return response.status_code == 200
+
+
+def open_queue(url: str, token: Optional[str] = None) -> JobQueue:
+    if url.startswith("sqlite:///"):
+        return SQLiteJobQueue(Path(url[len("sqlite:///"):]))
+    if url.startswith("memory://"):
+        return MemoryJobQueue()
+    if url.startswith(("http://", "https://")):
+        return HTTPJobQueue(url, token)
+    raise ValueError(f"Unsupported queue URL: {url}")
+
+
+def active(job: Optional[Dict[str, Any]]) -> bool:
+    return job is not None and job["status"] in ACTIVE_STATUSES
+
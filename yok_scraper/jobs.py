@@ -0,0 +1,308 @@
+"""
+Scraping jobs that write session files
+
+A session directory holds main_profile.json/main_done.txt for the search
+and collaborators.json/collaborators_done.txt (plus graph.json) for the
+collaborator crawl; a multi-hop crawl streams to crawl.jsonl and
+checkpoints crawl_state.json (see crawl.py). The API polls these files, so jobs write them the same
+way regardless of whether they run in a CLI script or a pool worker.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .collaborators import open_graph, scrape_collaborator
+from .crawl import (CRAWL_DONE_FILE, CRAWL_FILE, CRAWL_STATE_FILE, DEFAULT_HOPS, DEFAULT_MAX_PAGES, MAX_HOPS, ORDERS,
+                    CrawlState, append_events, node_key)
+from .deadline import Deadline
+from .driver import create_driver
+from .graph import collaborator_links
+from .parsing import parse_profile_row
+from .ratelimit import UpstreamUnavailable
+from .search import open_search, read_profile_rows, search_profiles
+from .sessions import session_path, write_json, write_marker
+from .trace import job_trace, span
+
+# Havuz işçisi bunu kendi yield bayrağına bağlar; CLI'da iş hiç yer açmaz
+should_yield: Callable[[], bool] = lambda: False
+
+
+class JobYielded(Exception):
+    """A job stopped at a checkpoint to make room for higher-priority work"""
+
+
+def _read_json(path: Path) -> Any:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def run_search_job(
+    name: str,
+    session_id: str,
+    field: Optional[str] = None,
+    specialties: Optional[List[str]] = None,
+    email: Optional[str] = None,
+    sessions_root: Optional[Path] = None,
+    deadline: Optional[float] = None,
+    max_profiles: Optional[int] = None,
+    filter_expr: Optional[str] = None
+) -> Dict[str, Any]:
+    """Main profile search; an email match continues straight into the collaborator job
+
+    main_profile.json is rewritten after every results page, so progressive
+    API clients see the first page while later pages are still loading.
+    max_profiles overrides the default 20/100 result limit; filter_expr
+    (yok_scraper.filters) drops non-matching rows before extraction.
+    """
+    budget = Deadline(deadline)
+    session_dir = session_path(session_id, sessions_root)
+    main_profile_path = session_dir / "main_profile.json"
+    print(f"[DEBUG] SESSION_DIR: {session_dir}", flush=True)
+
+    with job_trace(session_dir, "job.search", name=name, field=field, email=bool(email)) as job_attrs:
+        print("[DEBUG] WebDriver başlatılıyor...", flush=True)
+        with span("driver.start"):
+            driver = create_driver()
+        try:
+            def on_page(profiles: List[Dict[str, Any]]) -> None:
+                # Her sayfa sonunda incremental olarak dosyaya yaz
+                with span("write", file="main_profile.json", records=len(profiles)):
+                    write_json(main_profile_path, profiles)
+                print(f"[INFO] main_profile.json dosyası güncellendi ({len(profiles)} profil).", flush=True)
+
+            result = search_profiles(driver, name, field, specialties, email, max_profiles=max_profiles,
+                                     on_page=on_page, deadline=budget, filter_expr=filter_expr)
+        except UpstreamUnavailable as e:
+            # API bu işareti görünce beklemeyi bırakır (önbellekten döner ya da 503)
+            print(f"[ERROR] {e}", flush=True)
+            write_marker(session_dir / "main_done.txt", "unavailable")
+            raise
+        finally:
+            with span("driver.quit"):
+                driver.quit()
+            print("[DEBUG] WebDriver kapatıldı.", flush=True)
+
+        profiles = result["profiles"]
+        job_attrs.update(profiles=len(profiles), partial=result["partial"])
+        matched = result["matched"]
+        if matched:
+            write_json(main_profile_path, [matched])
+            write_marker(session_dir / "main_done.txt", "completed")
+            print(f"[COLLABORATORS] İşbirlikçi scraping başlatıldı: {matched['name']}", flush=True)
+            collaborators = run_collaborators_job(matched["name"], session_id, matched["url"], sessions_root, deadline)
+            return {"profiles": [matched], "email_found": True, "collaborators": len(collaborators)}
+
+        print(f"[INFO] Toplam {len(profiles)} profil toplandı. JSON'a yazılıyor...", flush=True)
+        if email:
+            # Email araması yapıldıysa ve email bulunamadıysa
+            data: Any = {"profiles": profiles, "email_found": False,
+                         "message": f"Email '{email}' bulunamadı. {len(profiles)} profil tarandı."}
+        else:
+            data = profiles
+        with span("write", file="main_profile.json", records=len(profiles)):
+            write_json(main_profile_path, data)
+        print("[INFO] main_profile.json dosyası yazıldı.", flush=True)
+        # Scraping tamamlandı sinyali (main_done.txt); süre dolduysa "partial"
+        if profiles:
+            write_marker(session_dir / "main_done.txt", "partial" if result["partial"] else "completed")
+        return {"profiles": profiles, "email_found": False if email else None, "partial": result["partial"]}
+
+
+def run_collaborators_job(
+    name: str,
+    session_id: str,
+    profile_url: Optional[str] = None,
+    sessions_root: Optional[Path] = None,
+    deadline: Optional[float] = None,
+    resume: bool = False
+) -> List[Dict[str, Any]]:
+    """Read the co-author graph, then visit collaborator pages until the deadline
+
+    Between collaborator items the job checks should_yield() and raises
+    JobYielded; with resume=True it picks up from graph.json and the
+    collaborators already written instead of starting over.
+    """
+    budget = Deadline(deadline)
+    session_dir = session_path(session_id, sessions_root)
+    collaborators_path = session_dir / "collaborators.json"
+    collaborators: List[Dict[str, Any]] = []
+    partial = False
+    unavailable = False
+    graph = None
+    if resume:
+        graph = _read_json(session_dir / "graph.json")
+        collaborators = (_read_json(collaborators_path) or []) if graph else []
+        print(f"[INFO] Kaldığı yerden devam: {len(collaborators)} işbirlikçi hazır.", flush=True)
+
+    with job_trace(session_dir, "job.collaborators", name=name, resume=resume) as job_attrs:
+        with span("driver.start"):
+            driver = create_driver()
+        try:
+            if not graph:
+                with span("graph.open", direct=bool(profile_url)):
+                    graph = open_graph(driver, name, profile_url)
+                with span("write", file="graph.json"):
+                    write_json(session_dir / "graph.json", {"profile_url": profile_url, **graph})
+            for idx, obj in enumerate(collaborator_links(graph or {}), start=1):
+                if idx <= len(collaborators):
+                    continue
+                if should_yield():
+                    print(f"[YIELD] Öncelikli iş için yer açılıyor ({len(collaborators)} işbirlikçi yazıldı).", flush=True)
+                    raise JobYielded(f"{len(collaborators)} collaborators written")
+                if budget.expired():
+                    print(f"[DEADLINE] Süre doldu, {len(collaborators)} işbirlikçi ile dönülüyor.", flush=True)
+                    partial = True
+                    break
+                with span("collaborator.page", idx=idx, name=obj["name"]) as page_attrs:
+                    try:
+                        record = scrape_collaborator(driver, idx, obj["name"], obj["href"], obj["weight"])
+                    except UpstreamUnavailable:
+                        raise
+                    except Exception as e:
+                        print(f"[ERROR] İşbirlikçi işlenemedi ({obj['name']}): {e}", flush=True)
+                        page_attrs["error"] = str(e)
+                        record = scrape_collaborator(driver, idx, obj["name"], "", obj["weight"])
+                collaborators.append(record)
+                with span("write", file="collaborators.json", records=len(collaborators)):
+                    write_json(collaborators_path, collaborators)
+        except UpstreamUnavailable as e:
+            print(f"[ERROR] {e} ({len(collaborators)} işbirlikçi ile dönülüyor)", flush=True)
+            partial = unavailable = True
+        finally:
+            with span("driver.quit"):
+                driver.quit()
+        job_attrs.update(collaborators=len(collaborators), partial=partial, unavailable=unavailable)
+
+        # --- DONE dosyasını sadece işbirlikçi varsa ve scraping bittiyse oluştur ---
+        # Upstream erişilemezse bekleyenler boşuna beklemesin diye her durumda işaretlenir
+        if unavailable:
+            write_marker(session_dir / "collaborators_done.txt", "unavailable")
+        elif collaborators:
+            write_marker(session_dir / "collaborators_done.txt", "partial" if partial else "done")
+        return collaborators
+
+
+def run_crawl_job(
+    name: str,
+    session_id: str,
+    profile_url: str,
+    hops: int = DEFAULT_HOPS,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    order: str = "weight",
+    sessions_root: Optional[Path] = None,
+    deadline: Optional[float] = None,
+    resume: bool = False
+) -> Dict[str, Any]:
+    """Breadth-first co-author crawl from profile_url, streaming to crawl.jsonl
+
+    Stops at max_pages graph pages or the deadline; yields like the
+    collaborator job and with resume=True continues from crawl_state.json.
+    """
+    budget = Deadline(deadline)
+    session_dir = session_path(session_id, sessions_root)
+    stream_path = session_dir / CRAWL_FILE
+    state_path = session_dir / CRAWL_STATE_FILE
+    saved = _read_json(state_path) if resume else None
+    if saved:
+        state = CrawlState.from_dict(saved)
+        # Son checkpoint'ten sonra yazılan olaylar yeniden üretilecek
+        with open(stream_path, "ab") as f:
+            f.truncate(state.stream_bytes)
+        print(f"[INFO] Tarama kaldığı yerden devam: {state.pages} sayfa, {len(state.frontier)} aday.", flush=True)
+    else:
+        state = CrawlState(profile_url, name, max(1, min(hops, MAX_HOPS)), order if order in ORDERS else "weight")
+        stream_path.write_bytes(b"")
+        state.stream_bytes = append_events(stream_path, [{"type": "node", **state.seen[node_key(profile_url)]}])
+        write_json(state_path, state.to_dict())
+    partial = unavailable = False
+
+    with job_trace(session_dir, "job.crawl", name=name, hops=state.hops, max_pages=max_pages, resume=resume) as job_attrs:
+        with span("driver.start"):
+            driver = create_driver()
+        try:
+            while state.frontier:
+                if state.pages >= max_pages or budget.expired():
+                    print(f"[DEADLINE] Tarama bütçesi doldu ({state.pages} sayfa, {len(state.frontier)} aday kaldı).", flush=True)
+                    partial = True
+                    break
+                if should_yield():
+                    print(f"[YIELD] Öncelikli iş için yer açılıyor ({state.pages} sayfa tarandı).", flush=True)
+                    raise JobYielded(f"{state.pages} pages crawled")
+                node = state.seen[state.pop()]
+                with span("crawl.expand", depth=node["depth"], name=node["name"]) as expand_attrs:
+                    try:
+                        graph = open_graph(driver, node["name"], node["url"])
+                    except UpstreamUnavailable as e:
+                        # Bu profil son checkpoint'te hâlâ adaylar arasında; devam eden iş onu yeniden dener
+                        print(f"[ERROR] {e}", flush=True)
+                        partial = unavailable = True
+                        break
+                    except Exception as e:
+                        print(f"[ERROR] Graf okunamadı ({node['name']}): {e}", flush=True)
+                        expand_attrs["error"] = str(e)
+                        graph = {"nodes": [], "edges": []}
+                    state.pages += 1
+                    events = state.expand(node, graph)
+                    expand_attrs["events"] = len(events)
+                with span("write", file=CRAWL_FILE, events=len(events)):
+                    state.stream_bytes += append_events(stream_path, events)
+                    write_json(state_path, state.to_dict())
+        finally:
+            with span("driver.quit"):
+                driver.quit()
+        job_attrs.update(pages=state.pages, nodes=len(state.seen), partial=partial)
+
+    write_marker(session_dir / CRAWL_DONE_FILE, "unavailable" if unavailable else "partial" if partial else "done")
+    print(f"[INFO] Tarama bitti: {state.pages} sayfa, {len(state.seen)} profil.", flush=True)
+    return {"pages": state.pages, "nodes": len(state.seen), "frontier": len(state.frontier), "partial": partial}
+
+
+def lookup_profiles(name: str, limit: int = 5) -> Dict[str, Any]:
+    """First-page search results without a session (used by mcp_tools.py)"""
+    if not name:
+        return {"error": "Name parameter is required"}
+    driver = create_driver()
+    try:
+        open_search(driver, name)
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "tr[id^='authorInfo_']"))
+        )
+        rows = read_profile_rows(driver)[:limit]
+        results = []
+        for idx, row in enumerate(rows, start=1):
+            profile = parse_profile_row(row, idx)
+            results.append({k: profile[k] for k in ("name", "title", "url", "info", "photoUrl", "header", "email")})
+        return {"results": results}
+    finally:
+        driver.quit()
+
+
+def lookup_collaborators(name: str) -> Dict[str, Any]:
+    """Co-author graph of the first search hit without visiting each page (used by mcp_tools.py)"""
+    driver = create_driver()
+    try:
+        graph = open_graph(driver, name)
+        collaborators = [
+            {"id": idx, "name": obj["name"], "url": obj["href"], "weight": obj["weight"]}
+            for idx, obj in enumerate(collaborator_links(graph), start=1)
+        ]
+        return {"collaborators": collaborators, "edges": graph.get("edges", [])}
+    finally:
+        driver.quit()
+
+
+# Havuz işçilerinin çalıştırabileceği işler
+JOBS = {
+    "search": run_search_job,
+    "collaborators": run_collaborators_job,
+    "crawl": run_crawl_job,
+    "lookup_profiles": lookup_profiles,
+    "lookup_collaborators": lookup_collaborators,
+}
@@ -0,0 +1,166 @@
+"""
+Parsing of YÖK Akademik search rows and profile pages
+
+The JS snippets collect every field a row/page needs in one script call;
+the Python builders turn that raw data into the records written to the
+session files. Both the Selenium and the CDP engine use them.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import DEFAULT_PHOTO_URL
+
+# Arama sonuç sayfasındaki tüm satırlar
+PROFILE_ROWS_JS = """
+Array.from(document.querySelectorAll("tr[id^='authorInfo_']")).map(row => {
+    const td = Array.from(row.children).find(c => c.tagName === 'TD' && Array.from(c.children).some(x => x.tagName === 'H6'));
+    const labels = td ? td.querySelectorAll('a.anahtarKelime') : [];
+    const link = row.querySelector('a');
+    const img = row.querySelector('img');
+    const mail = row.querySelector("a[href^='mailto']");
+    return {
+        info: td ? td.innerText.trim() : '',
+        green_label: labels.length > 0 ? labels[0].innerText.trim() : '',
+        blue_label: labels.length > 1 ? labels[1].innerText.trim() : '',
+        link_text: link ? link.innerText.trim() : '',
+        url: link ? link.href : '',
+        img: img ? img.src : '',
+        email: mail ? mail.innerText.trim().replace('[at]', '@') : ''
+    };
+})
+"""
+
+# Bir işbirlikçinin profil sayfası
+COLLABORATOR_PAGE_JS = """
+(() => {
+    const td = Array.from(document.querySelectorAll('td')).find(c => Array.from(c.children).some(x => x.tagName === 'H6'));
+    if (!td) return null;
+    const green = td.querySelector('span.label-success');
+    const blue = td.querySelector('span.label-primary');
+    let keywords = '';
+    if (blue) {
+        const m = td.innerHTML.match(/<span[^>]*label-primary[^>]*>.*?<\\/span>([^<]*)/);
+        if (m) keywords = m[1].trim();
+    }
+    const mail = td.querySelector("a[href^='mailto']");
+    const img = document.querySelector('img.img-circle') || document.querySelector('img#imgPicture');
+    return {
+        info: td.innerText,
+        green_label: green ? green.innerText.trim() : '',
+        blue_label: blue ? blue.innerText.trim() : '',
+        keywords: keywords,
+        email: mail ? mail.innerText.trim().replace('[at]', '@') : '',
+        photo: img ? img.src : ''
+    };
+})()
+"""
+
+
+def sanitize_filename(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9ĞÜŞİÖÇğüşiöç ]+', '_', name).strip().replace(" ", "_")
+
+
+# --- YÖK AKADEMİK KUTUCUK AYRIŞTIRICI (SON HAL) ---
+def parse_labels_and_keywords(line: str) -> Tuple[str, str, List[str]]:
+    parts = [p.strip() for p in line.split(';')]
+    left = parts[0] if parts else ''
+    rest_keywords = [p.strip() for p in parts[1:] if p.strip()]
+    left_parts = re.split(r'\s{2,}|\t+', left)
+    green_label = left_parts[0].strip() if len(left_parts) > 0 else '-'
+    blue_label = left_parts[1].strip() if len(left_parts) > 1 else '-'
+    keywords = []
+    if len(left_parts) > 2:
+        keywords += [p.strip() for p in left_parts[2:] if p.strip()]
+    keywords += rest_keywords
+    if not keywords:
+        keywords = ['-']
+    return green_label, blue_label, keywords
+
+
+def row_keywords(row: Dict[str, Any]) -> str:
+    """Keywords of a PROFILE_ROWS_JS row ("a ; b"); only the label text is cut from their line"""
+    info = row["info"]
+    info_lines = info.splitlines()
+    header = info_lines[2].strip() if len(info_lines) > 2 else ''
+    label_text = f"{row['green_label']}   {row['blue_label']}"
+    keywords_text = info.replace(label_text, '').strip()
+    keywords_text = keywords_text.lstrip(';:,. \u000b\n\t')
+    lines = [l.strip() for l in keywords_text.split('\n') if l.strip()]
+    if not lines:
+        return ""
+    keywords_line = lines[-1]
+    if header == keywords_line or header in keywords_line:
+        return ""
+    return " ; ".join(k.strip() for k in keywords_line.split(';') if k.strip())
+
+
+def parse_profile_row(row: Dict[str, Any], profile_id: int) -> Dict[str, Any]:
+    """Detailed profile record from a PROFILE_ROWS_JS row"""
+    info = row["info"]
+    info_lines = info.splitlines()
+    if len(info_lines) > 1:
+        title = info_lines[0].strip()
+        name = info_lines[1].strip()
+    else:
+        title = row["link_text"]
+        name = row["link_text"]
+    header = info_lines[2].strip() if len(info_lines) > 2 else ''
+    return {
+        "id": profile_id,
+        "name": name,
+        "title": title,
+        "url": row["url"],
+        "info": info,
+        "photoUrl": row["img"] or DEFAULT_PHOTO_URL,
+        "header": header,
+        "green_label": row["green_label"],
+        "blue_label": row["blue_label"],
+        "keywords": row_keywords(row),
+        "email": row["email"]
+    }
+
+
+def lightweight_profile(row: Dict[str, Any], profile_id: int) -> Dict[str, Any]:
+    """Minimal record kept while scanning rows for an email match"""
+    return {
+        "id": profile_id,
+        "name": row["link_text"],
+        "url": row["url"],
+        "email": row["email"]
+    }
+
+
+def parse_collaborator_page(page: Optional[Dict[str, Any]], idx: int, name: str, href: str,
+                            weight: Optional[float] = None) -> Dict[str, Any]:
+    """Collaborator record from COLLABORATOR_PAGE_JS data (None means deleted/missing profile)"""
+    record = {
+        "id": idx,
+        "name": name,
+        "title": '',
+        "info": '',
+        "green_label": '',
+        "blue_label": '',
+        "keywords": '',
+        "photoUrl": DEFAULT_PHOTO_URL,
+        "status": "completed",
+        "deleted": True,
+        "url": "",
+        "email": '',
+        "weight": weight
+    }
+    if not href or not page:
+        return record
+    info_lines = page["info"].splitlines()
+    record.update({
+        "title": info_lines[0].strip() if len(info_lines) > 1 else name,
+        "info": info_lines[2].strip() if len(info_lines) > 2 else '',
+        "green_label": page["green_label"],
+        "blue_label": page["blue_label"],
+        "keywords": page["keywords"],
+        "photoUrl": page["photo"] or DEFAULT_PHOTO_URL,
+        "deleted": False,
+        "url": href,
+        "email": page["email"]
+    })
+    return record
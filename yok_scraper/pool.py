@@ -0,0 +1,408 @@
+"""
+Pre-forked worker pool for scraping jobs
+
+Workers are started once from a forkserver that has already imported
+selenium, webdriver_manager and the scraping package, so a job starts in
+an interpreter that is ready to create a driver. Each worker runs in its
+own process group; cancelling a job kills the whole group (worker,
+chromedriver and Chrome) and a fresh worker takes its place.
+
+Queued jobs are ordered by priority class (interactive searches, then
+selected-profile collaborator crawls, then background prefetch/refresh)
+and shared round-robin between clients within a class. When a higher
+class is waiting and every worker is busy, a worker running a yieldable
+job is asked to yield; the job stops between collaborator items and is
+requeued to resume from its checkpoint.
+"""
+
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from typing import Any, Deque, Dict, List, Optional
+
+# Forkserver'ın önceden import ettiği modüller
+PRELOAD_MODULES = [
+    "selenium.webdriver",
+    "webdriver_manager.chrome",
+    "yok_scraper.jobs",
+]
+
+DEFAULT_POOL_SIZE = int(os.environ.get("SCRAPER_POOL_SIZE", "4"))
+
+# Öncelik sınıfları (küçük olan önce çalışır)
+PRIORITIES = {"interactive": 0, "collaborators": 1, "background": 2}
+DEFAULT_PRIORITY = {
+    "search": "interactive",
+    "lookup_profiles": "interactive",
+    "lookup_collaborators": "interactive",
+    "collaborators": "collaborators",
+    "crawl": "background",
+}
+# İşbirlikçi öğeleri arasında yer açmak için durup kuyruğa geri dönebilen işler
+YIELDABLE_KINDS = {"collaborators", "crawl"}
+
+
+class JobCancelled(Exception):
+    """Raised into a job's future when it is cancelled"""
+
+
+class JobHandle:
+    """A submitted job; its future resolves with the job function's return value"""
+
+    def __init__(self, job_id: str, kind: str, kwargs: Dict[str, Any],
+                 priority: str = "interactive", client: str = "anonymous"):
+        self.id = job_id
+        self.kind = kind
+        self.kwargs = kwargs
+        self.priority = priority
+        self.client = client
+        self.future: Future = Future()
+        self.pid: Optional[int] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancelled = False
+        self.yields = 0
+
+    @property
+    def status(self) -> str:
+        if self.cancelled:
+            return "cancelled"
+        if self.future.done():
+            return "failed" if self.future.exception() else "done"
+        return "running" if self.started_at else "queued"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "priority": self.priority,
+            "client": self.client,
+            "status": self.status,
+            "pid": self.pid,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "yields": self.yields,
+        }
+
+
+class FairQueue:
+    """Priority classes served in order, clients served round-robin within a class"""
+
+    def __init__(self):
+        self._classes: Dict[str, "OrderedDict[str, Deque[JobHandle]]"] = {
+            name: OrderedDict() for name in sorted(PRIORITIES, key=PRIORITIES.get)
+        }
+
+    def push(self, handle: JobHandle, front: bool = False) -> None:
+        clients = self._classes[handle.priority]
+        queue = clients.setdefault(handle.client, deque())
+        if front:
+            queue.appendleft(handle)
+        else:
+            queue.append(handle)
+
+    def pop(self) -> Optional[JobHandle]:
+        for clients in self._classes.values():
+            if clients:
+                client, queue = next(iter(clients.items()))
+                handle = queue.popleft()
+                if queue:
+                    clients.move_to_end(client)
+                else:
+                    del clients[client]
+                return handle
+        return None
+
+    def remove(self, handle: JobHandle) -> bool:
+        queue = self._classes[handle.priority].get(handle.client)
+        if queue is None or handle not in queue:
+            return False
+        queue.remove(handle)
+        if not queue:
+            del self._classes[handle.priority][handle.client]
+        return True
+
+    def best_waiting(self) -> Optional[int]:
+        """Rank of the most urgent waiting class"""
+        for name, clients in self._classes.items():
+            if clients:
+                return PRIORITIES[name]
+        return None
+
+    def waiting(self, rank: int) -> int:
+        return sum(len(q) for name, clients in self._classes.items() if PRIORITIES[name] == rank for q in clients.values())
+
+    def drain(self) -> List[JobHandle]:
+        handles = [h for clients in self._classes.values() for q in clients.values() for h in q]
+        for clients in self._classes.values():
+            clients.clear()
+        return handles
+
+    def counts(self) -> Dict[str, int]:
+        return {name: sum(len(q) for q in clients.values()) for name, clients in self._classes.items()}
+
+    def __len__(self) -> int:
+        return sum(self.counts().values())
+
+
+def _worker_main(conn, yield_event) -> None:
+    # Kendi süreç grubu: killpg chromedriver ve Chrome'u da kapsar
+    os.setpgrp()
+    from yok_scraper import jobs
+    from yok_scraper.jobs import JOBS, JobYielded
+    jobs.should_yield = yield_event.is_set
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if message is None:
+            break
+        job_id, kind, kwargs = message
+        try:
+            result = JOBS[kind](**kwargs)
+            conn.send((job_id, "done", result))
+        except JobYielded as e:
+            conn.send((job_id, "yielded", str(e)))
+        except Exception as e:
+            conn.send((job_id, "error", f"{type(e).__name__}: {e}\n{traceback.format_exc()}"))
+
+
+class _Worker:
+    def __init__(self, process, conn, yield_event):
+        self.process = process
+        self.conn = conn
+        self.yield_event = yield_event
+        self.job: Optional[JobHandle] = None
+        self.started_at = time.time()
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+
+class WorkerPool:
+    """Fixed-size pool of long-lived scraper processes fed from a priority/fair-share queue"""
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, start_method: str = "forkserver"):
+        self.size = size
+        self._ctx = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            self._ctx.set_forkserver_preload(PRELOAD_MODULES)
+        self._workers: List[_Worker] = []
+        self._queue = FairQueue()
+        self._jobs: Dict[str, JobHandle] = {}
+        self._ids = itertools.count(1)
+        # cancel() işi kilit altında bitirir; _finish de kayıt budamak için kilidi alır
+        self._lock = threading.RLock()
+        self._wakeup_r, self._wakeup_w = self._ctx.Pipe(duplex=False)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    # --- public API ---
+
+    def start(self) -> None:
+        with self._lock:
+            for _ in range(self.size):
+                self._workers.append(self._spawn())
+        self._thread = threading.Thread(target=self._loop, name="scraper-pool", daemon=True)
+        self._thread.start()
+        print(f"🏊 Scraper pool started with {self.size} workers: {[w.pid for w in self._workers]}")
+
+    def submit(self, kind: str, priority: Optional[str] = None, client: Optional[str] = None, **kwargs: Any) -> JobHandle:
+        """Queue a job; priority defaults by kind, client is the fair-share key (API key or IP)"""
+        priority = priority or DEFAULT_PRIORITY.get(kind, "background")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        handle = JobHandle(f"job_{int(time.time())}_{next(self._ids)}", kind, kwargs, priority, client or "anonymous")
+        with self._lock:
+            self._jobs[handle.id] = handle
+            self._queue.push(handle)
+        self._wakeup()
+        return handle
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a queued job or kill the worker running it"""
+        with self._lock:
+            handle = self._jobs.get(job_id)
+            if handle is None or handle.future.done():
+                return False
+            handle.cancelled = True
+            if self._queue.remove(handle):
+                self._finish(handle, error=JobCancelled(job_id))
+                return True
+            worker = next((w for w in self._workers if w.job is handle), None)
+        if worker is not None:
+            self._kill(worker)
+        self._wakeup()
+        return True
+
+    def get(self, job_id: str) -> Optional[JobHandle]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [handle.to_dict() for handle in self._jobs.values()]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            busy = sum(1 for w in self._workers if w.job is not None)
+            return {
+                "size": self.size,
+                "busy": busy,
+                "idle": len(self._workers) - busy,
+                "queued": len(self._queue),
+                "queued_by_priority": self._queue.counts(),
+                "yielding": sum(1 for w in self._workers if w.job is not None and w.yield_event.is_set()),
+                "worker_pids": [w.pid for w in self._workers],
+            }
+
+    def shutdown(self) -> None:
+        self._closed = True
+        self._wakeup()
+        with self._lock:
+            workers = list(self._workers)
+            queued = self._queue.drain()
+        for handle in queued:
+            self._finish(handle, error=JobCancelled(handle.id))
+        for worker in workers:
+            self._kill(worker)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # --- internals ---
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe()
+        yield_event = self._ctx.Event()
+        process = self._ctx.Process(target=_worker_main, args=(child_conn, yield_event), daemon=True)
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn, yield_event)
+
+    def _wakeup(self) -> None:
+        try:
+            self._wakeup_w.send_bytes(b"x")
+        except OSError:
+            pass
+
+    def _kill(self, worker: _Worker) -> None:
+        try:
+            os.killpg(worker.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            try:
+                worker.process.kill()
+            except Exception:
+                pass
+
+    def _finish(self, handle: JobHandle, result: Any = None, error: Optional[BaseException] = None) -> None:
+        handle.finished_at = time.time()
+        if handle.future.done():
+            return
+        if error is not None:
+            handle.future.set_exception(error)
+        else:
+            handle.future.set_result(result)
+        # Bitmiş işlerin kaydı sınırsız büyümesin (submit başka iş parçacıklarından kilit altında ekler)
+        with self._lock:
+            if len(self._jobs) > 1000:
+                for job_id in [j for j, h in self._jobs.items() if h.future.done()][:500]:
+                    self._jobs.pop(job_id, None)
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            for worker in self._workers:
+                if worker.job is None and len(self._queue):
+                    handle = self._queue.pop()
+                    worker.job = handle
+                    worker.yield_event.clear()
+                    handle.pid = worker.pid
+                    handle.started_at = time.time()
+                    worker.conn.send((handle.id, handle.kind, handle.kwargs))
+            self._request_yields()
+
+    def _request_yields(self) -> None:
+        # Kuyrukta daha öncelikli iş bekliyorsa ve boş işçi yoksa, düşük öncelikli
+        # yieldable işlerden bekleyen iş sayısı kadarına yer açmasını söyle
+        rank = self._queue.best_waiting()
+        if rank is None or any(w.job is None for w in self._workers):
+            return
+        needed = self._queue.waiting(rank) - sum(1 for w in self._workers if w.job is not None and w.yield_event.is_set())
+        candidates = sorted(
+            (w for w in self._workers
+             if w.job is not None and w.job.kind in YIELDABLE_KINDS
+             and PRIORITIES[w.job.priority] > rank and not w.yield_event.is_set()),
+            key=lambda w: (-PRIORITIES[w.job.priority], -(w.job.started_at or 0))
+        )
+        for worker in candidates[:max(0, needed)]:
+            worker.yield_event.set()
+
+    def _loop(self) -> None:
+        while not self._closed:
+            self._dispatch()
+            with self._lock:
+                workers = list(self._workers)
+            waitables = [self._wakeup_r] + [w.conn for w in workers] + [w.process.sentinel for w in workers]
+            ready = wait(waitables, timeout=1.0)
+            if self._wakeup_r in ready:
+                while self._wakeup_r.poll():
+                    self._wakeup_r.recv_bytes()
+            for worker in workers:
+                if worker.conn in ready:
+                    try:
+                        job_id, status, payload = worker.conn.recv()
+                    except (EOFError, OSError):
+                        continue
+                    with self._lock:
+                        handle = worker.job
+                        worker.job = None
+                    if handle is not None and handle.id == job_id:
+                        if status == "yielded":
+                            if handle.cancelled:
+                                self._finish(handle, error=JobCancelled(handle.id))
+                            else:
+                                self._requeue(handle)
+                        elif status == "done":
+                            self._finish(handle, result=payload)
+                        else:
+                            self._finish(handle, error=RuntimeError(payload))
+                if worker.process.sentinel in ready and not worker.process.is_alive():
+                    self._replace(worker)
+
+    def _requeue(self, handle: JobHandle) -> None:
+        # Yer açan iş kendi istemcisinin sırasının başına, kaldığı yerden devam etmek üzere döner
+        handle.yields += 1
+        handle.pid = None
+        handle.started_at = None
+        handle.kwargs["resume"] = True
+        with self._lock:
+            self._queue.push(handle, front=True)
+        print(f"⏸️ Job {handle.id} yielded to higher-priority work (yield #{handle.yields})")
+
+    def _replace(self, worker: _Worker) -> None:
+        # Açılışta çöken işçi (ör. import hatası) sürekli yeniden başlatılmasın
+        if worker.job is None and time.time() - worker.started_at < 1.0:
+            print(f"⚠️ Scraper worker {worker.pid} exited on startup (code {worker.process.exitcode}), retrying")
+            time.sleep(1.0)
+        with self._lock:
+            handle = worker.job
+            worker.job = None
+            if worker in self._workers:
+                self._workers.remove(worker)
+            if not self._closed:
+                self._workers.append(self._spawn())
+        worker.process.join(timeout=0)
+        if handle is not None:
+            if handle.cancelled:
+                self._finish(handle, error=JobCancelled(handle.id))
+            else:
+                self._finish(handle, error=RuntimeError(f"Worker {worker.pid} exited with code {worker.process.exitcode}"))
@@ -0,0 +1,185 @@
+"""
+Browser/driver provisioning for the scraping jobs
+
+Resolves one Chrome/Chromium binary and a chromedriver with the same major
+version once, at service start-up, and caches the pair on disk. The chosen
+paths are exported as CHROME_BINARY / CHROMEDRIVER_PATH so every job (pool
+worker, script subprocess, CDP engine) uses them without resolving again.
+A timed preflight launch verifies that the pair actually starts.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import PROJECT_ROOT
+
+CACHE_PATH = Path(os.environ.get("DRIVER_PROVISION_CACHE", str(PROJECT_ROOT / "data" / "driver_provision.json")))
+
+# Sunucuda görülen kurulum yerleri (öncelik sırasıyla)
+CHROME_CANDIDATES = (
+    "/usr/bin/google-chrome",
+    "/usr/bin/google-chrome-stable",
+    "/snap/bin/chromium",
+    "/usr/bin/chromium",
+    "/usr/bin/chromium-browser",
+)
+CHROMEDRIVER_CANDIDATES = (
+    "/usr/local/bin/chromedriver",
+    "/usr/bin/chromedriver",
+    "/snap/bin/chromium.chromedriver",
+)
+
+_VERSION_RE = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+
+# Son provision sonucu (/health için)
+STATUS: Dict[str, Any] = {"status": "not_provisioned"}
+
+
+class ProvisionError(Exception):
+    """No matching browser/driver pair could be found or launched"""
+
+
+def _version(path: str) -> Optional[str]:
+    try:
+        output = subprocess.run(
+            [path, "--version"], capture_output=True, text=True, timeout=15
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _VERSION_RE.search(output or "")
+    return match.group(0) if match else None
+
+
+def _major(version: Optional[str]) -> Optional[str]:
+    return version.split(".", 1)[0] if version else None
+
+
+def _existing(candidates: List[str]) -> List[str]:
+    found = []
+    for path in candidates:
+        if path and path not in found and os.path.isfile(path) and os.access(path, os.X_OK):
+            found.append(path)
+    return found
+
+
+def _chrome_candidates() -> List[str]:
+    which = [shutil.which(name) for name in ("google-chrome", "chromium", "chromium-browser")]
+    return _existing([os.environ.get("CHROME_BINARY", "")] + list(CHROME_CANDIDATES) + which)
+
+
+def _driver_candidates() -> List[str]:
+    return _existing([os.environ.get("CHROMEDRIVER_PATH", "")] + list(CHROMEDRIVER_CANDIDATES) + [shutil.which("chromedriver")])
+
+
+def _fingerprint(path: str) -> List[float]:
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime]
+
+
+def _load_cache() -> Optional[Dict[str, Any]]:
+    """Cached pair, if both files are still exactly the ones that were validated"""
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        for key, env in (("chrome_binary", "CHROME_BINARY"), ("chromedriver", "CHROMEDRIVER_PATH")):
+            # Ortam değişkeniyle açıkça başka bir yol istendiyse önbellek geçersiz
+            if os.environ.get(env) and os.environ[env] != cached[key]:
+                return None
+            if _fingerprint(cached[key]) != cached[f"{key}_fingerprint"]:
+                return None
+        return cached
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_cache(pair: Dict[str, Any]) -> None:
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = Path(str(CACHE_PATH) + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(pair, f, indent=2)
+    os.replace(tmp_path, CACHE_PATH)
+
+
+def resolve_pair() -> Dict[str, Any]:
+    """Find a Chrome binary and a chromedriver whose major versions match"""
+    chromes: List[Tuple[str, Optional[str]]] = [(path, _version(path)) for path in _chrome_candidates()]
+    drivers: List[Tuple[str, Optional[str]]] = [(path, _version(path)) for path in _driver_candidates()]
+    if not chromes:
+        raise ProvisionError("Chrome/Chromium binary not found")
+
+    for chrome, chrome_version in chromes:
+        for driver, driver_version in drivers:
+            if chrome_version and _major(chrome_version) == _major(driver_version):
+                return {"chrome_binary": chrome, "chrome_version": chrome_version,
+                        "chromedriver": driver, "chromedriver_version": driver_version}
+
+    # Yerelde uygun sürücü yok: webdriver_manager ile bir kez indir (yalnızca açılışta)
+    chrome, chrome_version = chromes[0]
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        driver = ChromeDriverManager(driver_version=chrome_version).install() if chrome_version else ChromeDriverManager().install()
+    except Exception as e:
+        raise ProvisionError(f"No chromedriver matches {chrome} ({chrome_version}): {e}")
+    driver_version = _version(driver)
+    if _major(driver_version) != _major(chrome_version):
+        raise ProvisionError(f"Driver {driver} ({driver_version}) does not match {chrome} ({chrome_version})")
+    return {"chrome_binary": chrome, "chrome_version": chrome_version,
+            "chromedriver": driver, "chromedriver_version": driver_version}
+
+
+def preflight(pair: Dict[str, Any]) -> float:
+    """Launch and quit one headless session; returns the launch time in ms"""
+    from .driver import create_driver
+    started = time.perf_counter()
+    driver = create_driver(pair["chrome_binary"], pair["chromedriver"])
+    try:
+        driver.get("about:blank")
+    finally:
+        driver.quit()
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def export_env(pair: Dict[str, Any]) -> None:
+    """Make the pair visible to workers and script subprocesses started after this"""
+    os.environ["CHROME_BINARY"] = pair["chrome_binary"]
+    os.environ["CHROMEDRIVER_PATH"] = pair["chromedriver"]
+
+
+def provision(run_preflight: bool = True) -> Dict[str, Any]:
+    """Resolve (or load the cached) pair, export it and run the preflight launch"""
+    global STATUS
+    started = time.perf_counter()
+    try:
+        pair = _load_cache()
+        cached = pair is not None
+        if pair is None:
+            pair = resolve_pair()
+            pair["chrome_binary_fingerprint"] = _fingerprint(pair["chrome_binary"])
+            pair["chromedriver_fingerprint"] = _fingerprint(pair["chromedriver"])
+            pair["resolved_at"] = time.time()
+            _save_cache(pair)
+        export_env(pair)
+        status: Dict[str, Any] = {
+            "status": "ok",
+            "cached": cached,
+            "chrome_binary": pair["chrome_binary"],
+            "chrome_version": pair["chrome_version"],
+            "chromedriver": pair["chromedriver"],
+            "chromedriver_version": pair["chromedriver_version"],
+            "resolve_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        if run_preflight:
+            try:
+                status["preflight_ms"] = preflight(pair)
+            except Exception as e:
+                status.update({"status": "preflight_failed", "error": str(e)})
+    except ProvisionError as e:
+        status = {"status": "failed", "error": str(e)}
+    STATUS = status
+    return status
@@ -0,0 +1,392 @@
+"""
+Adaptive upstream rate limiter for akademik.yok.gov.tr page loads
+
+Every scraper process on the host (pool workers, script subprocesses, the
+CDP engine) shares one limiter state: a JSON document guarded by an fcntl
+lock file, or a Redis key when UPSTREAM_LIMITER_REDIS_URL is set so several
+hosts share it. Each page type (search, profile, graph) has its own token
+bucket and its own concurrency window. The window grows additively on
+fast successful loads and shrinks multiplicatively (AIMD) on errors or
+loads slower than the type's target latency, so the scrapers converge on
+the highest concurrency the upstream sustains.
+
+The same state holds a circuit breaker for the whole upstream. It opens
+after BREAKER_FAILURES consecutive failed or far-too-slow loads (any page
+type); while open every acquire raises UpstreamUnavailable at once, so no
+browser waits out its timeouts against a dead site. After the open
+period one lightweight health request (probe_upstream, or the next page
+load when nobody probes) decides between closing it and reopening it
+with a doubled open period.
+
+Only failures of the load itself feed the window and the breaker: network
+and timeout errors, Selenium navigation errors and exceptions marked with
+an `upstream = True` attribute (CDP navigation errors). Anything else
+raised inside a slot (missing element, selector timeout, a bug) releases
+the slot without counting.
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import socket
+import time
+import urllib.error
+import urllib.request
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from .config import BASE, PROJECT_ROOT
+
+STATE_PATH = Path(os.environ.get("UPSTREAM_LIMITER_STATE", str(PROJECT_ROOT / "data" / "upstream_limiter.json")))
+REDIS_URL = os.environ.get("UPSTREAM_LIMITER_REDIS_URL")
+
+# Sayfa tipi başına bütçe: saniyede token, patlama, eşzamanlılık penceresi ve hedef gecikme
+DEFAULT_BUDGETS: Dict[str, Dict[str, float]] = {
+    "search": {"rate": 2.0, "burst": 4, "initial": 4, "min": 1, "max": 12, "target_latency": 4.0},
+    "profile": {"rate": 6.0, "burst": 10, "initial": 6, "min": 1, "max": 24, "target_latency": 3.0},
+    "graph": {"rate": 1.0, "burst": 2, "initial": 2, "min": 1, "max": 6, "target_latency": 5.0},
+}
+
+# AIMD parametreleri
+DECREASE_FACTOR = 0.7
+# Art arda gelen yavaş yanıtlar pencereyi bu süre içinde yalnızca bir kez küçültür
+DECREASE_COOLDOWN = 2.0
+# Sahibi çöken izinler bu süreden sonra serbest bırakılır
+LEASE_TTL = 120.0
+ACQUIRE_TIMEOUT = 60.0
+
+# Devre kesici: art arda hata sayısı, hedef gecikmenin kaç katı "hata" sayılır ve açık kalma süreleri
+BREAKER_FAILURES = int(os.environ.get("UPSTREAM_BREAKER_FAILURES", "5"))
+BREAKER_SLOW_FACTOR = float(os.environ.get("UPSTREAM_BREAKER_SLOW_FACTOR", "3"))
+BREAKER_OPEN_SECONDS = float(os.environ.get("UPSTREAM_BREAKER_OPEN_SECONDS", "30"))
+BREAKER_MAX_OPEN_SECONDS = float(os.environ.get("UPSTREAM_BREAKER_MAX_OPEN_SECONDS", "300"))
+PROBE_TIMEOUT = 5.0
+
+_HOST = socket.gethostname()
+
+
+class UpstreamBusy(Exception):
+    """No upstream slot became free within the acquire timeout"""
+
+
+class UpstreamUnavailable(Exception):
+    """The circuit breaker is open: the upstream is failing, so no load is attempted"""
+
+
+# Selenium'un sayfa yüklemesi (ağ hatası ya da renderer zaman aşımı) için verdiği mesajlar
+_SELENIUM_LOAD_ERRORS = ("net::ERR_", "Timed out receiving message from renderer")
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """Whether an exception raised during a page load is a failure of the load itself"""
+    if getattr(exc, "upstream", False):
+        return True
+    if isinstance(exc, (OSError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    # Seçici zaman aşımları (WebDriverWait) boş mesajlı TimeoutException'dır, sayılmaz
+    return type(exc).__name__ in ("WebDriverException", "TimeoutException") and any(
+        marker in str(exc) for marker in _SELENIUM_LOAD_ERRORS
+    )
+
+
+def _load_budgets() -> Dict[str, Dict[str, float]]:
+    budgets = {name: dict(values) for name, values in DEFAULT_BUDGETS.items()}
+    try:
+        overrides = json.loads(os.environ.get("UPSTREAM_BUDGETS", "{}"))
+    except ValueError:
+        overrides = {}
+    for name, values in overrides.items():
+        budgets.setdefault(name, dict(DEFAULT_BUDGETS["profile"])).update(values)
+    return budgets
+
+
+class _FileState:
+    """Limiter state shared by the processes of one host"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def locked(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw else {}
+                except ValueError:
+                    state = {}
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class _RedisState:
+    """Limiter state shared by several hosts through one Redis key"""
+
+    KEY = "akademik:upstream_limiter"
+
+    def __init__(self, url: str):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+
+    @contextmanager
+    def locked(self) -> Iterator[Dict[str, Any]]:
+        with self._redis.lock(self.KEY + ":lock", timeout=5, blocking_timeout=5):
+            raw = self._redis.get(self.KEY)
+            try:
+                state = json.loads(raw) if raw else {}
+            except ValueError:
+                state = {}
+            yield state
+            self._redis.set(self.KEY, json.dumps(state))
+
+
+def _breaker_view(breaker: Dict[str, Any], now: float) -> Dict[str, Any]:
+    retry_in = round(max(0.0, breaker["open_until"] - now), 1) if breaker["state"] != "closed" else 0
+    return {**breaker, "retry_in": retry_in}
+
+
+def _lease_alive(lease: Dict[str, Any], now: float) -> bool:
+    if now - lease["at"] > LEASE_TTL:
+        return False
+    if lease.get("host") == _HOST:
+        try:
+            os.kill(lease["pid"], 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+    return True
+
+
+class UpstreamLimiter:
+    """Token bucket + AIMD concurrency window per page type"""
+
+    def __init__(self, state_path: Path = STATE_PATH, redis_url: Optional[str] = REDIS_URL):
+        self.budgets = _load_budgets()
+        self._state: Any = None
+        if redis_url:
+            try:
+                self._state = _RedisState(redis_url)
+            except Exception as e:
+                print(f"[WARN] Redis limiter kullanılamıyor, dosya kilidine dönülüyor: {e}", flush=True)
+        if self._state is None:
+            self._state = _FileState(Path(state_path))
+
+    def _bucket(self, state: Dict[str, Any], page_type: str, now: float) -> Dict[str, Any]:
+        budget = self.budgets.get(page_type) or self.budgets["profile"]
+        bucket = state.setdefault(page_type, {
+            "tokens": budget["burst"], "refilled_at": now, "limit": budget["initial"],
+            "last_decrease": 0.0, "leases": {}, "latency_ewma": None, "error_ewma": 0.0,
+        })
+        bucket["tokens"] = min(budget["burst"], bucket["tokens"] + (now - bucket["refilled_at"]) * budget["rate"])
+        bucket["refilled_at"] = now
+        bucket["leases"] = {k: v for k, v in bucket["leases"].items() if _lease_alive(v, now)}
+        return bucket
+
+    @staticmethod
+    def _breaker(state: Dict[str, Any]) -> Dict[str, Any]:
+        return state.setdefault("_breaker", {
+            "state": "closed", "failures": 0, "open_until": 0.0, "open_seconds": BREAKER_OPEN_SECONDS,
+            "probe": None, "trips": 0, "last_error": None, "changed_at": 0.0,
+        })
+
+    def _trip(self, breaker: Dict[str, Any], now: float, reason: str) -> None:
+        # Yarı açıkken başarısız deneme süreyi ikiye katlar, kapalıdan açılış temel süreyle başlar
+        if breaker["state"] == "half_open":
+            breaker["open_seconds"] = min(BREAKER_MAX_OPEN_SECONDS, breaker["open_seconds"] * 2)
+        else:
+            breaker["open_seconds"] = BREAKER_OPEN_SECONDS
+            breaker["trips"] += 1
+        breaker.update(state="open", open_until=now + breaker["open_seconds"], probe=None,
+                       last_error=reason, changed_at=now)
+        print(f"[WARN] Upstream devre kesici açıldı ({reason}), {breaker['open_seconds']:.0f} sn", flush=True)
+
+    def _close(self, breaker: Dict[str, Any], now: float) -> None:
+        if breaker["state"] != "closed":
+            print("[INFO] Upstream devre kesici kapandı, YÖK Akademik yanıt veriyor", flush=True)
+        breaker.update(state="closed", failures=0, probe=None, open_seconds=BREAKER_OPEN_SECONDS, changed_at=now)
+
+    def _check_breaker(self, state: Dict[str, Any], now: float) -> Optional[str]:
+        """Raise while open; returns "probe" when this acquire becomes the half-open trial load"""
+        breaker = self._breaker(state)
+        if breaker["state"] == "closed":
+            return None
+        probe = breaker["probe"]
+        if now < breaker["open_until"] or (probe and now - probe < LEASE_TTL):
+            raise UpstreamUnavailable(
+                f"YÖK Akademik şu an erişilemez (devre kesici açık: {breaker['last_error']}); "
+                f"{max(0, breaker['open_until'] - now):.0f} sn sonra yeniden denenecek"
+            )
+        breaker.update(state="half_open", probe=now, changed_at=now)
+        return "probe"
+
+    def try_acquire(self, page_type: str) -> Any:
+        """A lease id, or the seconds to wait before trying again (UpstreamUnavailable while the breaker is open)"""
+        budget = self.budgets.get(page_type) or self.budgets["profile"]
+        now = time.time()
+        with self._state.locked() as state:
+            probe = self._check_breaker(state, now)
+            bucket = self._bucket(state, page_type, now)
+            if not probe and len(bucket["leases"]) >= int(bucket["limit"]):
+                return 0.1
+            if not probe and bucket["tokens"] < 1:
+                return (1 - bucket["tokens"]) / budget["rate"]
+            bucket["tokens"] = max(0.0, bucket["tokens"] - 1)
+            lease_id = uuid.uuid4().hex
+            bucket["leases"][lease_id] = {"at": now, "pid": os.getpid(), "host": _HOST}
+            return lease_id
+
+    def acquire(self, page_type: str, timeout: float = ACQUIRE_TIMEOUT) -> str:
+        expires = time.time() + timeout
+        while True:
+            result = self.try_acquire(page_type)
+            if isinstance(result, str):
+                return result
+            if time.time() + result > expires:
+                raise UpstreamBusy(f"{page_type} için upstream kapasitesi {timeout:.0f} sn içinde açılmadı")
+            time.sleep(min(max(result, 0.05), 1.0))
+
+    def release(self, page_type: str, lease_id: str, latency: float, ok: Optional[bool]) -> None:
+        """Return the slot and feed the load's outcome into the AIMD window (ok=None: not counted)"""
+        budget = self.budgets.get(page_type) or self.budgets["profile"]
+        now = time.time()
+        with self._state.locked() as state:
+            bucket = self._bucket(state, page_type, now)
+            bucket["leases"].pop(lease_id, None)
+            if ok is None:
+                return
+            previous = bucket["latency_ewma"]
+            bucket["latency_ewma"] = latency if previous is None else 0.8 * previous + 0.2 * latency
+            bucket["error_ewma"] = 0.8 * bucket["error_ewma"] + (0.0 if ok else 0.2)
+            if not ok or latency > budget["target_latency"]:
+                if now - bucket["last_decrease"] > DECREASE_COOLDOWN:
+                    bucket["limit"] = max(budget["min"], bucket["limit"] * DECREASE_FACTOR)
+                    bucket["last_decrease"] = now
+            else:
+                bucket["limit"] = min(budget["max"], bucket["limit"] + 1.0 / bucket["limit"])
+            self._record_outcome(state, now, ok, latency, budget["target_latency"] * BREAKER_SLOW_FACTOR, page_type)
+
+    def _record_outcome(self, state: Dict[str, Any], now: float, ok: bool, latency: float,
+                        slow_after: float, source: str) -> None:
+        breaker = self._breaker(state)
+        if ok and latency <= slow_after:
+            if breaker["state"] == "half_open" or breaker["failures"]:
+                self._close(breaker, now)
+            return
+        reason = f"{source} {'hata' if not ok else f'{latency:.1f} sn'}"
+        breaker["failures"] += 1
+        if breaker["state"] == "half_open" or (breaker["state"] == "closed" and breaker["failures"] >= BREAKER_FAILURES):
+            self._trip(breaker, now, reason)
+
+    def breaker(self) -> Dict[str, Any]:
+        """Breaker state; "retry_in" is the seconds until the next recovery probe"""
+        now = time.time()
+        with self._state.locked() as state:
+            return _breaker_view(self._breaker(state), now)
+
+    def probe_due(self) -> bool:
+        breaker = self.breaker()
+        return breaker["state"] != "closed" and breaker["retry_in"] <= 0
+
+    def record_probe(self, ok: bool, latency: float) -> None:
+        """Outcome of a health request made while the breaker is open"""
+        now = time.time()
+        with self._state.locked() as state:
+            breaker = self._breaker(state)
+            if breaker["state"] == "closed":
+                return
+            breaker["state"] = "half_open"
+            self._record_outcome(state, now, ok, latency, PROBE_TIMEOUT, "probe")
+
+    @contextmanager
+    def slot(self, page_type: str, timeout: float = ACQUIRE_TIMEOUT) -> Iterator[None]:
+        """Hold one upstream slot for a page load; only upstream failures count as errors"""
+        lease_id = self.acquire(page_type, timeout)
+        started = time.monotonic()
+        ok: Optional[bool] = None
+        try:
+            yield
+            ok = True
+        except BaseException as e:
+            ok = False if is_upstream_failure(e) else None
+            raise
+        finally:
+            self.release(page_type, lease_id, time.monotonic() - started, ok)
+
+    @asynccontextmanager
+    async def aslot(self, page_type: str, timeout: float = ACQUIRE_TIMEOUT):
+        """Async variant for the CDP engine; lock I/O runs in a thread"""
+        expires = time.time() + timeout
+        while True:
+            result = await asyncio.to_thread(self.try_acquire, page_type)
+            if isinstance(result, str):
+                break
+            if time.time() + result > expires:
+                raise UpstreamBusy(f"{page_type} için upstream kapasitesi {timeout:.0f} sn içinde açılmadı")
+            await asyncio.sleep(min(max(result, 0.05), 1.0))
+        started = time.monotonic()
+        ok: Optional[bool] = None
+        try:
+            yield
+            ok = True
+        except BaseException as e:
+            ok = False if is_upstream_failure(e) else None
+            raise
+        finally:
+            await asyncio.to_thread(self.release, page_type, result, time.monotonic() - started, ok)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current window, in-flight loads and observed latency/error rate per page type"""
+        now = time.time()
+        with self._state.locked() as state:
+            snapshot: Dict[str, Any] = {
+                page_type: {
+                    "limit": round(self._bucket(state, page_type, now)["limit"], 2),
+                    "in_flight": len(state[page_type]["leases"]),
+                    "tokens": round(state[page_type]["tokens"], 2),
+                    "latency_ewma": state[page_type]["latency_ewma"],
+                    "error_rate": round(state[page_type]["error_ewma"], 3),
+                }
+                for page_type in self.budgets
+            }
+            breaker = _breaker_view(self._breaker(state), now)
+        snapshot["breaker"] = {k: breaker[k] for k in ("state", "failures", "trips", "retry_in", "last_error")}
+        return snapshot
+
+
+def probe_upstream(timeout: float = PROBE_TIMEOUT) -> Dict[str, Any]:
+    """One lightweight GET of the site root (no browser); feeds the breaker when it is open"""
+    started = time.monotonic()
+    try:
+        with urllib.request.urlopen(BASE, timeout=timeout) as response:
+            ok = response.status < 500
+    except urllib.error.HTTPError as e:
+        ok = e.code < 500
+    except Exception as e:
+        ok = False
+        print(f"[WARN] Upstream sağlık kontrolü başarısız: {e}", flush=True)
+    latency = time.monotonic() - started
+    get_limiter().record_probe(ok, latency)
+    return {"ok": ok, "latency": round(latency, 3)}
+
+
+_limiter: Optional[UpstreamLimiter] = None
+
+
+def get_limiter() -> UpstreamLimiter:
+    """Process-wide limiter instance (state itself is shared host/cluster-wide)"""
+    global _limiter
+    if _limiter is None:
+        _limiter = UpstreamLimiter()
+    return _limiter
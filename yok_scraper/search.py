@@ -0,0 +1,191 @@
+"""
+Researcher search on YÖK Akademik (Selenium)
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from taxonomy import label_filter, normalize_label
+
+from .config import BASE, MAX_PROFILES, MAX_PROFILES_EMAIL
+from .deadline import Deadline
+from .filters import compile_filter
+from .driver import reset_browser_state, save_browser_state
+from .parsing import PROFILE_ROWS_JS, lightweight_profile, parse_profile_row
+from .ratelimit import UpstreamUnavailable, get_limiter
+from .trace import span
+
+
+CONSENT_XPATH = "//button[contains(text(),'Tümünü Kabul Et')]"
+
+
+def open_search(driver, target_name: str) -> None:
+    """Open AkademikArama, accept cookies, search the name and switch to the Akademisyenler tab
+
+    With restored cookies a failure is retried once from a clean cookie
+    state, since an expired site session looks like a broken page.
+    """
+    try:
+        _open_search(driver, target_name)
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        if not getattr(driver, "restored_cookies", 0):
+            raise
+        print(f"[WARN] Kayıtlı oturumla arama açılamadı ({e}), çerezler sıfırlanıp yeniden deneniyor.", flush=True)
+        reset_browser_state(driver)
+        _open_search(driver, target_name)
+
+
+def _open_search(driver, target_name: str) -> None:
+    print("[DEBUG] Akademik Arama sayfası açılıyor...", flush=True)
+    limiter = get_limiter()
+    restored = getattr(driver, "restored_cookies", 0)
+    with span("search.page_load"), limiter.slot("search"):
+        driver.get(BASE + "AkademikArama/")
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.ID, "aramaTerim"))
+        )
+    with span("search.consent", restored=restored) as consent_attrs:
+        # Kayıtlı onay çereziyle banner çıkmaz: beklemeden bak, yalnızca ilk oturumda bekle
+        buttons = driver.find_elements(By.XPATH, CONSENT_XPATH)
+        if not buttons and not restored:
+            try:
+                buttons = [WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, CONSENT_XPATH)))]
+            except Exception as e:
+                print(f"[DEBUG] Çerez butonu bulunamadı: {e}", flush=True)
+        consent_attrs["clicked"] = bool(buttons)
+        if buttons:
+            buttons[0].click()
+            print("[DEBUG] Çerez onaylandı.", flush=True)
+    kutu = driver.find_element(By.ID, "aramaTerim")
+    kutu.send_keys(target_name)
+    with span("search.submit"), limiter.slot("search"):
+        driver.find_element(By.ID, "searchButton").click()
+        print(f"[DEBUG] '{target_name}' için normal arama yapıldı.", flush=True)
+        tab = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.LINK_TEXT, "Akademisyenler"))
+        )
+    tab.click()
+    print("[DEBUG] 'Akademisyenler' sekmesine geçildi.", flush=True)
+    # Sağlıklı oturum: yeni onay verildiyse hemen, değilse ara sıra ortak jar'a yaz
+    save_browser_state(driver, force=consent_attrs["clicked"] or not restored)
+
+
+def read_profile_rows(driver) -> List[Dict[str, Any]]:
+    """Every row on the current results page in a single script call"""
+    return driver.execute_script("return " + PROFILE_ROWS_JS.strip()) or []
+
+
+def next_page(driver) -> bool:
+    """Click the pagination link after the active one; False on the last page"""
+    try:
+        first_row = driver.find_element(By.CSS_SELECTOR, "tr[id^='authorInfo_']")
+        pagination = driver.find_element(By.CSS_SELECTOR, "ul.pagination")
+        active_li = pagination.find_element(By.CSS_SELECTOR, "li.active")
+        all_lis = pagination.find_elements(By.TAG_NAME, "li")
+        active_index = all_lis.index(active_li)
+        if active_index == len(all_lis) - 1:
+            print("[INFO] Son sayfaya gelindi, döngü bitiyor.", flush=True)
+            return False
+        with span("search.next_page"), get_limiter().slot("search"):
+            all_lis[active_index + 1].find_element(By.TAG_NAME, "a").click()
+            WebDriverWait(driver, 10).until(EC.staleness_of(first_row))
+        return True
+    except Exception as e:
+        print(f"[INFO] Sonraki sayfa bulunamadı veya tıklanamadı: {e}", flush=True)
+        return False
+
+
+def search_profiles(
+    driver,
+    target_name: str,
+    field: Optional[str] = None,
+    specialties: Optional[List[str]] = None,
+    email: Optional[str] = None,
+    max_profiles: Optional[int] = None,
+    on_page: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    deadline: Optional[Deadline] = None,
+    filter_expr: Optional[str] = None
+) -> Dict[str, Any]:
+    """Search a name and collect profiles across result pages
+
+    Returns {"profiles": [...], "matched": profile-or-None, "partial": bool}.
+    With an email, rows are kept lightweight until a row's email matches;
+    that row is returned as "matched" with full details and scanning stops.
+    on_page is called with the profiles collected so far after each page.
+    When the deadline runs out, scanning stops after the current page and
+    "partial" is True. filter_expr (yok_scraper.filters) is checked on the
+    raw row before any record is built; only matching rows count toward
+    max_profiles.
+    """
+    field_filter, specialty_filter = label_filter(field, specialties or [])
+    row_filter = compile_filter(filter_expr)
+    if max_profiles is None:
+        max_profiles = MAX_PROFILES_EMAIL if email else MAX_PROFILES
+    deadline = deadline or Deadline()
+
+    open_search(driver, target_name)
+
+    profiles: List[Dict[str, Any]] = []
+    profile_urls = set()
+    page_num = 1
+    while True:
+        print(f"[INFO] {page_num}. sayfa yükleniyor...", flush=True)
+        try:
+            with span("search.wait_rows", page=page_num):
+                WebDriverWait(driver, deadline.timeout(10)).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "tr[id^='authorInfo_']"))
+                )
+        except Exception as e:
+            print(f"[ERROR] Profil satırları yüklenemedi: {e}", flush=True)
+            break
+        with span("search.rows", page=page_num) as rows_attrs:
+            rows = read_profile_rows(driver)
+            rows_attrs["rows"] = len(rows)
+        print(f"[INFO] {page_num}. sayfada {len(rows)} profil bulundu.", flush=True)
+        if not rows:
+            print("[INFO] Profil bulunamadı, döngü bitiyor.", flush=True)
+            break
+        with span("parse", page=page_num, rows=len(rows)):
+            for row in rows:
+                # Eğer field ve specialties parametreleri varsa, filtre uygula
+                if field_filter and normalize_label(row["green_label"]) not in field_filter:
+                    continue
+                if specialty_filter and normalize_label(row["blue_label"]) not in specialty_filter:
+                    continue
+                if row_filter and not row_filter(row):
+                    continue
+                url = row["url"]
+                if url in profile_urls:
+                    print(f"[SKIP] Profil zaten eklenmiş: {url}", flush=True)
+                    continue
+                if email:
+                    if row["email"].lower() == email.lower():
+                        print(f"[EMAIL_FOUND] Email eşleşmesi bulundu: {row['link_text']} - {row['email']}", flush=True)
+                        return {"profiles": profiles, "matched": parse_profile_row(row, len(profiles) + 1), "partial": False}
+                    profiles.append(lightweight_profile(row, len(profiles) + 1))
+                else:
+                    profiles.append(parse_profile_row(row, len(profiles) + 1))
+                profile_urls.add(url)
+                if len(profiles) >= max_profiles:
+                    break
+
+        print(f"[INFO] Şu ana kadar {len(profiles)} profil toplandı.", flush=True)
+        if len(profiles) >= max_profiles:
+            print(f"[LIMIT] {max_profiles} kişi limitine ulaşıldı. Scraping tamamlandı.", flush=True)
+            break
+        if on_page:
+            on_page(profiles)
+        if deadline.expired():
+            print(f"[DEADLINE] Süre doldu, {len(profiles)} profil ile dönülüyor.", flush=True)
+            return {"profiles": profiles, "matched": None, "partial": True}
+        if not next_page(driver):
+            break
+        page_num += 1
+        print(f"[INFO] {page_num}. sayfaya geçildi.", flush=True)
+
+    return {"profiles": profiles, "matched": None, "partial": False}
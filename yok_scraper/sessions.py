@@ -0,0 +1,48 @@
+"""
+Session directory helpers shared by the Selenium and CDP jobs
+
+Pollers (api_server.py, the Next.js routes) read these files while a job
+is still writing them, so JSON is always replaced atomically.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from .config import SESSIONS_ROOT
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Write via a temp file + rename so pollers never read half a file"""
+    tmp_path = Path(str(path) + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_marker(path: Path, text: str) -> None:
+    with open(path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def resolve_session_dir(session_id: Any, sessions_root: Optional[Path] = None) -> Path:
+    """Directory of a session id; ValueError when the id is empty or leaves the sessions root"""
+    root = Path(sessions_root or SESSIONS_ROOT).resolve()
+    if not isinstance(session_id, str) or not session_id.strip() or "\x00" in session_id:
+        raise ValueError(f"Invalid session id: {session_id!r}")
+    session_dir = (root / session_id).resolve()
+    # Kuyruktan gelen id'ler dışarıdan gelir: ../ ya da mutlak yol kök dışına çıkamaz
+    if session_dir == root or root not in session_dir.parents:
+        raise ValueError(f"Session id outside the sessions root: {session_id!r}")
+    return session_dir
+
+
+def session_path(session_id: str, sessions_root: Optional[Path] = None) -> Path:
+    session_dir = resolve_session_dir(session_id, sessions_root)
+    session_dir.mkdir(parents=True, exist_ok=True)
+    return session_dir
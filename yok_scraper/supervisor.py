@@ -0,0 +1,214 @@
+"""
+Scraper process supervisor
+
+Watches the process tree of every running scraping job (worker or script,
+chromedriver, Chrome) and kills jobs that exceed their wall-clock or RSS
+limit or stop making progress. Progress is the mtime of the session files
+a job rewrites after every page/collaborator. Browsers left behind by dead
+jobs are found through the CHROME_MARKER switch every scraper Chrome is
+started with, and stale collaborators_scraping.pid files are removed so
+they no longer block new collaborator jobs. Every kill is recorded.
+"""
+
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+import psutil
+
+from .config import CHROME_MARKER
+
+MAX_JOB_SECONDS = int(os.environ.get("SUPERVISOR_MAX_JOB_SECONDS", "420"))
+MAX_JOB_RSS_MB = int(os.environ.get("SUPERVISOR_MAX_JOB_RSS_MB", "1536"))
+STALL_SECONDS = int(os.environ.get("SUPERVISOR_STALL_SECONDS", "120"))
+
+# İlerleme olarak sayılan session dosyaları
+PROGRESS_FILES = ("main_profile.json", "collaborators.json", "graph.json", "crawl_state.json")
+
+# Bu süreçlerin altındaki Chrome/chromedriver sahipli sayılır
+_OWNER_NAMES = ("python", "chromedriver", "uvicorn")
+
+
+def _tree(pid: int) -> List[psutil.Process]:
+    try:
+        root = psutil.Process(pid)
+        return [root] + root.children(recursive=True)
+    except psutil.Error:
+        return []
+
+
+def tree_rss_mb(pid: int) -> float:
+    """Resident memory of a process and all its descendants"""
+    total = 0
+    for proc in _tree(pid):
+        try:
+            total += proc.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+
+def kill_tree(pid: int) -> int:
+    """Kill a process and its descendants; returns how many were signalled"""
+    procs = _tree(pid)
+    for proc in reversed(procs):
+        try:
+            proc.kill()
+        except psutil.Error:
+            pass
+    psutil.wait_procs(procs, timeout=3)
+    return len(procs)
+
+
+def _is_owned(proc: psutil.Process) -> bool:
+    try:
+        parent = proc.parent()
+        if parent is None or parent.pid == 1:
+            return False
+        name = parent.name().lower()
+    except psutil.Error:
+        return False
+    return any(owner in name for owner in _OWNER_NAMES)
+
+
+class Supervisor:
+    """Enforces job limits and reaps orphaned browsers for one host"""
+
+    def __init__(
+        self,
+        sessions_root: Path,
+        max_job_seconds: int = MAX_JOB_SECONDS,
+        max_job_rss_mb: int = MAX_JOB_RSS_MB,
+        stall_seconds: int = STALL_SECONDS,
+        history: int = 500
+    ):
+        self.sessions_root = Path(sessions_root)
+        self.max_job_seconds = max_job_seconds
+        self.max_job_rss_mb = max_job_rss_mb
+        self.stall_seconds = stall_seconds
+        self._kills: Deque[Dict[str, Any]] = deque(maxlen=history)
+
+    def limits(self) -> Dict[str, Any]:
+        return {
+            "max_job_seconds": self.max_job_seconds,
+            "max_job_rss_mb": self.max_job_rss_mb,
+            "stall_seconds": self.stall_seconds,
+        }
+
+    def kills(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return list(self._kills)[-limit:][::-1]
+
+    def _record(self, reason: str, **details: Any) -> None:
+        entry = {"time": time.time(), "reason": reason, **details}
+        self._kills.append(entry)
+        print(f"🪓 Supervisor kill ({reason}): {details}")
+
+    def last_progress(self, session_id: str, started_at: float) -> float:
+        session_dir = self.sessions_root / session_id
+        latest = started_at
+        for filename in PROGRESS_FILES:
+            try:
+                latest = max(latest, (session_dir / filename).stat().st_mtime)
+            except OSError:
+                pass
+        return latest
+
+    def check_jobs(self, jobs: Iterable[Dict[str, Any]]) -> int:
+        """Kill jobs over their limits
+
+        Each job is a dict with session_id, kind, pid (root of its process
+        tree; None for jobs sharing the CDP browser), started_at (None while
+        queued), kill (callable) and optionally max_seconds to override the
+        wall-clock limit (budgeted crawls) and progress_session when the job
+        writes into another session directory (prefetch crawls).
+        """
+        now = time.time()
+        killed = 0
+        for job in jobs:
+            pid, started_at = job.get("pid"), job.get("started_at")
+            if not started_at:
+                continue
+            age = now - started_at
+            rss = tree_rss_mb(pid) if pid else 0.0
+            stalled = now - self.last_progress(job.get("progress_session") or job["session_id"], started_at)
+            if age > (job.get("max_seconds") or self.max_job_seconds):
+                reason = "wall_clock"
+            elif rss > self.max_job_rss_mb:
+                reason = "rss"
+            elif stalled > self.stall_seconds:
+                reason = "no_progress"
+            else:
+                continue
+            try:
+                job["kill"]()
+            except Exception as e:
+                print(f"⚠️ Supervisor could not cancel job: {e}")
+                if pid:
+                    kill_tree(pid)
+            self._record(reason, session_id=job["session_id"], kind=job["kind"], pid=pid,
+                         age_s=round(age, 1), rss_mb=round(rss, 1), idle_s=round(stalled, 1))
+            if job["kind"] == "collaborators":
+                self._remove_pid_file(job["session_id"])
+            killed += 1
+        return killed
+
+    def reap_orphans(self) -> int:
+        """Kill marked Chrome browsers and chromedrivers whose owner is gone"""
+        reaped = 0
+        driver_path = os.environ.get("CHROMEDRIVER_PATH")
+        for proc in psutil.process_iter(["pid", "name", "cmdline"]):
+            cmdline = proc.info.get("cmdline") or []
+            is_browser = CHROME_MARKER in cmdline and not any(arg.startswith("--type=") for arg in cmdline)
+            is_driver = bool(driver_path) and bool(cmdline) and cmdline[0] == driver_path
+            if not (is_browser or is_driver) or _is_owned(proc):
+                continue
+            rss = tree_rss_mb(proc.pid)
+            count = kill_tree(proc.pid)
+            self._record("orphan", pid=proc.pid, process="chrome" if is_browser else "chromedriver",
+                         processes=count, rss_mb=round(rss, 1))
+            reaped += 1
+        return reaped
+
+    def _remove_pid_file(self, session_id: str) -> None:
+        try:
+            (self.sessions_root / session_id / "collaborators_scraping.pid").unlink()
+        except OSError:
+            pass
+
+    def clean_pid_files(self, is_active: Callable[[str], bool], min_age: float = 30.0) -> int:
+        """Remove collaborators_scraping.pid files whose job is finished or gone
+
+        The API worker running a job touches its pid file every supervisor
+        pass, so a file younger than min_age is live whichever worker owns
+        it; is_active only knows this process's jobs.
+        """
+        removed = 0
+        now = time.time()
+        for pid_path in self.sessions_root.glob("*/collaborators_scraping.pid"):
+            session_id = pid_path.parent.name
+            try:
+                age = now - pid_path.stat().st_mtime
+                ref = pid_path.read_text().strip()
+            except OSError:
+                continue
+            if (pid_path.parent / "collaborators_done.txt").exists():
+                stale = True
+            elif age < min_age or is_active(session_id):
+                stale = False
+            else:
+                stale = not (ref.isdigit() and psutil.pid_exists(int(ref)))
+            if stale:
+                self._remove_pid_file(session_id)
+                removed += 1
+        return removed
+
+    def sweep(self, jobs: Iterable[Dict[str, Any]], is_active: Callable[[str], bool],
+              housekeeping: bool = True) -> Dict[str, int]:
+        """One supervisor pass; orphan/pid-file housekeeping is the slow part"""
+        result = {"killed": self.check_jobs(jobs)}
+        if housekeeping:
+            result["orphans"] = self.reap_orphans()
+            result["pid_files"] = self.clean_pid_files(is_active)
+        return result
@@ -0,0 +1,202 @@
+"""
+Per-session span timeline and sampling profiler
+
+Every process working on a session (API, pool worker, script, CDP
+engine) appends finished spans to <session>/timeline.jsonl under the
+session's trace id (<session>/trace_id, written by the API). Lines are
+written with a single O_APPEND write, so processes can share the file.
+
+When a session asks for it (<session>/profile_requested) or
+SCRAPER_PROFILE=1 is set, jobs also run a sampling profiler on their own
+thread and write the collapsed stacks to <session>/profile.<job>.folded, which
+flamegraph.pl, speedscope or inferno render as a flamegraph.
+"""
+
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+TIMELINE_FILE = "timeline.jsonl"
+TRACE_ID_FILE = "trace_id"
+PROFILE_FLAG_FILE = "profile_requested"
+PROFILE_FILE = "profile.{}.folded"
+
+PROFILE_INTERVAL = float(os.environ.get("SCRAPER_PROFILE_INTERVAL", "0.005"))
+
+# (trace_id, session_dir, parent span id)
+_current: contextvars.ContextVar = contextvars.ContextVar("akademik_trace", default=None)
+
+
+def trace_id_for(session_dir: Path) -> str:
+    """The session's trace id, created on first use"""
+    path = Path(session_dir) / TRACE_ID_FILE
+    try:
+        return path.read_text().strip()
+    except OSError:
+        trace_id = uuid.uuid4().hex
+        try:
+            path.write_text(trace_id)
+        except OSError:
+            pass
+        return trace_id
+
+
+def _emit(session_dir: Path, record: Dict[str, Any]) -> None:
+    line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+    try:
+        fd = os.open(Path(session_dir) / TIMELINE_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+@contextmanager
+def session_trace(session_dir: Path) -> Iterator[str]:
+    """Attach spans opened in this context to the session's timeline"""
+    trace_id = trace_id_for(session_dir)
+    token = _current.set((trace_id, Path(session_dir), None))
+    try:
+        yield trace_id
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, /, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """Time a step; a no-op outside session_trace. Attributes may be added to the yielded dict"""
+    current = _current.get()
+    if current is None:
+        yield attrs
+        return
+    trace_id, session_dir, parent_id = current
+    span_id = uuid.uuid4().hex[:16]
+    token = _current.set((trace_id, session_dir, span_id))
+    started = time.time()
+    error = None
+    try:
+        yield attrs
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        ended = time.time()
+        _emit(session_dir, {
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "name": name,
+            "start": started,
+            "end": ended,
+            "duration_ms": round((ended - started) * 1000, 2),
+            "pid": os.getpid(),
+            "attrs": attrs,
+            "error": error,
+        })
+
+
+def record_span(session_dir: Path, name: str, started: float, ended: float, /, **attrs: Any) -> None:
+    """Append a span timed elsewhere (e.g. an HTTP request in the API middleware)"""
+    _emit(session_dir, {
+        "trace_id": trace_id_for(session_dir),
+        "span_id": uuid.uuid4().hex[:16],
+        "parent_id": None,
+        "name": name,
+        "start": started,
+        "end": ended,
+        "duration_ms": round((ended - started) * 1000, 2),
+        "pid": os.getpid(),
+        "attrs": attrs,
+        "error": None,
+    })
+
+
+def summarize(spans: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Count, total and max duration per span name"""
+    summary: Dict[str, Dict[str, float]] = {}
+    for item in spans:
+        entry = summary.setdefault(item["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["count"] += 1
+        entry["total_ms"] = round(entry["total_ms"] + item["duration_ms"], 2)
+        entry["max_ms"] = max(entry["max_ms"], item["duration_ms"])
+    return summary
+
+
+def read_timeline(session_dir: Path) -> List[Dict[str, Any]]:
+    spans = []
+    try:
+        with open(Path(session_dir) / TIMELINE_FILE, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return sorted(spans, key=lambda s: s["start"])
+
+
+def profiling_requested(session_dir: Path) -> bool:
+    return os.environ.get("SCRAPER_PROFILE") == "1" or (Path(session_dir) / PROFILE_FLAG_FILE).exists()
+
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval into collapsed (folded) stacks"""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._sample, name="trace-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def write(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def job_trace(session_dir: Path, name: str, /, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """Root span of a scraping job, profiled when the session requested it"""
+    profiler = SamplingProfiler() if profiling_requested(session_dir) else None
+    if profiler:
+        profiler.start()
+    try:
+        with session_trace(session_dir), span(name, **attrs) as job_attrs:
+            yield job_attrs
+    finally:
+        if profiler:
+            profiler.stop()
+            profiler.write(Path(session_dir) / PROFILE_FILE.format(name))
@@ -0,0 +1,145 @@
+"""
+Standalone scraper worker node
+
+Pulls search, collaborator and crawl jobs from a shared queue and runs them in a
+local pre-forked pool. Session files are written under a local work
+directory and, for a remote (HTTP) queue, uploaded to the API's session
+store as they change, so API pollers see progress as if the job ran on
+the API host. Capacity grows with every machine running this:
+
+    python -m yok_scraper.worker --queue http://api-host:3002 --concurrency 2
+    python -m yok_scraper.worker --queue sqlite:////var/www/akademik-tinder/data/job_queue.db
+"""
+
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import wait
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .config import SESSIONS_ROOT
+from .job_queue import DEFAULT_LEASE_SECONDS, SESSION_FILES, HTTPJobQueue, JobQueue, open_queue
+from .pool import JobCancelled, WorkerPool
+
+QUEUE_KINDS = ("search", "collaborators", "crawl")
+POLL_INTERVAL = 1.0
+
+
+class QueueWorker:
+    """Leases up to `concurrency` jobs at a time and runs them in a WorkerPool"""
+
+    def __init__(self, queue: JobQueue, concurrency: int = 1, sessions_root: Optional[Path] = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS, worker_id: Optional[str] = None):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        # Uzak kuyrukta dosyalar yerel çalışma dizinine yazılıp API'ye yüklenir
+        self.remote = isinstance(queue, HTTPJobQueue)
+        if sessions_root is None:
+            sessions_root = Path(tempfile.mkdtemp(prefix="akademik-worker-")) if self.remote else SESSIONS_ROOT
+        self.sessions_root = Path(sessions_root)
+        self.pool = WorkerPool(concurrency)
+        self._running: Dict[str, threading.Thread] = {}
+        self._stop = threading.Event()
+
+    def _sync(self, job: Dict[str, Any], uploaded: Dict[str, float]) -> None:
+        if not self.remote:
+            return
+        session_dir = self.sessions_root / job["payload"]["session_id"]
+        for name in SESSION_FILES:
+            path = session_dir / name
+            try:
+                mtime = path.stat().st_mtime_ns
+            except OSError:
+                continue
+            if uploaded.get(name) == mtime:
+                continue
+            try:
+                if self.queue.upload(job["id"], self.worker_id, name, path.read_bytes()):
+                    uploaded[name] = mtime
+            except Exception as e:
+                print(f"[WARN] {name} yüklenemedi ({job['id']}): {e}", flush=True)
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        payload = {**job["payload"], "sessions_root": str(self.sessions_root)}
+        print(f"[INFO] İş alındı: {job['id']} ({job['kind']}, deneme {job['attempts']})", flush=True)
+        handle = self.pool.submit(job["kind"], client=self.worker_id, **payload)
+        uploaded: Dict[str, float] = {}
+        heartbeat_every = self.lease_seconds / 3
+        while not handle.future.done():
+            wait([handle.future], timeout=heartbeat_every)
+            if handle.future.done():
+                break
+            self._sync(job, uploaded)
+            try:
+                alive = self.queue.heartbeat(job["id"], self.worker_id, self.lease_seconds)
+            except Exception as e:
+                print(f"[WARN] Heartbeat gönderilemedi ({job['id']}): {e}", flush=True)
+                continue
+            if not alive:
+                # İptal edildi ya da lease başka işçiye geçti: tarayıcıyı bırak
+                print(f"[INFO] Lease kaybedildi, iş durduruluyor: {job['id']}", flush=True)
+                self.pool.cancel(handle.id)
+                return
+        self._sync(job, uploaded)
+        error = handle.future.exception()
+        try:
+            if error is None:
+                self.queue.ack(job["id"], self.worker_id, handle.future.result())
+                print(f"[INFO] İş tamamlandı: {job['id']}", flush=True)
+            elif not isinstance(error, JobCancelled):
+                self.queue.fail(job["id"], self.worker_id, str(error)[:2000])
+                print(f"[ERROR] İş başarısız: {job['id']}: {str(error).splitlines()[0]}", flush=True)
+        except Exception as e:
+            # Ack/fail ulaşmazsa lease süresi dolunca iş yeniden dağıtılır
+            print(f"[WARN] Sonuç bildirilemedi ({job['id']}): {e}", flush=True)
+
+    def run_forever(self) -> None:
+        self.pool.start()
+        print(f"[INFO] Worker {self.worker_id} hazır ({self.concurrency} eşzamanlı iş, dizin {self.sessions_root})", flush=True)
+        try:
+            while not self._stop.is_set():
+                self._running = {k: t for k, t in self._running.items() if t.is_alive()}
+                if len(self._running) >= self.concurrency:
+                    time.sleep(POLL_INTERVAL)
+                    continue
+                try:
+                    job = self.queue.lease(self.worker_id, QUEUE_KINDS, self.lease_seconds)
+                except Exception as e:
+                    print(f"[WARN] Kuyruğa ulaşılamadı: {e}", flush=True)
+                    job = None
+                if job is None:
+                    time.sleep(POLL_INTERVAL)
+                    continue
+                thread = threading.Thread(target=self._run, args=(job,), name=f"job-{job['id']}", daemon=True)
+                self._running[job["id"]] = thread
+                thread.start()
+        finally:
+            self.pool.shutdown()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="YÖK Akademik scraper işçi düğümü")
+    parser.add_argument("--queue", default=os.environ.get("SCRAPER_QUEUE_URL", "http://localhost:3002"))
+    parser.add_argument("--token", default=os.environ.get("SCRAPER_QUEUE_TOKEN"))
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("SCRAPER_POOL_SIZE", "1")))
+    parser.add_argument("--work-dir", type=Path, default=None)
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS)
+    args = parser.parse_args(argv)
+    worker = QueueWorker(open_queue(args.queue, args.token), args.concurrency, args.work_dir, args.lease_seconds)
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+if __name__ == "__main__":
+    main()